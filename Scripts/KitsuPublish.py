@@ -112,8 +112,8 @@ class Publish(QDialog, KitsuPublish_ui.Ui_dlg_kitsuPublish):
         self.data_token = gazu.asset.get_asset_by_name(self.project_tokens, self.current_shot)
         self.task_types = gazu.task.all_task_types_for_asset(self.data_token)
         self.cb_shot.clear()
+        # The project list already holds the fields shown here
         for asset in gazu.asset.all_assets_for_project(self.project_tokens):
-            asset = gazu.asset.get_asset(asset['id'])
             self.cb_shot.addItem(asset['name'], asset)
         # self.cb_shot.setCurrentIndex(self.cb_shot.findText(shotname))
 
@@ -128,8 +128,7 @@ class Publish(QDialog, KitsuPublish_ui.Ui_dlg_kitsuPublish):
         self.shot = gazu.shot.get_shot_by_name(self.sequence, shotname)
         self.cb_shot.clear()
         for shot in gazu.shot.all_shots_for_project(self.project_tokens):
-            shot = gazu.shot.get_shot(shot.get('id'))
-            self.cb_shot.addItem("{}-{}".format(shot.get("sequence_name"),shot.get("name"), shot))
+            self.cb_shot.addItem("{}-{}".format(shot.get("sequence_name"),shot.get("name")), shot)
         
         self.cb_shot.setCurrentIndex(self.cb_shot.findText(shotname))
         # self.task_types = gazu.task.all_task_types()
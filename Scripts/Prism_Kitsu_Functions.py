@@ -41,6 +41,7 @@
 ####################################################
 
 from genericpath import isfile
+import copy
 import os
 from posixpath import split
 import sys
@@ -92,6 +93,14 @@ STEP2TASKTRANSLATE = {
     "prv": "Previz"
 }
 
+# Answers of a reachable Kitsu refusing the user: publishes are not journaled
+# then, since they would be refused the same way once replayed.
+KITSU_REFUSED_ERRORS = (
+    gazu.exception.AuthFailedException,
+    gazu.exception.NotAuthenticatedException,
+    gazu.exception.NotAllowedException,
+)
+
 
 def is_image_type(filetype):
     return any(filetype.endswith(f) for f in IMAGETYPE)
@@ -109,6 +118,8 @@ class Prism_Kitsu_Functions(object):
         self.tokens = None
         self.publish_type_dict = None
         self.registerCallbacks()
+        InstallFakeKitsu(self.core)
+        self.warmUpKitsuConnection()
 
     @err_catcher(name=__name__)
     def isActive(self):
@@ -153,6 +164,20 @@ class Prism_Kitsu_Functions(object):
     def onProjectChanged(self, origin):
         if hasattr(self, "kitsu"):
             del self.kitsu
+        self.warmUpKitsuConnection()
+
+    @err_catcher(name=__name__)
+    def warmUpKitsuConnection(self):
+        # Open the connection to Kitsu in the background so the first login
+        # doesn't pay for the TLS handshake on the UI thread
+        try:
+            prjmanSite = self.core.getConfig("kitsu", "site", configPath=self.core.prismIni)
+        except Exception:
+            return
+        if not prjmanSite:
+            return
+        gazu.set_host(prjmanSite + "/api")
+        gazu.client.warm_up()
 
     @err_catcher(name=__name__)
     def prismSettings_loadUI(self, origin):
@@ -389,6 +414,9 @@ class Prism_Kitsu_Functions(object):
 
     @err_catcher(name=__name__)
     def connectToKitsu(self, user=True, raise_login_error=True, show_login_widget=True):
+        # Error of the last failed connection, to tell an unreachable Kitsu
+        # from a refused login
+        self.kitsuConnectionError = None
         try:
             prjmanSite = self.core.getConfig("kitsu", "site", configPath=self.core.prismIni)
             prjmanUser = self.core.getConfig("kitsu", "username")
@@ -396,25 +424,71 @@ class Prism_Kitsu_Functions(object):
             prjmanName = self.core.getConfig("kitsu", "projectname", configPath=self.core.prismIni)
             api_host= prjmanSite+"/api"
             gazu.set_host(api_host)
+            # Fail fast while Kitsu is down instead of waiting for each
+            # request to time out, publishes are journaled meanwhile
+            if gazu.client.default_client.circuit_breaker is None:
+                gazu.client.set_circuit_breaker(gazu.breaker.CircuitBreaker())
+            EnableKitsuDiskCache(api_host, prjmanUser, prjmanName)
             from qtazulite import utils
-            try:
-                login_tokens = gazu.log_in(prjmanUser, prjmanUserPassword)
-            except:
-                if show_login_widget:
-                    from qtazulite.widgets.login import Login
-                    login_window = Login(host = api_host, user=prjmanUser, password=prjmanUserPassword)
-                    login_window.logged_in.connect(self.prismSettings_saveLoginSettings)
-                    login_window.exec_()
-                    login_tokens = login_window.login_tokens
 
-            project_tokens = gazu.project.get_project_by_name(prjmanName)
+            # Reuse the current session, or the tokens stored by a previous
+            # one, instead of logging in again. Expired access tokens are
+            # refreshed by gazu on first request.
+            session = (api_host, prjmanUser)
+            login_tokens = None
+            if getattr(self, "kitsuSession", None) == session:
+                login_tokens = gazu.client.default_client.tokens
+            elif prjmanUser:
+                login_tokens = gazu.restore_session(prjmanUser)
+            if not login_tokens:
+                login_tokens = self.logInKitsu(api_host, prjmanUser, prjmanUserPassword, show_login_widget)
+            if login_tokens:
+                self.kitsuSession = session
 
+            try:
+                project_tokens = gazu.project.get_project_by_name(prjmanName)
+            except gazu.exception.NotAuthenticatedException:
+                # Stored session is no longer valid
+                login_tokens = self.logInKitsu(api_host, prjmanUser, prjmanUserPassword, show_login_widget)
+                project_tokens = gazu.project.get_project_by_name(prjmanName)
+
+            if login_tokens and project_tokens:
+                self.startKitsuReplayer(api_host)
             return login_tokens, project_tokens
-        except:
+        except Exception as why:
+            self.kitsuConnectionError = why
             if raise_login_error:
                 raise
             return None, None
 
+    @err_catcher(name=__name__)
+    def startKitsuReplayer(self, api_host):
+        # Send publishes journaled while Kitsu was unreachable, once logged
+        # in. Publishes set aside because they were replayed without a valid
+        # session are queued again.
+        replayer = gazu.offline.get_replayer()
+        if replayer.thread is not None and replayer.thread.is_alive():
+            return
+        replayer.journal.retry_failed(api_host, error="NotAuthenticatedException")
+        gazu.offline.start_replayer()
+
+    @err_catcher(name=__name__)
+    def logInKitsu(self, api_host, user, password, show_login_widget=True):
+        login_tokens = None
+        try:
+            login_tokens = gazu.log_in(user, password, persist=True)
+        except:
+            if show_login_widget:
+                from qtazulite.widgets.login import Login
+                login_window = Login(host = api_host, user=user, password=password)
+                login_window.logged_in.connect(self.prismSettings_saveLoginSettings)
+                login_window.exec_()
+                login_tokens = login_window.login_tokens
+                if login_tokens:
+                    user = self.core.getConfig("kitsu", "username")
+                    gazu.client.save_tokens(user)
+        return login_tokens
+
     @err_catcher(name=__name__)
     def prismSettings_saveLoginSettings(self, user, password):
         self.core.setConfig("kitsu", "username", val=user)
@@ -470,6 +544,7 @@ class Prism_Kitsu_Functions(object):
             
 
     @err_catcher(name=__name__)
+    @MeasureKitsuOperation("publish")
     def prjmanPublish(self, origin):
         try:
             del sys.modules["KitsuPublish"]
@@ -551,6 +626,7 @@ class Prism_Kitsu_Functions(object):
                 webbrowser.open(launch_url)
 
     @err_catcher(name=__name__)
+    @MeasureKitsuOperation("assets_to_local")
     def prjmanAssetsToLocal(self, origin):
         # add code here
 
@@ -562,6 +638,9 @@ class Prism_Kitsu_Functions(object):
             return
         from pathlib import Path
         assets = gazu.asset.all_assets_for_project(project_tokens)
+        asset_types, missing = gazu.asset.get_asset_types(
+            set(asset.get("entity_type_id") for asset in assets))
+        asset_type_names = {t["id"]: t["name"] for t in asset_types}
         for asset in assets:
             assetInfo = {}
             asset_name = asset.get("name")
@@ -574,7 +653,7 @@ class Prism_Kitsu_Functions(object):
                 removeID(self, asset["name"], "assetinfo")
             elif tmbID is not False:
                 assetInfo["thumbnailID"] = tmbID
-            asset_type = gazu.asset.get_asset_type(asset.get("entity_type_id")).get("name")
+            asset_type = asset_type_names[asset.get("entity_type_id")]
             asset_path = Path(self.core.assetPath) / asset_type / asset_name
             if not asset_path.exists():
                 self.core.entities.createEntity("asset", str(asset_path))
@@ -596,6 +675,7 @@ class Prism_Kitsu_Functions(object):
         origin.refreshAHierarchy()
 
     @err_catcher(name=__name__)
+    @MeasureKitsuOperation("assets_to_kitsu")
     def prjmanAssetsToprjman(self, origin):
         # add code here
         assets_path = self.core.entities.getAssetPaths()
@@ -609,10 +689,18 @@ class Prism_Kitsu_Functions(object):
         from box import Box
         from pathlib import Path
         login, project = self.connectToKitsu()
+
+        # Fetch existing assets once, then push creations and updates
+        # concurrently
+        kitsu_assets = dict((asset["name"], asset) for asset in
+                            gazu.asset.all_assets_for_project(project))
+        asset_types = dict((asset_type["name"], asset_type) for asset_type in
+                           gazu.asset.all_asset_types())
+        writer = gazu.bulk.BulkWriter()
         for asset_path in assets_path:
             asset_path = Path(asset_path)
             asset_name = asset_path.name
-            asset = gazu.asset.get_asset_by_name(project, asset_name)
+            asset = kitsu_assets.get(asset_name)
             if asset:
                 asset = Box(asset)
                 if not asset.data:
@@ -622,28 +710,42 @@ class Prism_Kitsu_Functions(object):
                 info = self.core.getConfig(config="assetinfo", location=str(asset_path))
                 print(info)
                 asset.data.prism.assetInfo = self.core.getConfig(configPath=info)
-                gazu.asset.update_asset(asset)
-                updatedAssets.append(asset_name)
+                writer.add(gazu.asset.update_asset, {"asset": asset},
+                           key=("update", asset_name))
             else:
                 if asset_path.parent == self.core.assetPath:
                     continue
                 rel_path = asset_path.relative_to(self.core.assetPath)
-                asset_type_name = list(rel_path.parents)[::-1][1]
-                asset_type = gazu.asset.get_asset_type_by_name(asset_type_name)
+                asset_type_name = str(list(rel_path.parents)[::-1][1])
+                asset_type = asset_types.get(asset_type_name)
                 if not asset_type:
-                    asset_type = gazu.asset.new_asset_type(asset_type_name)
+                    asset_type = writer.add(gazu.asset.new_asset_type,
+                                            {"name": asset_type_name},
+                                            key=("asset_type", asset_type_name))
                 info = self.core.getConfig(config="assetinfo", location=str(asset_path))
                 prism_info = dict(prism=dict(
                     path = str(asset_path),
                     assetinfo = info
                 ))
-                gazu.asset.new_asset(
-                    project,
-                    asset_type,
-                    asset_name,
-                    extra_data=prism_info
-                )
-                createdAssets.append(asset_name)
+                writer.add(gazu.asset.new_asset,
+                           {"project": project,
+                            "asset_type": asset_type,
+                            "name": asset_name,
+                            "extra_data": prism_info},
+                           key=("create", asset_name))
+
+        report = writer.run()
+        # The cached lists, in memory and on disk, are outdated now
+        gazu.asset.all_assets_for_project.clear_cache()
+        gazu.asset.all_asset_types.clear_cache()
+        for operation in report.failed:
+            print("Failed to push {} to Kitsu with exception:\n{}".format(
+                operation.key[1], operation.error))
+        for operation in report.succeeded:
+            if operation.key[0] == "create":
+                createdAssets.append(operation.key[1])
+            elif operation.key[0] == "update":
+                updatedAssets.append(operation.key[1])
 
         if len(createdAssets) > 0 or len(updatedAssets) > 0:
             msgString = ""
@@ -672,6 +774,7 @@ class Prism_Kitsu_Functions(object):
         QMessageBox.information(self.core.messageParent, "Kitsu Sync", msgString)
 
     @err_catcher(name=__name__)
+    @MeasureKitsuOperation("shots_to_local")
     def prjmanShotsToLocal(self, origin):
         login_tokens, project_tokens = self.connectToKitsu()
         ksuShots = self.getKitsuShots()
@@ -876,6 +979,7 @@ class Prism_Kitsu_Functions(object):
         origin.refreshShots()
 
     @err_catcher(name=__name__)
+    @MeasureKitsuOperation("shots_to_kitsu")
     def prjmanShotsToprjman(self, origin):
         login_tokens, project_tokens = self.connectToKitsu()
         # add code here
@@ -997,7 +1101,15 @@ class Prism_Kitsu_Functions(object):
         if not state.chb_publishToKitsu.isChecked():
             return
         login_tokens, project_tokens = self.connectToKitsu(raise_login_error=False, show_login_widget=False)
-        if not (login_tokens and project_tokens):
+        offline = not (login_tokens and project_tokens)
+        if offline and isinstance(self.kitsuConnectionError, KITSU_REFUSED_ERRORS):
+            logger.warning("Kitsu refused the login, playblast not published: {}".format(self.kitsuConnectionError))
+            QMessageBox.warning(
+                self.core.messageParent,
+                "Kitsu Publish",
+                "Kitsu refused the login ({}). Skipped publish to kitsu.".format(
+                    type(self.kitsuConnectionError).__name__),
+            )
             return
         scenefile = self.core.convertPath(scenefile, "global")
         data = self.core.entities.getScenefileData(scenefile)
@@ -1019,11 +1131,19 @@ class Prism_Kitsu_Functions(object):
             outputpath = self.convertSeqToVideo(self.core.projectBrowser(), os.getenv("TMP"))
             ouputname, ext = os.path.splitext(outputpath)
             filetype = ext.replace(".","")
-        
+
+        if offline:
+            # Kitsu is unreachable: keep the publish in the offline journal,
+            # it is sent once the server is back.
+            if is_movie_type(filetype):
+                self.journalPlayblastPublish(state, entitytype, entityName, step, comment, outputpath)
+            return
+
         publish_entities = []
 
         if entitytype == "shot":
             shotname, seqname = self.core.entities.splitShotname(entityName)
+            prismSeqname = seqname
             if not shotname or not seqname or seqname == "no sequence":
                 QMessageBox.critical(
                     self.core.messageParent,
@@ -1093,7 +1213,10 @@ class Prism_Kitsu_Functions(object):
                         else:
                             shot_dict = gazu.shot.get_shot_by_name(seq, shotname)
                         if shot_dict:
-                            publish_entities.append((shot_dict, os.path.join(shots_path, shot_file)))
+                            publish_entities.append((
+                                shot_dict,
+                                os.path.join(shots_path, shot_file),
+                                "{}-{}".format(prismSeqname, shot_dict["name"])))
                         else:
                             logger.error("Failed to find shot with name {}".format(shotname))
                     except Exception as why:
@@ -1107,9 +1230,9 @@ class Prism_Kitsu_Functions(object):
                     "No asset name {} on Kitsu were found. Skipped publish to kitsu.".format(entityName),
                 )
                 return
-        publish_entities.append((entity_dict, outputpath))
+        publish_entities.append((entity_dict, outputpath, entityName))
         
-        for entity_dict, outputpath in publish_entities:
+        for entity_dict, outputpath, publishName in publish_entities:
             if is_movie_type(filetype) and entity_dict:
                 try:
                     task_type_dict = gazu.task.get_task_type_by_name(step)
@@ -1119,23 +1242,33 @@ class Prism_Kitsu_Functions(object):
                         task_dict = gazu.task.new_task(entity_dict, task_type_dict)
 
                     type_status_dict = state.chb_taskStatus.currentData()
-
-                    comment_dict = addComment(
-                        task_dict,
-                        type_status_dict,
-                        comment=comment,
-                        person=person_dict)
-
-                    preview_dict = gazu.task.add_preview(task_dict,
-                                                        comment_dict,
-                                                        outputpath)
-
-                    if state.chb_setPublishAsReview.isChecked():
-                        gazu.task.set_main_preview(preview_dict)
+                    if not isinstance(type_status_dict, dict):
+                        type_status_dict = gazu.task.get_task_status_by_short_name(type_status_dict or "todo")
+
+                    # Journaled and replayed later if the connection drops
+                    result, journaled = gazu.offline.run_or_journal(
+                        "publish_preview",
+                        {
+                            "task": {"id": task_dict["id"]},
+                            "task_status": {"id": type_status_dict["id"]},
+                            "comment": comment,
+                            "person": {"id": person_dict["id"]},
+                            "preview_file_path": outputpath,
+                            "set_thumbnail": state.chb_setPublishAsReview.isChecked(),
+                            "resumable": True,
+                        },
+                        queue=self.getKitsuPublishQueue(entitytype, publishName, step),
+                        files=[outputpath])
+                except gazu.offline.TRANSIENT_ERRORS + (gazu.exception.ServerErrorException,):
+                    # Kitsu went down while resolving the task
+                    self.journalPlayblastPublish(state, entitytype, publishName, step, comment, outputpath)
                 except Exception as why:
                     logger.error("Failed to submit playblast to kitsu for {}".format(entity_dict.get("name") or entity_dict))
                 else:
-                    logger.info("Playblast submited to kitsu for {}".format(entity_dict.get("name") or entity_dict))
+                    if journaled:
+                        logger.warning("Kitsu unreachable, playblast publish for {} will be sent later".format(entity_dict.get("name") or entity_dict))
+                    else:
+                        logger.info("Playblast submited to kitsu for {}".format(entity_dict.get("name") or entity_dict))
 
             if not entity_dict.get("data"):
                 entity_dict["data"] = {}
@@ -1168,9 +1301,39 @@ class Prism_Kitsu_Functions(object):
             entity_dict["data"]["metadata"]["prism"][step].update(data)
 
             if entitytype == "shot":
-                gazu.shot.update_shot(entity_dict)
+                gazu.offline.run_or_journal("update_shot", {"shot": entity_dict}, queue=entity_dict["id"])
             else:
-                gazu.asset.update_asset(entity_dict)
+                gazu.offline.run_or_journal("update_asset", {"asset": entity_dict}, queue=entity_dict["id"])
+
+    @err_catcher(name=__name__)
+    def getKitsuPublishQueue(self, entitytype, entityName, step):
+        # Publishes of an entity task share one journal queue, whether they
+        # were journaled offline, before the task ID is known, or online
+        return "{}/{}/{}".format(entitytype, entityName, step)
+
+    @err_catcher(name=__name__)
+    def journalPlayblastPublish(self, state, entitytype, entityName, step, comment, outputpath):
+        queue = self.getKitsuPublishQueue(entitytype, entityName, step)
+        sequence_name = None
+        if entitytype == "shot":
+            entityName, sequence_name = self.core.entities.splitShotname(entityName)
+        type_status_dict = state.chb_taskStatus.currentData()
+        gazu.offline.journal_operation(
+            "prism_publish_playblast",
+            {
+                "project_name": self.core.getConfig("kitsu", "projectname", configPath=self.core.prismIni),
+                "entity_type": entitytype,
+                "entity_name": entityName,
+                "sequence_name": sequence_name,
+                "task_type_name": step,
+                "task_status_id": type_status_dict["id"] if isinstance(type_status_dict, dict) else None,
+                "comment": comment,
+                "preview_file_path": outputpath,
+                "set_thumbnail": state.chb_setPublishAsReview.isChecked(),
+            },
+            queue=queue,
+            files=[outputpath])
+        logger.warning("Kitsu unreachable, playblast publish for {} will be sent later".format(entityName))
 
     @err_catcher(name=__name__)
     def onPostRender(self, state, scenefile, settings):
@@ -1288,20 +1451,29 @@ class Prism_Kitsu_Functions(object):
         created_shots = []
         updated_shots = []
         configInfo = {}
+
+        # Existing entities are fetched once for the whole project, then
+        # creations and updates are pushed concurrently, each shot after its
+        # sequence and each sequence after its episode
+        episodes = dict(
+            (episode["name"], episode)
+            for episode in gazu.shot.all_episodes_for_project(project_tokens))
+        sequences = dict(
+            ((sequence["parent_id"], sequence["name"]), sequence)
+            for sequence in gazu.shot.all_sequences_for_project(project_tokens))
+        kitsu_shots = dict(
+            ((shot["parent_id"], shot["name"]), shot)
+            for shot in gazu.shot.all_shots_for_project(project_tokens))
+
+        writer = gazu.bulk.BulkWriter()
+        shot_operations = {}
         for shot_name in shots:
-            shotInfo = {}
             # Get range
             shotRanges = self.core.getConfig("shotRanges",
                                              shot_name,
                                              config="shotinfo"
                                              )
 
-            # Get preview image
-            previewImgPath = os.path.join(os.path.dirname(self.core.prismIni),
-                                          "Shotinfo",
-                                          "%s_preview.jpg" % shot_name,
-                                          )
-
             # Split names
             shotName, seqName = self.core.entities.splitShotname(shot_name)
             if project_tokens["production_type"] == "tvshow":
@@ -1312,58 +1484,80 @@ class Prism_Kitsu_Functions(object):
             else:
                 epName = "none"
 
-            thumbnailURL = previewImgPath if os.path.exists(
-                previewImgPath) else None
-
-            episode_dict, created_ep = createKitsuEpisode(project_tokens,
-                                                          epName)
-            sequence_dict, created_seq = createKitsuSequence(project_tokens,
-                                                             seqName,
-                                                             episode_dict)
-            shot_dict, created_shot, isUpdated = createKitsuShot(project_tokens,
-                                                      sequence_dict,
-                                                      shotName,
-                                                      shotRanges)
+            episode_dict = episodes.get(epName)
+            if episode_dict is None:
+                episode_dict = writer.add(
+                    gazu.shot.new_episode,
+                    {"project": project_tokens, "name": epName},
+                    key=("episode", epName))
+
+            sequence_dict = None
+            if not isinstance(episode_dict, gazu.bulk.BulkOperation):
+                sequence_dict = sequences.get((episode_dict["id"], seqName))
+            if sequence_dict is None:
+                sequence_dict = writer.add(
+                    gazu.shot.new_sequence,
+                    {"project": project_tokens,
+                     "name": seqName,
+                     "episode": episode_dict},
+                    key=("sequence", epName, seqName))
+
+            shot_dict = None
+            if not isinstance(sequence_dict, gazu.bulk.BulkOperation):
+                shot_dict = kitsu_shots.get((sequence_dict["id"], shotName))
 
             metadata = getEntityConfigData(self.core, self.core.getEntityPath(shot=shot_name))
-            updateKitsuMetadata(shot_dict, metadata, "shot")
-            thumbnailURL = None # force no preview
-            # Add thumbnail if preview image exists
-            if thumbnailURL is not None and (created_shot or isUpdated):
-                while True:
-                    # Get task type dict
-                    if self.publish_type_dict is None:
-                        self.publish_type_dict = getPublishTypeDict(self,
-                                                                    "Shot")
-                        if self.publish_type_dict is None:
-                            if created_shot:
-                                RemoveShot(shot_dict)
-                                created_shot = False
-                            if created_seq:
-                                RemoveSequence(sequence_dict)
-                            if created_ep:
-                                RemoveEpisode(episode_dict)
-                            break
-
-                    user_email = self.core.getConfig("kitsu", "username")
-
-                    # Ask user to pick task to add thumbnail to
-                    thumbnail_id = uploadThumbnail(
-                        shot_dict["id"],
-                        thumbnailURL,
-                        self.publish_type_dict,
-                        user_email
-                    )
-                    shotInfo["thumbnailID"] = thumbnail_id
-                    break
-
+            key = ("shot", epName, seqName, shotName)
+            if shot_dict is None:
+                arguments = {"project": project_tokens,
+                             "sequence": sequence_dict,
+                             "name": shotName,
+                             "data": {"metadata": metadata}}
+                if shotRanges is not None:
+                    arguments["nb_frames"] = shotRanges[1] - shotRanges[0]
+                    arguments["frame_in"] = shotRanges[0]
+                    arguments["frame_out"] = shotRanges[1]
+                operation = writer.add(gazu.shot.new_shot, arguments, key=key)
+                shot_operations[shot_name] = (operation, True)
+            else:
+                updated_dict = copy.deepcopy(shot_dict)
+                if not updated_dict.get("data"):
+                    updated_dict["data"] = {}
+                if shotRanges:
+                    updated_dict["data"]["frame_in"] = shotRanges[0]
+                    updated_dict["data"]["frame_out"] = shotRanges[1]
+                    updated_dict["nb_frames"] = shotRanges[1] - shotRanges[0]
+                if not updated_dict["data"].get("metadata"):
+                    updated_dict["data"]["metadata"] = metadata
+                else:
+                    updated_dict["data"]["metadata"].update(metadata)
+                # Shots already matching the Prism frame range and metadata
+                # are neither sent nor reported as updated
+                if updated_dict == shot_dict:
+                    continue
+                operation = writer.add(gazu.shot.update_shot,
+                                       {"shot": updated_dict},
+                                       key=key)
+                shot_operations[shot_name] = (operation, False)
+
+        report = writer.run()
+        # The cached lists, in memory and on disk, are outdated now
+        gazu.shot.all_episodes_for_project.clear_cache()
+        gazu.shot.all_sequences_for_project.clear_cache()
+        gazu.shot.all_shots_for_project.clear_cache()
+        for operation in report.failed:
+            print("Failed to push {} to Kitsu with exception:\n{}".format(
+                "/".join(operation.key[1:]), operation.error))
+
+        for shot_name, (operation, created_shot) in shot_operations.items():
+            if operation.status != "done":
+                continue
             # Write out ID to config
             if created_shot:
-                shotInfo["objID"] = shot_dict["id"]
                 created_shots.append(shot_name)
                 # Add info to config array
-                configInfo[shot_name] = shotInfo
-            elif isUpdated:
+                configInfo[shot_name] = {"objID": operation.result["id"]}
+            else:
                 updated_shots.append(shot_name)
 
         if len(configInfo) > 0:
@@ -1386,26 +1580,33 @@ class Prism_Kitsu_Functions(object):
 
 
         # Check if tv show, meaning we're also dealing with episodes
+        # Each level of the hierarchy is fetched concurrently
         if project_tokens["production_type"] == "tvshow":
             episodes = GetEpisodes(project_tokens, user=user_sync)
-            for episode in episodes:
-                sequences = GetSequences(
-                    episode, "from_episode", user=user_sync)
-
-                for sequence in sequences:
-                    shots = GetShots(sequence, "from_sequence", user=user_sync)
-
-                    for shot in shots:
-                        shot["episode_name"] = episode["name"]
-                        ksuShots.append(shot)
+            sequences_per_episode = GetSequencesForEpisodes(
+                episodes, user=user_sync)
+
+            sequences = []
+            episode_names = []
+            for episode, episode_sequences in zip(episodes,
+                                                  sequences_per_episode):
+                for sequence in episode_sequences:
+                    sequences.append(sequence)
+                    episode_names.append(episode["name"])
+
+            shots_per_sequence = GetShotsForSequences(
+                sequences, user=user_sync)
+            for episode_name, shots in zip(episode_names,
+                                           shots_per_sequence):
+                for shot in shots:
+                    shot["episode_name"] = episode_name
+                    ksuShots.append(shot)
 
         else:  # meaning feature or short film
             sequences = GetSequences(
                 project_tokens, "from_project", user=user_sync)
 
-            for sequence in sequences:
-                shots = GetShots(sequence, "from_sequence", user=user_sync)
-
+            for shots in GetShotsForSequences(sequences, user=user_sync):
                 for shot in shots:
                     ksuShots.append(shot)
 
@@ -1457,10 +1658,10 @@ class Prism_Kitsu_Functions(object):
             else:  # Thumbnail added or changed
                 file_exists = os.path.exists(previewImgPath + ".jpg")
                 if file_exists is False or preview_file_id != local_preview_id:
-                    # Download the file
-                    extension = (gazu.files.get_preview_file(preview_file_id)
-                                ["extension"])
-                    thumbnailPath = previewImgPath + "." + extension
+                    # Download the file. Thumbnails are always png, and
+                    # are read from the gazu media cache when another
+                    # session already downloaded them.
+                    thumbnailPath = previewImgPath + ".png"
                     # Make path if it doesn't exist yet
                     
                     parent_folder = (
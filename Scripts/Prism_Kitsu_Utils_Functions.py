@@ -2,6 +2,7 @@
 # https://github.com/EmberLightVFX
 #####################################
 
+import functools
 import os
 import sys
 import tempfile
@@ -95,6 +96,46 @@ def GetShots(dict, where="from_sequence", user=False, getCanceled=False):
 
     return shots
 
+@err_catcher(name=__name__)
+def GetSequencesForEpisodes(episodes, user=False):
+    """
+    Fetch the sequences of every episode concurrently.
+
+    returns
+        List of sequence lists, in the same order as the episodes
+    """
+    if user:
+        # No user scoped listing of sequences per episode to fan out
+        return [GetSequences(episode, "from_episode", user=user)
+                for episode in episodes]
+
+    return gazu.aio.run(gazu.aio.map_concurrently(
+        gazu.aio.shot.all_sequences_for_episode, episodes))
+
+@err_catcher(name=__name__)
+def GetShotsForSequences(sequences, user=False):
+    """
+    Fetch the shots of every sequence concurrently.
+
+    returns
+        List of shot lists, in the same order as the sequences
+    """
+    if user:
+        fetch_shots = gazu.aio.user.all_shots_for_sequence
+    else:
+        fetch_shots = gazu.aio.shot.all_shots_for_sequence
+
+    shots_per_sequence = gazu.aio.run(
+        gazu.aio.map_concurrently(fetch_shots, sequences))
+
+    if user:
+        # Add sequence name as it isn't given from user-catch
+        for sequence, shots in zip(sequences, shots_per_sequence):
+            for shot in shots:
+                shot.update({'sequence_name': sequence["name"]})
+
+    return shots_per_sequence
+
 @err_catcher(name=__name__)
 def RemoveShot(shot_dict):
     return gazu.shot.remove_shot(shot_dict)
@@ -334,6 +375,70 @@ def uploadRevision(entity_id,
 
     return preview_dict
 
+# Not wrapped in err_catcher: it is replayed by the gazu offline journal in a
+# background thread, which needs the errors to retry later.
+def ReplayPlayblastPublish(project_name,
+                           entity_type,
+                           entity_name,
+                           sequence_name,
+                           task_type_name,
+                           task_status_id,
+                           comment,
+                           preview_file_path,
+                           set_thumbnail=False,
+                           checkpoint=None,
+                           client=gazu.client.default_client):
+    """
+    Publish a playblast journaled while Kitsu was unreachable: entities are
+    resolved by name once the server is back. The checkpoint keeps track of
+    the publish steps already done, so a replay doesn't post the comment
+    twice.
+    """
+    project_dict = gazu.project.get_project_by_name(project_name, client=client)
+    if entity_type == "shot":
+        episode_dict = None
+        if project_dict["production_type"] == "tvshow":
+            try:
+                episode_name, sequence_name = sequence_name.split(".", 1)
+            except ValueError:
+                episode_name = "Main Pack"
+            episode_dict = gazu.shot.get_episode_by_name(
+                project_dict, episode_name, client=client)
+        sequence_dict = gazu.shot.get_sequence_by_name(
+            project_dict, sequence_name, episode_dict, client=client)
+        entity_dict = gazu.shot.get_shot_by_name(
+            sequence_dict, entity_name, client=client)
+    else:
+        entity_dict = gazu.asset.get_asset_by_name(
+            project_dict, entity_name, client=client)
+    if not entity_dict:
+        raise ValueError("No %s named %s on Kitsu" % (entity_type, entity_name))
+
+    task_type_dict = gazu.task.get_task_type_by_name(
+        task_type_name, client=client)
+    task_dict = gazu.task.get_task_by_name(
+        entity_dict, task_type_dict, client=client)
+    if task_dict is None:
+        task_dict = gazu.task.new_task(
+            entity_dict, task_type_dict, client=client)
+    if task_status_id is None:
+        task_status_id = gazu.task.get_task_status_by_short_name(
+            "todo", client=client)["id"]
+
+    return gazu.task.publish_preview(
+        task_dict,
+        {"id": task_status_id},
+        comment=comment,
+        person=gazu.client.get_current_user(client=client),
+        preview_file_path=preview_file_path,
+        set_thumbnail=set_thumbnail,
+        client=client,
+        resumable=True,
+        checkpoint=checkpoint)
+
+gazu.offline.register_operation(
+    "prism_publish_playblast", ReplayPlayblastPublish, checkpoint=True)
+
 @err_catcher(name=__name__)
 def addComment(task, task_status="todo", comment="", person=None):
     if not isinstance(task_status, dict):
@@ -493,3 +598,73 @@ def getPublishTypeDict(self, pType, doStatus=False):
         )
 
     return tp.picked_data
+
+
+def MeasureKitsuOperation(operation):
+    """
+    Decorator recording the Kitsu requests sent by a plugin operation when the
+    PRISM_KITSU_METRICS environment variable is set to a folder. Call counts
+    and latency histograms per route are written in <operation>.json in that
+    folder, to see which step of a sync dominates.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            folder = os.environ.get("PRISM_KITSU_METRICS")
+            if not folder:
+                return function(*args, **kwargs)
+
+            metrics = gazu.client.get_metrics() or gazu.client.enable_metrics()
+            metrics.reset()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if not os.path.isdir(folder):
+                    os.makedirs(folder)
+                metrics.dump(os.path.join(folder, operation + ".json"))
+        return wrapper
+    return decorator
+
+
+def InstallFakeKitsu(core):
+    """
+    Serve Kitsu requests from an in-memory fake server when the
+    PRISM_KITSU_FAKE_ZOU environment variable is set, so syncs and publishes
+    can run without a live server. Its value is the latency in seconds added
+    to each request. The fake project is named after the configured one and
+    the configured user can log in with any password.
+    """
+    latency = os.environ.get("PRISM_KITSU_FAKE_ZOU")
+    if latency is None:
+        return None
+
+    import gazu.fake_zou
+
+    project_name = core.getConfig("kitsu", "projectname",
+                                  configPath=core.prismIni)
+    user_email = core.getConfig("kitsu", "username")
+    dataset = gazu.fake_zou.generate_dataset(
+        project_name=project_name or "Fake Project",
+        emails=[user_email or "admin@example.com"],
+    )
+    transport = gazu.fake_zou.FakeZouTransport(dataset,
+                                               latency=float(latency or 0))
+    gazu.client.set_transport(transport)
+    return transport
+
+
+def EnableKitsuDiskCache(api_host, user_email, project_name):
+    """
+    Cache Kitsu reads in memory and on disk when the PRISM_KITSU_DISK_CACHE
+    environment variable is set, so task types, statuses and entity lists
+    fetched by a DCC session are reused by the next ones. Only the functions
+    gazu marks for it are kept on disk: reference data for a day, entity
+    lists for a few minutes.
+    """
+    if os.environ.get("PRISM_KITSU_DISK_CACHE") is None:
+        return None
+
+    gazu.cache.enable()
+    return gazu.cache.enable_disk_cache(api_host,
+                                        user=user_email,
+                                        project=project_name)
@@ -0,0 +1,76 @@
+# Cost of building cache keys for calls taking entity dicts, compared to the
+# previous JSON serialization of the arguments.
+# Run: python benchmarks/bench_cache_keys.py
+import json
+import time
+import uuid
+
+import common  # noqa: F401
+
+from gazu import cache
+from gazu.fake_zou import create_fake_client
+
+CALLS = 20000
+
+
+def get_json_cache_key(args, kwargs):
+    # Keys as they were built before: the arguments dumped to JSON
+    kwargs = dict(kwargs)
+    if "client" in kwargs:
+        kwargs["client"] = kwargs["client"].host
+    return json.dumps([args, kwargs])
+
+
+def measure(get_key, args, kwargs):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        get_key(args, kwargs)
+    return (time.perf_counter() - start) / CALLS
+
+
+def main():
+    client = create_fake_client()
+    sequence = {
+        "id": str(uuid.uuid4()),
+        "name": "SQ010",
+        "type": "Sequence",
+        "project_id": str(uuid.uuid4()),
+    }
+    big_sequence = dict(
+        sequence,
+        data={
+            "metadata": dict(
+                ("key%d" % index, "value %d " % index * 10)
+                for index in range(500)
+            )
+        },
+    )
+    task_type = {"id": str(uuid.uuid4()), "name": "Animation", "priority": 1}
+    calls = [
+        (
+            "get_shot_by_name(sequence, name)",
+            (sequence, "SH010"),
+            {"client": client},
+        ),
+        (
+            "get_shot_by_name(sequence with metadata, name)",
+            (big_sequence, "SH010"),
+            {"client": client},
+        ),
+        (
+            "get_task_by_name(entity with metadata, task type)",
+            (big_sequence, task_type),
+            {"name": "main", "client": client},
+        ),
+    ]
+    for label, args, kwargs in calls:
+        before = measure(get_json_cache_key, args, kwargs)
+        after = measure(cache.get_cache_key, args, kwargs)
+        print(
+            "%-50s json %6.1f us -> %5.1f us"
+            % (label, before * 1e6, after * 1e6)
+        )
+
+
+if __name__ == "__main__":
+    main()
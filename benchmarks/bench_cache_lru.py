@@ -0,0 +1,36 @@
+# Cost of the cache decorator LRU at 10k and 100k entries: misses evicting
+# the least recently used entry, and hits. Both must stay flat when the
+# cache grows. Run: python benchmarks/bench_cache_lru.py
+import time
+
+import common  # noqa: F401
+
+from gazu import cache
+
+
+def measure(function, keys):
+    start = time.perf_counter()
+    for key in keys:
+        function(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def main():
+    cache.enable()
+    # Hits return the cached value itself, not a deep copy
+    cache.set_return_mode("frozen")
+    for size in (10000, 100000):
+        cached = cache.cache(lambda index: {"id": index}, maxsize=size)
+        cached.set_cache_expire(0)
+        for index in range(size):
+            cached(index)
+        miss = measure(cached, range(size, 2 * size))
+        hit = measure(cached, range(size, 2 * size))
+        print(
+            "maxsize %6d: miss with eviction %5.1f us, hit %5.1f us"
+            % (size, miss * 1e6, hit * 1e6)
+        )
+
+
+if __name__ == "__main__":
+    main()
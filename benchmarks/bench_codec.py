@@ -0,0 +1,59 @@
+# Encoding of a big update_shot payload and decoding of a project-wide task
+# list with each available JSON codec. Run: python benchmarks/bench_codec.py
+import datetime
+import uuid
+
+from common import best_of, generate_task_rows
+
+from gazu import codec
+
+TASK_COUNT = 100000
+
+
+def get_codecs():
+    codecs = [codec.StdlibCodec()]
+    if codec.orjson is not None:
+        codecs.append(codec.OrjsonCodec())
+    return codecs
+
+
+def main():
+    now = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    shot = {
+        "id": str(uuid.uuid4()),
+        "name": "SH010",
+        "updated_at": now,
+        "data": {
+            "frame_%d" % index: {
+                "in": index,
+                "out": index + 10,
+                "note": "x" * 40,
+                "tags": ["layout", "anim"],
+                "at": now,
+            }
+            for index in range(20000)
+        },
+    }
+    body = codec.StdlibCodec().dumps(generate_task_rows(TASK_COUNT))
+
+    print(
+        "update_shot payload %.1f MB, %d task list %.1f MB"
+        % (
+            len(codec.StdlibCodec().dumps(shot)) / 1e6,
+            TASK_COUNT,
+            len(body) / 1e6,
+        )
+    )
+    if codec.orjson is None:
+        print("orjson is not installed, only the stdlib codec is measured")
+    for json_codec in get_codecs():
+        encode = best_of(lambda: json_codec.dumps(shot), 5)
+        decode = best_of(lambda: json_codec.loads(body), 3)
+        print(
+            "  %-7s encode update_shot %7.1f ms, decode tasks %7.1f ms"
+            % (json_codec.name, encode * 1000, decode * 1000)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# Memory used by a 100k task list parsed as dicts and as compact records
+# (gazu.client.set_compact_records). Run: python benchmarks/bench_records.py
+import gc
+import json
+import tracemalloc
+
+from common import generate_task_rows
+
+from gazu.records import compact_list
+
+TASK_COUNT = 100000
+
+
+def measure(function):
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    body = json.dumps(generate_task_rows(TASK_COUNT))
+    gc.collect()
+
+    tasks, dicts_size = measure(lambda: json.loads(body))
+    del tasks
+    records, records_size = measure(lambda: compact_list(json.loads(body)))
+    del records
+
+    print("%d tasks" % TASK_COUNT)
+    for label, size in (("dicts", dicts_size), ("records", records_size)):
+        print(
+            "  %-8s %6.1f MB  %5.2f KB per task"
+            % (label, size / 1e6, size / 1e3 / TASK_COUNT)
+        )
+    print("  ratio    %6.2f" % (float(records_size) / dicts_size))
+
+
+if __name__ == "__main__":
+    main()
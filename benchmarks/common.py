@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "external_modules"))
+
+
+def best_of(function, runs=5):
+    """
+    Returns:
+        float: Shortest duration of given function over several runs, in
+        seconds.
+    """
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+def generate_task_rows(count=100000, seed=1):
+    """
+    Build task rows shaped like the ones of a Zou task list, with IDs shared
+    between tasks as in a real project.
+
+    Returns:
+        list: Task dicts.
+    """
+    rng = random.Random(seed)
+
+    def new_id():
+        return str(uuid.UUID(int=rng.getrandbits(128)))
+
+    project_id = new_id()
+    task_type_ids = [new_id() for _ in range(12)]
+    task_status_ids = [new_id() for _ in range(8)]
+    entity_ids = [new_id() for _ in range(count // 20 or 1)]
+    person_ids = [new_id() for _ in range(50)]
+    return [
+        {
+            "id": new_id(),
+            "name": "main",
+            "description": None,
+            "priority": 0,
+            "duration": 0,
+            "estimation": 0,
+            "completion_rate": 0,
+            "retake_count": 0,
+            "sort_order": 0,
+            "start_date": None,
+            "due_date": None,
+            "real_start_date": None,
+            "end_date": None,
+            "done_date": None,
+            "last_comment_date": "2023-01-02T10:11:12",
+            "nb_assets_ready": 0,
+            "data": None,
+            "shotgun_id": None,
+            "project_id": project_id,
+            "task_type_id": rng.choice(task_type_ids),
+            "task_status_id": rng.choice(task_status_ids),
+            "entity_id": rng.choice(entity_ids),
+            "assigner_id": rng.choice(person_ids),
+            "assignees": [rng.choice(person_ids)],
+            "created_at": "2023-01-01T10:11:12",
+            "updated_at": "2023-01-02T10:11:12",
+            "type": "Task",
+        }
+        for _ in range(count)
+    ]
@@ -16,6 +16,11 @@ from . import task
 from . import user
 from . import playlist
 
+from . import aio
+from . import breaker
+from . import bulk
+from . import offline
+
 from .exception import AuthFailedException, ParameterException
 from .__version__ import __version__
 
@@ -28,7 +33,17 @@ def set_host(url, client=raw.default_client):
     raw.set_host(url, client=client)
 
 
-def log_in(email, password, client=raw.default_client):
+def log_in(email, password, client=raw.default_client, persist=False):
+    """
+    Args:
+        email (str): User email.
+        password (str): User password.
+        persist (bool): Store the tokens to restore the session later with
+            restore_session, without sending the password again.
+
+    Returns:
+        dict: Authentication tokens.
+    """
     tokens = {}
     try:
         tokens = raw.post(
@@ -43,9 +58,23 @@ def log_in(email, password, client=raw.default_client):
         raise AuthFailedException
     else:
         raw.set_tokens(tokens, client=client)
+        if persist:
+            raw.save_tokens(email, client=client)
     return tokens
 
 
+def restore_session(email, client=raw.default_client):
+    """
+    Reuse the tokens stored by a previous persisted log in on current host.
+    No request is sent, an expired access token is refreshed automatically
+    on first request.
+
+    Returns:
+        dict: Authentication tokens, None if no session was stored.
+    """
+    return raw.load_tokens(email, client=client)
+
+
 def log_out(client=raw.default_client):
     tokens = {}
     try:
@@ -54,6 +83,8 @@ def log_out(client=raw.default_client):
         )
     except ParameterException:
         pass
+    if client.token_owner is not None:
+        raw.forget_tokens(client.token_owner, client=client)
     raw.set_tokens(tokens, client=client)
     return tokens
 
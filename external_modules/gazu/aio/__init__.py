@@ -0,0 +1,8 @@
+from . import client as raw
+
+from . import asset
+from . import shot
+from . import task
+from . import user
+
+from .client import gather, map_concurrently, run, set_max_concurrency, to_async
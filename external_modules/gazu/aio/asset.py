@@ -0,0 +1,21 @@
+from .. import asset as gazu_asset
+
+from .client import to_async
+
+all_assets_for_project = to_async(gazu_asset.all_assets_for_project)
+all_assets_for_episode = to_async(gazu_asset.all_assets_for_episode)
+all_assets_for_shot = to_async(gazu_asset.all_assets_for_shot)
+all_assets_for_project_and_type = to_async(
+    gazu_asset.all_assets_for_project_and_type
+)
+all_asset_types = to_async(gazu_asset.all_asset_types)
+all_asset_types_for_project = to_async(gazu_asset.all_asset_types_for_project)
+
+get_asset = to_async(gazu_asset.get_asset)
+get_asset_by_name = to_async(gazu_asset.get_asset_by_name)
+get_asset_type = to_async(gazu_asset.get_asset_type)
+get_asset_type_by_name = to_async(gazu_asset.get_asset_type_by_name)
+
+new_asset = to_async(gazu_asset.new_asset)
+update_asset = to_async(gazu_asset.update_asset)
+update_asset_data = to_async(gazu_asset.update_asset_data)
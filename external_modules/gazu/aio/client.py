@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import client as raw
+
+default = raw.default_client
+
+executor_settings = {"max_concurrency": 8, "executor": None}
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns:
+        ThreadPoolExecutor: Executor running the blocking requests. Its size
+        bounds the number of requests in flight issued from coroutines.
+    """
+    with executor_lock:
+        if executor_settings["executor"] is None:
+            executor_settings["executor"] = ThreadPoolExecutor(
+                max_workers=executor_settings["max_concurrency"],
+                thread_name_prefix="gazu-aio",
+            )
+        return executor_settings["executor"]
+
+
+def set_max_concurrency(max_concurrency):
+    """
+    Set the maximum number of requests run concurrently by coroutines. Keep it
+    lower or equal to the client pool size to avoid queuing on sockets.
+
+    Args:
+        max_concurrency (int): Maximum number of concurrent requests.
+    """
+    with executor_lock:
+        previous_executor = executor_settings["executor"]
+        executor_settings["max_concurrency"] = max_concurrency
+        executor_settings["executor"] = None
+    if previous_executor is not None:
+        previous_executor.shutdown(wait=False)
+    return max_concurrency
+
+
+def to_async(function):
+    """
+    Build a coroutine function running given blocking function in the gazu
+    executor. Arguments are passed as they are.
+
+    Args:
+        function (func): Blocking function to wrap.
+
+    Returns:
+        func: Coroutine function.
+    """
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_executor(), functools.partial(function, *args, **kwargs)
+        )
+
+    return wrapper
+
+
+async def gather(*awaitables, limit=None):
+    """
+    Run given awaitables concurrently and return their results in the same
+    order.
+
+    Args:
+        awaitables: Coroutines or futures to run.
+        limit (int): Maximum number of awaitables run at the same time.
+
+    Returns:
+        list: Results of the awaitables.
+    """
+    if limit is None:
+        return list(await asyncio.gather(*awaitables))
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run_limited(awaitable):
+        async with semaphore:
+            return await awaitable
+
+    return list(
+        await asyncio.gather(*[run_limited(item) for item in awaitables])
+    )
+
+
+async def map_concurrently(coroutine_function, items, limit=None, **kwargs):
+    """
+    Call given coroutine function on every item concurrently.
+
+    Args:
+        coroutine_function (func): Coroutine function taking an item as first
+            argument.
+        items (list): Items to process.
+        limit (int): Maximum number of calls run at the same time.
+        kwargs: Extra arguments given to every call.
+
+    Returns:
+        list: Results in the same order as the items.
+    """
+    return await gather(
+        *[coroutine_function(item, **kwargs) for item in items], limit=limit
+    )
+
+
+def run(coroutine):
+    """
+    Run given coroutine from synchronous code and return its result. If an
+    event loop is already running in the current thread, the coroutine is run
+    in a dedicated thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    result = {}
+
+    def run_in_thread():
+        try:
+            result["value"] = asyncio.run(coroutine)
+        except BaseException as exception:
+            result["error"] = exception
+
+    thread = threading.Thread(target=run_in_thread, name="gazu-aio-run")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+get = to_async(raw.get)
+post = to_async(raw.post)
+put = to_async(raw.put)
+delete = to_async(raw.delete)
+fetch_all = to_async(raw.fetch_all)
+fetch_first = to_async(raw.fetch_first)
+fetch_one = to_async(raw.fetch_one)
+create = to_async(raw.create)
+upload = to_async(raw.upload)
+download = to_async(raw.download)
@@ -0,0 +1,24 @@
+from .. import shot as gazu_shot
+
+from .client import to_async
+
+all_shots_for_project = to_async(gazu_shot.all_shots_for_project)
+all_shots_for_episode = to_async(gazu_shot.all_shots_for_episode)
+all_shots_for_sequence = to_async(gazu_shot.all_shots_for_sequence)
+all_sequences_for_project = to_async(gazu_shot.all_sequences_for_project)
+all_sequences_for_episode = to_async(gazu_shot.all_sequences_for_episode)
+all_episodes_for_project = to_async(gazu_shot.all_episodes_for_project)
+all_previews_for_shot = to_async(gazu_shot.all_previews_for_shot)
+
+get_episode = to_async(gazu_shot.get_episode)
+get_episode_by_name = to_async(gazu_shot.get_episode_by_name)
+get_sequence = to_async(gazu_shot.get_sequence)
+get_sequence_by_name = to_async(gazu_shot.get_sequence_by_name)
+get_shot = to_async(gazu_shot.get_shot)
+get_shot_by_name = to_async(gazu_shot.get_shot_by_name)
+
+new_episode = to_async(gazu_shot.new_episode)
+new_sequence = to_async(gazu_shot.new_sequence)
+new_shot = to_async(gazu_shot.new_shot)
+update_shot = to_async(gazu_shot.update_shot)
+update_shot_data = to_async(gazu_shot.update_shot_data)
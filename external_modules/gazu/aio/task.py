@@ -0,0 +1,26 @@
+from .. import task as gazu_task
+
+from .client import to_async
+
+all_task_statuses = to_async(gazu_task.all_task_statuses)
+all_task_types = to_async(gazu_task.all_task_types)
+all_task_types_for_project = to_async(gazu_task.all_task_types_for_project)
+all_tasks_for_project = to_async(gazu_task.all_tasks_for_project)
+all_tasks_for_shot = to_async(gazu_task.all_tasks_for_shot)
+all_tasks_for_sequence = to_async(gazu_task.all_tasks_for_sequence)
+all_tasks_for_episode = to_async(gazu_task.all_tasks_for_episode)
+all_tasks_for_asset = to_async(gazu_task.all_tasks_for_asset)
+all_tasks_for_task_type = to_async(gazu_task.all_tasks_for_task_type)
+all_comments_for_task = to_async(gazu_task.all_comments_for_task)
+
+get_task = to_async(gazu_task.get_task)
+get_task_by_name = to_async(gazu_task.get_task_by_name)
+get_task_type_by_name = to_async(gazu_task.get_task_type_by_name)
+get_task_status = to_async(gazu_task.get_task_status)
+get_task_status_by_name = to_async(gazu_task.get_task_status_by_name)
+
+new_task = to_async(gazu_task.new_task)
+update_task = to_async(gazu_task.update_task)
+add_comment = to_async(gazu_task.add_comment)
+add_preview = to_async(gazu_task.add_preview)
+set_main_preview = to_async(gazu_task.set_main_preview)
@@ -0,0 +1,14 @@
+from .. import user as gazu_user
+
+from .client import to_async
+
+all_open_projects = to_async(gazu_user.all_open_projects)
+all_episodes_for_project = to_async(gazu_user.all_episodes_for_project)
+all_sequences_for_project = to_async(gazu_user.all_sequences_for_project)
+all_shots_for_sequence = to_async(gazu_user.all_shots_for_sequence)
+all_assets_for_asset_type_and_project = to_async(
+    gazu_user.all_assets_for_asset_type_and_project
+)
+all_tasks_for_shot = to_async(gazu_user.all_tasks_for_shot)
+all_tasks_for_asset = to_async(gazu_user.all_tasks_for_asset)
+all_tasks_to_do = to_async(gazu_user.all_tasks_to_do)
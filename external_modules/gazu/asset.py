@@ -5,7 +5,7 @@ from . import project as gazu_project
 
 from .sorting import sort_by_name
 
-from .cache import cache
+from .cache import cache, ENTITY_LIST_DISK_EXPIRE, REFERENCE_DISK_EXPIRE
 
 default = raw.default_client
 
@@ -40,6 +40,23 @@ def all_assets_for_project(project, client=default):
         return sort_by_name(raw.fetch_all(path, client=client))
 
 
+all_assets_for_project.set_cache_disk_expire(ENTITY_LIST_DISK_EXPIRE)
+
+
+def iter_assets_for_project(project, client=default):
+    """
+    Args:
+        project (str / dict): The project dict or the project ID.
+
+    Returns:
+        generator: Assets stored in the database for given project, yielded
+        one at a time while they are downloaded (not sorted).
+    """
+    project = normalize_model_parameter(project)
+    path = "projects/%s/assets" % project["id"]
+    return raw.iter_all(path, client=client)
+
+
 @cache
 def all_assets_for_episode(episode, client=default):
     """
@@ -130,6 +147,19 @@ def get_asset(asset_id, client=default):
     return raw.fetch_one("assets", asset_id, client=client)
 
 
+def get_assets(assets, client=default):
+    """
+    Args:
+        assets (list): The asset dicts or the asset IDs.
+
+    Returns:
+        tuple: Assets matching given IDs, in the same order, and IDs for which
+        no asset exists.
+    """
+    ids = [normalize_model_parameter(asset)["id"] for asset in assets]
+    return raw.fetch_many("assets", ids, client=client)
+
+
 @cache
 def get_asset_url(asset, client=default):
     """
@@ -259,6 +289,9 @@ def all_asset_types(client=default):
     return sort_by_name(raw.fetch_all("asset-types", client=client))
 
 
+all_asset_types.set_cache_disk_expire(REFERENCE_DISK_EXPIRE)
+
+
 @cache
 def all_asset_types_for_project(project, client=default):
     """
@@ -297,6 +330,22 @@ def get_asset_type(asset_id, client=default):
     return raw.fetch_one("asset-types", asset_id, client=client)
 
 
+def get_asset_types(asset_types, client=default):
+    """
+    Args:
+        asset_types (list): The asset type dicts or the asset type IDs.
+
+    Returns:
+        tuple: Asset Types matching given IDs, in the same order, and IDs for
+        which no asset type exists.
+    """
+    ids = [
+        normalize_model_parameter(asset_type)["id"]
+        for asset_type in asset_types
+    ]
+    return raw.fetch_many("asset-types", ids, client=client)
+
+
 @cache
 def get_asset_type_by_name(name, client=default):
     """
@@ -0,0 +1,93 @@
+import threading
+import time
+
+
+class CircuitBreaker(object):
+    """
+    Stop sending requests to a host that keeps failing. After
+    *failure_threshold* consecutive failures the circuit opens and requests
+    are refused without reaching the network. Once *reset_timeout* seconds
+    are elapsed a single probe request is allowed: the circuit closes if it
+    succeeds, otherwise it opens again for twice as long, up to
+    *max_reset_timeout*.
+
+    Args:
+        failure_threshold (int): Consecutive failures opening the circuit.
+        reset_timeout (float): Seconds before the first probe.
+        max_reset_timeout (float): Upper bound of the time between probes.
+    """
+
+    def __init__(
+        self, failure_threshold=3, reset_timeout=30.0, max_reset_timeout=600.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.current_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        Returns:
+            bool: True if a request can be sent.
+        """
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if (
+                self.state == "open"
+                and time.time() >= self.opened_at + self.current_timeout
+            ):
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+            self.current_timeout = self.reset_timeout
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open":
+                self.current_timeout = min(
+                    self.current_timeout * 2, self.max_reset_timeout
+                )
+            elif self.failures < self.failure_threshold:
+                return
+            self.state = "open"
+            self.opened_at = time.time()
+
+    def record_error(self):
+        """
+        Record a request that failed for another reason than the host
+        health. It doesn't count as a failure, except for the probe: the
+        circuit opens again so the next probe is not blocked forever.
+        """
+        with self.lock:
+            if self.state != "half_open":
+                return
+        self.record_failure()
+
+    def get_infos(self):
+        """
+        Returns:
+            dict: Circuit state, consecutive failures and seconds before next
+            probe.
+        """
+        with self.lock:
+            retry_in = 0.0
+            if self.state == "open":
+                retry_in = max(
+                    0.0, self.opened_at + self.current_timeout - time.time()
+                )
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "retry_in": retry_in,
+            }
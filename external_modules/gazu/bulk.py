@@ -0,0 +1,230 @@
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .client import default_client as default
+
+
+class BulkOperation(object):
+    """
+    Call queued in a BulkWriter. An operation can be given as argument to
+    operations queued after it: it is replaced by its result when they run,
+    and they run only once it succeeded.
+    """
+
+    def __init__(self, function, arguments, dependencies, key=None):
+        self.function = function
+        self.arguments = arguments
+        self.dependencies = dependencies
+        self.key = key
+        self.status = "pending"
+        self.result = None
+        self.error = None
+        self.duration = None
+
+    def __repr__(self):
+        return "<BulkOperation %s %s %s>" % (
+            getattr(self.function, "__name__", self.function),
+            self.key,
+            self.status,
+        )
+
+
+class BulkReport(object):
+    """
+    Outcome of the operations run by a BulkWriter.
+
+    Attributes:
+        succeeded (list): Operations that succeeded.
+        failed (list): Operations that raised an exception, stored in their
+            `error` attribute.
+        skipped (list): Operations not run because an operation they depend
+            on did not succeed.
+        duration (float): Seconds spent running the operations.
+    """
+
+    def __init__(self, operations, duration):
+        self.operations = operations
+        self.succeeded = [op for op in operations if op.status == "done"]
+        self.failed = [op for op in operations if op.status == "failed"]
+        self.skipped = [op for op in operations if op.status == "skipped"]
+        self.duration = duration
+
+    @property
+    def ok(self):
+        return not self.failed and not self.skipped
+
+    def get_summary(self):
+        """
+        Returns:
+            dict: Number of operations per outcome and total duration.
+        """
+        return {
+            "operations": len(self.operations),
+            "succeeded": len(self.succeeded),
+            "failed": len(self.failed),
+            "skipped": len(self.skipped),
+            "duration": self.duration,
+        }
+
+
+class BulkWriter(object):
+    """
+    Run many create and update operations, like pushing a whole shot list,
+    with bounded concurrency instead of one request after another.
+    Operations depending on others (a shot on its sequence, a sequence on
+    its episode) wait for them, and are skipped if they fail. A failing
+    operation doesn't stop the others: outcomes are gathered in a report.
+
+    Example:
+        writer = BulkWriter()
+        sequence = writer.add(
+            gazu.shot.new_sequence, {"project": project, "name": "SQ01"}
+        )
+        writer.add(
+            gazu.shot.new_shot,
+            {"project": project, "sequence": sequence, "name": "SH010"},
+        )
+        report = writer.run()
+
+    Args:
+        max_workers (int): Maximum number of operations run at the same
+            time. The client governor still applies to their requests.
+        client (KitsuClient): Client given to every operation.
+        progress_callback (function): Called with the number of finished
+            operations and the total after each operation.
+    """
+
+    def __init__(self, max_workers=8, client=default, progress_callback=None):
+        self.max_workers = max_workers
+        self.client = client
+        self.progress_callback = progress_callback
+        self.operations = []
+        self.operations_by_key = {}
+
+    def add(self, function, arguments=None, depends_on=None, key=None):
+        """
+        Queue a call to given function with given keyword arguments and the
+        writer client. Operations found in the arguments, directly or in
+        lists, tuples and dicts, are dependencies.
+
+        Args:
+            function (function): Function to call, like gazu.shot.new_shot.
+            arguments (dict): Keyword arguments of the function.
+            depends_on (list): Other operations that must succeed first.
+            key: Identifier of the operation. If an operation with the same
+                key is already queued, it is returned instead of queuing a
+                new one.
+
+        Returns:
+            BulkOperation: The queued operation.
+        """
+        if key is not None and key in self.operations_by_key:
+            return self.operations_by_key[key]
+        arguments = arguments or {}
+        dependencies = list(depends_on or [])
+        _find_operations(arguments, dependencies)
+        operation = BulkOperation(function, arguments, dependencies, key)
+        self.operations.append(operation)
+        if key is not None:
+            self.operations_by_key[key] = operation
+        return operation
+
+    def get(self, key):
+        """
+        Returns:
+            BulkOperation: Queued operation with given key, None if there is
+            none.
+        """
+        return self.operations_by_key.get(key)
+
+    def run(self):
+        """
+        Run the pending operations, each one as soon as its dependencies
+        succeeded.
+
+        Returns:
+            BulkReport: Outcome of the operations.
+        """
+        start = time.time()
+        operations = [op for op in self.operations if op.status == "pending"]
+        waiting = list(operations)
+        running = {}
+        finished = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while waiting or running:
+                # Operations are queued after their dependencies, so a single
+                # pass propagates skips down dependency chains.
+                still_waiting = []
+                for operation in waiting:
+                    statuses = [dep.status for dep in operation.dependencies]
+                    if "failed" in statuses or "skipped" in statuses:
+                        operation.status = "skipped"
+                        finished += 1
+                        self._notify(finished, len(operations))
+                    elif all(status == "done" for status in statuses):
+                        future = executor.submit(
+                            self._run_operation, operation
+                        )
+                        running[future] = operation
+                    else:
+                        still_waiting.append(operation)
+                waiting = still_waiting
+
+                if not running:
+                    # Remaining operations depend on operations that are not
+                    # part of this run.
+                    for operation in waiting:
+                        operation.status = "skipped"
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    finished += 1
+                    self._notify(finished, len(operations))
+        return BulkReport(operations, time.time() - start)
+
+    def _run_operation(self, operation):
+        start = time.time()
+        try:
+            arguments = _resolve_operations(operation.arguments)
+            operation.result = operation.function(
+                client=self.client, **arguments
+            )
+            operation.status = "done"
+        except Exception as exception:
+            operation.error = exception
+            operation.status = "failed"
+        operation.duration = time.time() - start
+
+    def _notify(self, finished, total):
+        if self.progress_callback is not None:
+            self.progress_callback(finished, total)
+
+
+def _find_operations(value, operations):
+    if isinstance(value, BulkOperation):
+        if value not in operations:
+            operations.append(value)
+    elif isinstance(value, dict):
+        for element in value.values():
+            _find_operations(element, operations)
+    elif isinstance(value, (list, tuple)):
+        for element in value:
+            _find_operations(element, operations)
+
+
+def _resolve_operations(value):
+    if isinstance(value, BulkOperation):
+        return value.result
+    elif isinstance(value, dict):
+        return dict(
+            (key, _resolve_operations(element))
+            for key, element in value.items()
+        )
+    elif isinstance(value, list):
+        return [_resolve_operations(element) for element in value]
+    elif isinstance(value, tuple):
+        return tuple(_resolve_operations(element) for element in value)
+    return value
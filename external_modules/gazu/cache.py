@@ -1,10 +1,27 @@
 import copy
 import datetime
-import json
+import threading
 
+from collections import OrderedDict
 from functools import wraps
 
-cache_settings = {"enabled": False}
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from .disk_cache import DiskCache
+from .frozen import copy_on_write, freeze
+from .singleflight import SingleFlight
+
+RETURN_MODES = ("copy", "frozen", "copy_on_write")
+
+# Times to live on disk: reference data (task types, statuses...) rarely
+# changes, entity lists change as the production goes.
+REFERENCE_DISK_EXPIRE = 24 * 3600
+ENTITY_LIST_DISK_EXPIRE = 300
+
+cache_settings = {"enabled": False, "return_mode": "copy", "disk_cache": None}
 cached_functions = []
 
 
@@ -26,88 +43,218 @@ def disable():
 
 def clear_all():
     """
-    Clear all cached functions.
+    Clear all cached functions, and the entries of the current namespace in
+    the disk cache if it is enabled.
     """
     for function in cached_functions:
         function.clear_cache()
+    if cache_settings["disk_cache"] is not None:
+        cache_settings["disk_cache"].clear()
+
+
+def enable_disk_cache(host, user=None, project=None, path=None, max_size=None):
+    """
+    Add a second cache tier stored on disk, shared by every process of the
+    workstation and kept between sessions. It is used only by the functions
+    given a disk time to live with `set_cache_disk_expire`, typically the
+    ones returning reference data. Their values missing from the memory cache
+    are looked up on disk before calling the function, so a new session
+    starts with the values fetched by the previous ones. Values older than
+    the disk time to live are fetched again. None values are never stored.
+
+    Args:
+        host (str): API host the cached values come from.
+        user (str): User the cached values are fetched for.
+        project (str): Project the cached values are fetched for.
+        path (str): Location of the database, see DiskCache.
+        max_size (int): Size budget in bytes, see DiskCache.
+
+    Returns:
+        DiskCache: The disk cache.
+    """
+    disk_cache = cache_settings["disk_cache"]
+    if disk_cache is None or (path is not None and path != disk_cache.path):
+        disk_cache = DiskCache(path=path)
+    if max_size is not None:
+        disk_cache.max_size = max_size
+    disk_cache.set_namespace(host, user, project)
+    cache_settings["disk_cache"] = disk_cache
+    return disk_cache
+
+
+def disable_disk_cache():
+    """
+    Stop using the disk cache. Stored values are kept.
+    """
+    cache_settings["disk_cache"] = None
+
+
+def set_return_mode(return_mode):
+    """
+    Set how cached values are returned by all decorated functions, unless a
+    function has its own mode:
+
+    * copy: a deep copy of the value, that can be modified freely. Copying
+      big lists can cost more than the request saved by the cache.
+    * frozen: the cached value itself, made read-only (see FrozenDict and
+      FrozenList). Nothing is copied, modifying it raises TypeError.
+    * copy_on_write: a mutable view of the cached value. Nested dicts and
+      lists are copied only when they are read through it.
+
+    Args:
+        return_mode (str): copy, frozen or copy_on_write.
+    """
+    cache_settings["return_mode"] = check_return_mode(return_mode)
+    return cache_settings["return_mode"]
+
+
+def check_return_mode(return_mode):
+    if return_mode not in RETURN_MODES:
+        raise ValueError(
+            "Unknown cache return mode %s, expected one of: %s"
+            % (return_mode, ", ".join(RETURN_MODES))
+        )
+    return return_mode
 
 
 def remove_oldest_entry(memo, maxsize):
     """
-    Remove the oldest cache entry if there is more value stored than allowed.
+    Remove the least recently used cache entry if there is more value stored
+    than allowed. Entries are kept in access order, the least recently used
+    being the first one, so no scan is needed.
 
     Params:
-        memo (dict): Cache used for function memoization.
+        memo (OrderedDict): Cache used for function memoization.
         maxsize (int): Maximum number of entries for the cache.
 
     Returns:
-        Oldest entry for given cache.
+        Removed entry for given cache, None if no entry was removed.
     """
     oldest_entry = None
-    if maxsize > 0 and len(memo) > maxsize:
-        oldest_entry_key = list(memo.keys())[0]
-        for entry_key in memo.keys():
-            oldest_date = memo[oldest_entry_key]["date_accessed"]
-            if memo[entry_key]["date_accessed"] < oldest_date:
-                oldest_entry_key = entry_key
-        memo.pop(oldest_entry_key)
+    while maxsize > 0 and len(memo) > maxsize:
+        _, oldest_entry = memo.popitem(last=False)
     return oldest_entry
 
 
 def get_cache_key(args, kwargs):
     """
-    Serialize arguments to get a cache key. It will be used to store function
-    results.
+    Build a hashable key from the arguments. It will be used to store function
+    results. Model dicts are reduced to their ID, like in
+    `normalize_model_parameter`: passing an entity dict or its ID leads to the
+    same key, whatever the other fields of the dict, and big dicts are not
+    serialized on each call.
 
     Returns:
-        str: generated key
+        tuple: generated key
     """
-    kwargscopy = kwargs.copy()
-    if "client" in kwargscopy:
-        kwargscopy["client"] = kwargscopy["client"].host
-    if len(args) == 0 and len(kwargscopy) == 0:
-        return ""
-    elif len(args) == 0:
-        return json.dumps(kwargscopy)
-    elif len(kwargscopy.keys()) == 0:
-        return json.dumps(args)
-    else:
-        return json.dumps([args, kwargscopy])
-
-
-def insert_value(function, cache_store, args, kwargs):
+    key = tuple(get_key_part(arg) for arg in args)
+    if kwargs:
+        key += tuple(
+            sorted(
+                (name, value.host if name == "client" else get_key_part(value))
+                for name, value in kwargs.items()
+            )
+        )
+    return key
+
+
+def get_key_part(value):
     """
-    Serialize function call arguments and store function result in given cache
-    store.
+    Returns:
+        The hashable form of given argument used in cache keys. Booleans and
+        floats are tagged with their type: True, 1 and 1.0 are equal in
+        Python but must not share a cache entry.
+    """
+    if isinstance(value, bool):
+        return ("bool", value)
+    elif isinstance(value, float):
+        return ("float", value)
+    elif value is None or isinstance(value, (str, int)):
+        return value
+    elif isinstance(value, Mapping):
+        if value.get("id") is not None:
+            return value["id"]
+        return tuple(
+            sorted(
+                (field, get_key_part(element))
+                for field, element in value.items()
+            )
+        )
+    elif isinstance(value, (list, tuple)):
+        return tuple(get_key_part(element) for element in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def load_value(function, key, args, kwargs, disk_expire=None, refresh=False):
+    """
+    Read the value for given call from the disk cache if it is enabled for
+    the function, call the function otherwise.
 
     Args:
-        function (func): The function to cache value for.
-        cache_store (dict): The cache which will contain the value to cache.
-        args, kwargs: The arguments for which a cache must be set.
+        function (func): The function to load value for.
+        key (tuple): Cache key of the call.
+        args, kwargs: The arguments of the call.
+        disk_expire (int): Time to live of the value on disk, None to keep
+            it in memory only.
+        refresh (bool): The value on disk is outdated, it must be replaced.
 
     Returns:
-        The cached value.
+        The value, not frozen nor copied.
+    """
+    disk_cache = cache_settings["disk_cache"]
+    if disk_expire is None:
+        disk_cache = None
+    if disk_cache is not None and not refresh:
+        found, value = disk_cache.get(
+            get_function_name(function), key, disk_expire
+        )
+        if found and value is not None:
+            return value
+    value = function(*args, **kwargs)
+    # A missing entity may be created soon, it is not kept on disk
+    if disk_cache is not None and value is not None:
+        disk_cache.set(get_function_name(function), key, value)
+    return value
+
+
+def store_value(cache_store, key, value):
+    """
+    Store given value as the most recently used entry of given cache store.
     """
-    returned_value = function(*args, **kwargs)
-    key = get_cache_key(args, kwargs)
     cache_store[key] = {
-        "date_accessed": datetime.datetime.now(),
-        "value": returned_value,
+        "date_created": datetime.datetime.now(),
+        "value": value,
     }
-    return get_value(cache_store, key)
+    cache_store.move_to_end(key)
 
 
-def get_value(cache_store, key):
+def get_function_name(function):
     """
-    It generates a deep copy of the requested value. It's needed because if a
-    pointer is returned, the value can be changed. Which leads to a modified
-    cache and unexpected results.
+    Returns:
+        str: Name identifying given function in the disk cache.
+    """
+    return "%s.%s" % (function.__module__, function.__name__)
+
+
+def get_returned_value(value, return_mode="copy"):
+    """
+    By default, it generates a deep copy of given cached value. The frozen
+    mode returns the read-only value, and the copy_on_write mode a view
+    copying nested values when they are read.
 
     Returns:
-        Value matching given key inside given cache store
+        The value to return to the caller of the cached function.
     """
-    value = cache_store[key]["value"]
-    return copy.deepcopy(value)
+    if return_mode == "copy":
+        return copy.deepcopy(value)
+    value = freeze(value)
+    if return_mode == "copy_on_write":
+        return copy_on_write(value)
+    return value
 
 
 def is_cache_enabled(state):
@@ -124,6 +271,8 @@ def is_cache_enabled(state):
 def is_cache_expired(memo, state, key):
     """
     Check if cache is expired (outdated) for given wrapper state and cache key.
+    The time to live is counted from the moment the value was stored, reading
+    it doesn't extend it.
 
     Args:
         memo (dict): The function cache
@@ -134,7 +283,7 @@ def is_cache_expired(memo, state, key):
         True if cache value is expired.
 
     """
-    date = memo[key]["date_accessed"]
+    date = memo[key]["date_created"]
     expire = state["expire"]
     date_to_check = date + datetime.timedelta(seconds=expire)
     return expire > 0 and date_to_check < datetime.datetime.now()
@@ -144,30 +293,47 @@ def cache(function, maxsize=300, expire=120):
     """
     Decorator that generate cache wrapper and that adds cache feature to
     target function. A max cache size and and expiration time (in seconds) can
-    be set too.
+    be set too. When the cache is full, the least recently used value is
+    evicted. The cache can be used from several threads: when a value is
+    missing or expired, only one caller fetches it while the others wait for
+    it.
 
     Args:
         function (func): Decorated function:
         maxsize: Number of value stored in cache (300 by default).
         expire: Time to live in seconds of stored value (disabled by default)
     """
-    cache_store = {}
-    state = {"enabled": True, "expire": expire, "maxsize": maxsize}
+    cache_store = OrderedDict()
+    state = {
+        "enabled": True,
+        "expire": expire,
+        "maxsize": maxsize,
+        "return_mode": None,
+        "disk_expire": None,
+    }
 
     statistics = {
         "hits": 0,
         "misses": 0,
-        "expired_hits": 0
+        "expired_hits": 0,
+        "coalesced": 0,
     }
+    lock = threading.Lock()
+    single_flight = SingleFlight()
 
     def clear_cache():
-        cache_store.clear()
+        with lock:
+            cache_store.clear()
+        disk_cache = cache_settings["disk_cache"]
+        if disk_cache is not None and state["disk_expire"] is not None:
+            disk_cache.clear(function=get_function_name(function))
 
     def get_cache_infos():
-        size = {'current_size': len(cache_store)}
-        infos = {}
-        for d in [state, statistics, size]:
-            infos.update(d)
+        with lock:
+            size = {'current_size': len(cache_store)}
+            infos = {}
+            for d in [state, statistics, size]:
+                infos.update(d)
 
         return infos
 
@@ -177,39 +343,89 @@ def cache(function, maxsize=300, expire=120):
     def set_max_size(maxsize):
         state["maxsize"] = maxsize
 
+    def set_disk_expire(disk_expire):
+        state["disk_expire"] = disk_expire
+
+    def set_function_return_mode(return_mode):
+        if return_mode is not None:
+            check_return_mode(return_mode)
+        state["return_mode"] = return_mode
+
+    def get_return_mode():
+        return state["return_mode"] or cache_settings["return_mode"]
+
     def enable_cache():
         state["enabled"] = True
 
     def disable_cache():
         state["enabled"] = False
 
+    def lookup_value(key, return_mode):
+        # Must be called with the lock held
+        if key not in cache_store or is_cache_expired(cache_store, state, key):
+            return False, None
+        cache_store.move_to_end(key)
+        value = cache_store[key]["value"]
+        if return_mode != "copy":
+            # Values stored while in copy mode are frozen once
+            value = cache_store[key]["value"] = freeze(value)
+        return True, value
+
+    def fetch_value(key, args, kwargs, return_mode):
+        # Another caller may have stored the value since the lookup
+        with lock:
+            found, value = lookup_value(key, return_mode)
+            is_expired = key in cache_store
+        if found:
+            return value
+
+        # The value on disk is at least as old as an expired one
+        value = load_value(
+            function, key, args, kwargs, state["disk_expire"], is_expired
+        )
+        if return_mode != "copy":
+            value = freeze(value)
+        with lock:
+            store_value(cache_store, key, value)
+            remove_oldest_entry(cache_store, state["maxsize"])
+        return value
+
     @wraps(function)
     def wrapper(*args, **kwargs):
 
         if is_cache_enabled(state):
             key = get_cache_key(args, kwargs)
+            return_mode = get_return_mode()
 
-            if key in cache_store:
-                if is_cache_expired(cache_store, state, key):
-                    statistics["expired_hits"] += 1
-                    return insert_value(function, cache_store, args, kwargs)
-                else:
+            with lock:
+                found, value = lookup_value(key, return_mode)
+                if found:
                     statistics["hits"] += 1
-                    return get_value(cache_store, key)
-
-            else:
-                statistics["misses"] += 1
-                returned_value = insert_value(
-                    function, cache_store, args, kwargs
+                is_expired = key in cache_store
+
+            if not found:
+                # Concurrent callers of a missing or expired value wait for
+                # the first one to fetch it instead of fetching it too. They
+                # are counted apart, they don't reach the server.
+                value, shared = single_flight.do(
+                    key, fetch_value, key, args, kwargs, return_mode
                 )
-                remove_oldest_entry(cache_store, state["maxsize"])
-                return returned_value
+                with lock:
+                    if shared:
+                        statistics["coalesced"] += 1
+                    elif is_expired:
+                        statistics["expired_hits"] += 1
+                    else:
+                        statistics["misses"] += 1
+            return get_returned_value(value, return_mode)
 
         else:
             return function(*args, **kwargs)
 
     wrapper.set_cache_expire = set_expire
     wrapper.set_cache_max_size = set_max_size
+    wrapper.set_cache_disk_expire = set_disk_expire
+    wrapper.set_cache_return_mode = set_function_return_mode
     wrapper.clear_cache = clear_cache
     wrapper.enable_cache = enable_cache
     wrapper.disable_cache = disable_cache
@@ -1,13 +1,35 @@
 import functools
+import hashlib
 import json
+import os
 import shutil
+import threading
+import time
 import urllib
 
-from .encoder import CustomJSONEncoder
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .codec import get_default_codec
+from .conditional import ValidatorStore
+from .governor import Governor, TokenBucket
+from .helpers import get_route_template
+from .media_cache import MediaCache
+from .metrics import RouteMetrics
+from .multipart import MultipartEncoder
+from .records import compact, compact_list
+from .resumable import UploadJournal, get_file_hash
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .streaming import iter_json_array
+from .token_store import TokenStore
+from .transport import RequestsTransport
 
 from .__version__ import __version__
 
 from .exception import (
+    DownloadFailedException,
+    HostUnreachableException,
     TooBigFileException,
     NotAuthenticatedException,
     NotAllowedException,
@@ -18,27 +40,115 @@ from .exception import (
     UploadFailedException,
 )
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class KitsuClient(object):
-    def __init__(self, host):
+    def __init__(
+        self,
+        host,
+        retry_policy=None,
+        pool_connections=10,
+        pool_maxsize=10,
+        connect_timeout=10,
+        read_timeout=120,
+        deadline=None,
+        governor=None,
+        transport=None,
+    ):
         self.tokens = {"access_token": "", "refresh_token": ""}
-        self.session = requests.Session()
+        self.transport = transport or RequestsTransport(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
         self.host = host
         self.event_host = host
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = new_retry_stats()
+        self.timeout = (connect_timeout, read_timeout)
+        self.deadline = deadline
+        self.validator_store = ValidatorStore()
+        self.governor = governor or Governor()
+        self.single_flight = SingleFlight()
+        self.automatic_refresh_token = True
+        self.refresh_lock = threading.Lock()
+        self.token_store = None
+        self.token_owner = None
+        self.hooks = {"on_request": [], "on_response": [], "on_error": []}
+        self.metrics = None
+        self.max_upload_bandwidth = None
+        self.resumable_uploads = None
+        self.media_cache = MediaCache()
+        self.circuit_breaker = None
+        self.compact_records = False
+        self.codec = get_default_codec()
+
+    @property
+    def session(self):
+        """
+        The requests session of the transport, None if the transport doesn't
+        use one.
+        """
+        return getattr(self.transport, "session", None)
+
+
+def create_client(
+    host,
+    retry_policy=None,
+    pool_connections=10,
+    pool_maxsize=10,
+    connect_timeout=10,
+    read_timeout=120,
+    deadline=None,
+    governor=None,
+    transport=None,
+):
+    """
+    Args:
+        host (str): Zou API url.
+        retry_policy (RetryPolicy): Policy used to retry transient failures.
+        pool_connections (int): Number of hosts for which connections are
+            kept alive.
+        pool_maxsize (int): Maximum number of connections kept alive per
+            host. Raise it when many threads share the client.
+        connect_timeout (float): Seconds allowed to establish a connection.
+        read_timeout (float): Seconds allowed between two bytes received.
+        deadline (float): Maximum duration in seconds of a whole operation,
+            retries included. Disabled by default.
+        governor (Governor): Rate and concurrency limiter. Give the same
+            governor to clients that must share a traffic budget.
+        transport: Object sending the requests. Defaults to a
+            RequestsTransport using given pool sizes.
 
+    Returns:
+        KitsuClient: A new client.
+    """
+    return KitsuClient(
+        host,
+        retry_policy=retry_policy,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        deadline=deadline,
+        governor=governor,
+        transport=transport,
+    )
 
-def create_client(host):
-    return KitsuClient(host)
+
+def new_retry_stats():
+    return {
+        "requests": 0,
+        "retries": 0,
+        "recovered": 0,
+        "gave_up": 0,
+        "retries_by_method": {},
+    }
 
 
 default_client = None
 try:
     import requests
 
-    # Little hack to allow json encoder to manage dates.
-    requests.models.complexjson.dumps = functools.partial(
-        json.dumps, cls=CustomJSONEncoder
-    )
     host = "http://gazu.change.serverhost/api"
     default_client = create_client(host)
 except:
@@ -51,12 +161,37 @@ def host_is_up(client=default_client):
         True if the host is up.
     """
     try:
-        response = client.session.head(client.host)
+        response = client.transport.request(
+            "HEAD", client.host, timeout=client.timeout
+        )
     except:
         return False
     return response.status_code == 200
 
 
+def warm_up(client=default_client, block=False):
+    """
+    Open a connection toward the host (TCP and TLS handshakes) and keep it in
+    the connection pool, so the first real request doesn't pay for it.
+    By default it runs in a background thread.
+
+    Args:
+        block (bool): Wait for the connection to be established.
+
+    Returns:
+        Thread: The thread opening the connection, None if blocking.
+    """
+    if block:
+        host_is_up(client=client)
+        return None
+    thread = threading.Thread(
+        target=host_is_up, kwargs={"client": client}, name="gazu-warm-up"
+    )
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
 def host_is_valid(client=default_client):
     """
     Check if the host is valid by simulating a fake login.
@@ -124,6 +259,379 @@ def set_tokens(new_tokens, client=default_client):
     return client.tokens
 
 
+def configure_pool(pool_connections=10, pool_maxsize=10, client=default_client):
+    """
+    Mount a connection adapter with given pool sizes on the client session.
+    Connections are kept alive and reused between requests.
+
+    Args:
+        pool_connections (int): Number of hosts for which connections are
+            kept alive.
+        pool_maxsize (int): Maximum number of connections kept alive per host.
+    """
+    return client.transport.configure_pool(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize
+    )
+
+
+def set_transport(transport, client=default_client):
+    """
+    Set the object sending the requests of given client, like a
+    RequestsTransport or a FakeZouTransport.
+    """
+    client.transport = transport
+    return client.transport
+
+
+def get_transport(client=default_client):
+    return client.transport
+
+
+def set_timeouts(connect_timeout, read_timeout, client=default_client):
+    """
+    Set the connection and read timeouts, in seconds, applied to every
+    request attempt. None means waiting forever.
+    """
+    client.timeout = (connect_timeout, read_timeout)
+    return client.timeout
+
+
+def set_deadline(deadline, client=default_client):
+    """
+    Set the maximum duration in seconds of a whole operation, retries
+    included. None disables it.
+    """
+    client.deadline = deadline
+    return client.deadline
+
+
+def set_rate_limit(
+    rate=None, burst=None, max_in_flight=None, client=default_client
+):
+    """
+    Limit the traffic sent by given client with a new governor.
+
+    Args:
+        rate (float): Maximum number of requests per second (no limit if
+            None).
+        burst (int): Number of requests allowed in a burst above the rate.
+        max_in_flight (int): Maximum number of concurrent requests (no limit
+            if None).
+
+    Returns:
+        Governor: The governor now used by the client.
+    """
+    client.governor = Governor(rate, burst, max_in_flight)
+    return client.governor
+
+
+def set_governor(governor, client=default_client):
+    """
+    Make given client go through given governor, to share it with other
+    clients.
+    """
+    client.governor = governor
+    return client.governor
+
+
+def get_throttling_infos(client=default_client):
+    """
+    Returns:
+        dict: Rate limit settings and time spent throttled by the client.
+    """
+    return client.governor.get_infos()
+
+
+def enable_request_coalescing(client=default_client):
+    """
+    Send only once identical get requests running at the same time.
+    """
+    client.single_flight = SingleFlight()
+    return client.single_flight
+
+
+def disable_request_coalescing(client=default_client):
+    """
+    Send every get request, even when an identical one is in progress.
+    """
+    client.single_flight = None
+
+
+def get_coalescing_infos(client=default_client):
+    """
+    Returns:
+        dict: Number of get requests and of requests saved because an
+        identical one was in progress. Empty if coalescing is disabled.
+    """
+    if client.single_flight is None:
+        return {}
+    return client.single_flight.get_infos()
+
+
+def set_codec(codec, client=default_client):
+    """
+    Set the JSON codec used to encode request bodies and decode responses.
+
+    Args:
+        codec: Object with a `dumps` method returning bytes and a `loads`
+            method, like StdlibCodec or OrjsonCodec.
+    """
+    client.codec = codec
+    return client.codec
+
+
+def decode_json(response, client=default_client):
+    """
+    Returns:
+        The JSON body of given response, decoded with the client codec.
+    """
+    return client.codec.loads(response.content)
+
+
+def set_compact_records(compact_records, client=default_client):
+    """
+    Make list responses return compact read-only records instead of dicts,
+    to reduce the memory used by big entity lists. Records support dict
+    read access, `to_dict` returns a mutable copy.
+
+    Args:
+        compact_records (bool): Whether list responses are compacted.
+    """
+    client.compact_records = compact_records
+    return client.compact_records
+
+
+def set_circuit_breaker(circuit_breaker, client=default_client):
+    """
+    Make given client refuse requests while its host keeps failing, instead
+    of waiting for each request to time out.
+
+    Args:
+        circuit_breaker (CircuitBreaker): The breaker to use, None to always
+            send requests.
+    """
+    client.circuit_breaker = circuit_breaker
+    return client.circuit_breaker
+
+
+def set_retry_policy(retry_policy, client=default_client):
+    """
+    Set the policy used to retry requests failing for a transient reason.
+
+    Args:
+        retry_policy (RetryPolicy): The policy to apply to given client.
+    """
+    client.retry_policy = retry_policy
+    return client.retry_policy
+
+
+def get_retry_stats(client=default_client):
+    """
+    Returns:
+        dict: Number of requests sent, retries done, requests that succeeded
+        after a retry and requests that failed once retries were exhausted.
+    """
+    return client.retry_stats
+
+
+def reset_retry_stats(client=default_client):
+    """
+    Reset retry counters of given client.
+    """
+    client.retry_stats = new_retry_stats()
+    return client.retry_stats
+
+
+def enable_conditional_get(
+    maxsize=128, max_bytes=64 * 1024 * 1024, client=default_client
+):
+    """
+    Remember validators (ETag, Last-Modified) of JSON GET responses to
+    revalidate them on next requests. Unchanged bodies are then not
+    downloaded again.
+
+    Args:
+        maxsize (int): Maximum number of stored responses.
+        max_bytes (int): Maximum cumulated size of stored bodies.
+    """
+    client.validator_store = ValidatorStore(maxsize, max_bytes)
+    return client.validator_store
+
+
+def disable_conditional_get(client=default_client):
+    """
+    Stop revalidating GET requests and drop stored responses.
+    """
+    client.validator_store = None
+
+
+def get_conditional_get_infos(client=default_client):
+    """
+    Returns:
+        dict: Number of revalidated requests, of not modified responses and
+        bytes saved. Empty if conditional requests are disabled.
+    """
+    if client.validator_store is None:
+        return {}
+    return client.validator_store.get_infos()
+
+
+def set_automatic_refresh_token(automatic_refresh_token, client=default_client):
+    """
+    Enable or disable the automatic refresh of the access token when the
+    API answers that it expired.
+    """
+    client.automatic_refresh_token = automatic_refresh_token
+    return client.automatic_refresh_token
+
+
+def refresh_token(client=default_client):
+    """
+    Get a new access token from the refresh token, without logging in again.
+    If the tokens are persisted, the stored ones are updated.
+
+    Returns:
+        dict: The new tokens.
+    """
+    headers = {}
+    if client.tokens.get("refresh_token"):
+        headers["Authorization"] = "Bearer %s" % client.tokens["refresh_token"]
+    response = send_request(
+        "GET", "auth/refresh-token", client=client, headers=headers
+    )
+    check_status(response, "auth/refresh-token")
+    tokens = dict(client.tokens)
+    tokens["access_token"] = decode_json(response, client)["access_token"]
+    client.tokens = tokens
+    if client.token_owner is not None and client.token_store is not None:
+        client.token_store.save(client.host, client.token_owner, tokens)
+    return tokens
+
+
+def set_token_store(token_store, client=default_client):
+    """
+    Set where tokens are persisted between sessions.
+
+    Args:
+        token_store (TokenStore): The store to use.
+    """
+    client.token_store = token_store
+    return client.token_store
+
+
+def get_token_store(client=default_client):
+    """
+    Returns:
+        TokenStore: Store used to persist tokens of given client. A default
+        store is created if none was set.
+    """
+    if client.token_store is None:
+        client.token_store = TokenStore()
+    return client.token_store
+
+
+def save_tokens(email, client=default_client):
+    """
+    Persist current tokens of given client for given user, and keep them
+    up to date when the access token is refreshed.
+    """
+    client.token_owner = email
+    get_token_store(client).save(client.host, email, client.tokens)
+
+
+def load_tokens(email, client=default_client):
+    """
+    Set tokens persisted for given user on current host. No request is sent:
+    if the access token expired, it is refreshed on first request.
+
+    Returns:
+        dict: The tokens, None if no tokens are stored for that user.
+    """
+    tokens = get_token_store(client).load(client.host, email)
+    if not tokens or not tokens.get("refresh_token"):
+        return None
+    client.token_owner = email
+    set_tokens(tokens, client=client)
+    return tokens
+
+
+def forget_tokens(email, client=default_client):
+    """
+    Remove tokens persisted for given user on current host.
+    """
+    if client.token_owner == email:
+        client.token_owner = None
+    get_token_store(client).delete(client.host, email)
+
+
+def add_hook(name, callback, client=default_client):
+    """
+    Register a function called for each request sent by given client,
+    retries included. The callback receives an event dict with the method,
+    the route template (path without IDs and query string), the path and
+    the attempt number. `on_response` events also get the status code, the
+    response size in bytes and the duration in seconds. `on_error` events
+    get the raised exception instead of the status.
+
+    Args:
+        name (str): on_request, on_response or on_error.
+        callback (function): Function taking the event as argument.
+    """
+    if name not in client.hooks:
+        raise ValueError("Unknown hook: %s" % name)
+    client.hooks[name].append(callback)
+    return callback
+
+
+def remove_hook(name, callback, client=default_client):
+    if callback in client.hooks.get(name, []):
+        client.hooks[name].remove(callback)
+
+
+def _call_hooks(name, event, client):
+    for callback in client.hooks[name]:
+        callback(event)
+
+
+def enable_metrics(client=default_client, metrics=None):
+    """
+    Aggregate call counts, bytes and latency histograms per route for every
+    request sent by given client.
+
+    Args:
+        metrics (RouteMetrics): Aggregator to use, a new one by default.
+
+    Returns:
+        RouteMetrics: The aggregator, dumpable as JSON.
+    """
+    disable_metrics(client=client)
+    client.metrics = metrics or RouteMetrics()
+    add_hook("on_response", client.metrics.on_response, client=client)
+    add_hook("on_error", client.metrics.on_error, client=client)
+    return client.metrics
+
+
+def disable_metrics(client=default_client):
+    if client.metrics is not None:
+        remove_hook("on_response", client.metrics.on_response, client=client)
+        remove_hook("on_error", client.metrics.on_error, client=client)
+    client.metrics = None
+
+
+def get_metrics(client=default_client):
+    """
+    Returns:
+        RouteMetrics: Aggregator of given client, None if metrics are not
+        enabled.
+    """
+    return client.metrics
+
+
+def reset_metrics(client=default_client):
+    if client.metrics is not None:
+        client.metrics.reset()
+
+
 def make_auth_header(client=default_client):
     """
     Returns:
@@ -180,37 +688,126 @@ def build_path_with_params(path, params):
 
 def get(path, json_response=True, params=None, client=default_client):
     """
-    Run a get request toward given path for configured host.
+    Run a get request toward given path for configured host. Identical get
+    requests running at the same time are sent only once: later callers
+    wait for the response of the first one. The response body is shared,
+    each caller decodes its own result from it, so callers can modify their
+    result freely.
 
     Returns:
         The request result.
     """
     path = build_path_with_params(path, params)
-    response = client.session.get(
-        get_full_url(path, client=client),
-        headers=make_auth_header(client=client)
-    )
+    if client.single_flight is None:
+        body = _get_body(path, json_response, client)
+    else:
+        key = (
+            get_full_url(path, client=client),
+            json_response,
+            client.tokens.get("access_token"),
+        )
+        body, _ = client.single_flight.do(
+            key, _get_body, path, json_response, client
+        )
+    if not json_response:
+        return body
+
+    result = client.codec.loads(body)
+    if client.compact_records and isinstance(result, list):
+        result = compact_list(result)
+    return result
+
+
+def _get_body(path, json_response, client):
+    """
+    Returns:
+        The raw body of the response (bytes), or its text if *json_response*
+        is False.
+    """
+    if json_response and client.validator_store is not None:
+        return _get_body_with_validators(
+            path, client.validator_store, client
+        )
+
+    response = send_request("GET", path, client=client)
     check_status(response, path)
 
     if json_response:
-        return response.json()
+        return response.content
     else:
         return response.text
 
 
-def post(path, data, client=default_client):
+def _get_body_with_validators(path, validator_store, client):
+    """
+    Run a conditional get request. When the server answers that the resource
+    did not change, the body stored from a previous response is used.
+    """
+    key = (get_full_url(path, client=client), client.tokens.get("access_token"))
+    headers = validator_store.get_request_headers(key)
+    response = send_request("GET", path, client=client, headers=headers)
+    check_status(response, path)
+
+    if response.status_code == 304:
+        body = validator_store.get_body(key)
+        if body is not None:
+            return body
+        response = send_request("GET", path, client=client)
+        check_status(response, path)
+
+    validator_store.store(key, response)
+    return response.content
+
+
+def iter_get(path, params=None, client=default_client, chunk_size=65536):
+    """
+    Run a get request toward given path for configured host and parse the
+    JSON array it returns while it is downloaded. Records are yielded one by
+    one, so the whole response never sits in memory.
+
+    Args:
+        path (str): The path to request.
+        params (dict): The parameters to add to the path.
+        chunk_size (int): Size of the chunks read from the connection.
+
+    Returns:
+        generator: Elements of the returned JSON array.
+    """
+    path = build_path_with_params(path, params)
+    response = send_request("GET", path, client=client, stream=True)
+    try:
+        check_status(response, path)
+        chunks = response.iter_content(chunk_size)
+        for record in iter_json_array(chunks, response.encoding or "utf-8"):
+            if client.compact_records:
+                record = compact(record)
+            yield record
+    finally:
+        response.close()
+
+
+def post(path, data, client=default_client, idempotent=False):
     """
     Run a post request toward given path for configured host.
 
+    Args:
+        idempotent (bool): Allow the request to be retried when it fails for
+            a transient reason. Set it only when sending the same request
+            twice has no side effect.
+
     Returns:
         The request result.
     """
-    response = client.session.post(
-        get_full_url(path, client), json=data,
-        headers=make_auth_header(client=client)
+    response = send_request(
+        "POST",
+        path,
+        client=client,
+        idempotent=idempotent,
+        data=client.codec.dumps(data),
+        headers=JSON_HEADERS,
     )
     check_status(response, path)
-    return response.json()
+    return decode_json(response, client)
 
 
 def put(path, data, client=default_client):
@@ -220,13 +817,15 @@ def put(path, data, client=default_client):
     Returns:
         The request result.
     """
-    response = client.session.put(
-        get_full_url(path, client),
-        json=data,
-        headers=make_auth_header(client=client)
+    response = send_request(
+        "PUT",
+        path,
+        client=client,
+        data=client.codec.dumps(data),
+        headers=JSON_HEADERS,
     )
     check_status(response, path)
-    return response.json()
+    return decode_json(response, client)
 
 
 def delete(path, params=None, client=default_client):
@@ -238,14 +837,263 @@ def delete(path, params=None, client=default_client):
     """
     path = build_path_with_params(path, params)
 
-    response = client.session.delete(
-        get_full_url(path, client),
-        headers=make_auth_header(client=client)
-    )
+    response = send_request("DELETE", path, client=client)
     check_status(response, path)
     return response.text
 
 
+def send_request(
+    method,
+    path,
+    client=default_client,
+    idempotent=None,
+    deadline=None,
+    **kwargs
+):
+    """
+    Send a request toward given path for configured host. Requests failing
+    for a transient reason (connection error, timeout, gateway errors...) are
+    retried with an exponential backoff as long as the client retry policy
+    allows it, the request is idempotent and the deadline is not reached.
+    When the client has a circuit breaker, requests are refused while the
+    host keeps failing.
+
+    Args:
+        method (str): HTTP verb.
+        path (str): The path to integrate to host url.
+        idempotent (bool): Force whether the request can be retried. By
+            default it depends on the HTTP verb.
+        deadline (float): Maximum duration in seconds of the operation,
+            retries included. Defaults to the client deadline.
+        kwargs: Extra arguments given to the session request method.
+
+    Returns:
+        Response: Request response object.
+
+    Raises:
+        HostUnreachableException: when the circuit breaker is open.
+    """
+    breaker = client.circuit_breaker
+    if breaker is None:
+        return _send_request(method, path, client, idempotent, deadline, kwargs)
+
+    if not breaker.allow():
+        raise HostUnreachableException(get_full_url(path, client=client))
+    try:
+        response = _send_request(
+            method, path, client, idempotent, deadline, kwargs
+        )
+    except (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+    ):
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.record_error()
+        raise
+    if response.status_code in [502, 503, 504]:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def _send_request(method, path, client, idempotent, deadline, kwargs):
+    url = get_full_url(path, client=client)
+    policy = client.retry_policy
+    stats = client.retry_stats
+    if idempotent is None:
+        idempotent = policy.is_idempotent(method)
+    if deadline is None:
+        deadline = client.deadline
+    end_time = None
+    if deadline is not None:
+        end_time = time.time() + deadline
+    timeout = kwargs.pop("timeout", client.timeout)
+
+    headers = make_auth_header(client=client)
+    headers.update(kwargs.pop("headers", None) or {})
+
+    stats["requests"] += 1
+    attempt = 0
+    governor = client.governor
+    refreshed = False
+    hooks = client.hooks
+    has_hooks = any(hooks.values())
+    while True:
+        governor.acquire()
+        # The body of a streamed response is read after it is returned, its
+        # slot is released when the response is closed.
+        hold = False
+        try:
+            if has_hooks:
+                event = {
+                    "method": method,
+                    "route": get_route_template(path),
+                    "path": path,
+                    "attempt": attempt,
+                }
+                _call_hooks("on_request", event, client)
+                start = time.time()
+            try:
+                response = client.transport.request(
+                    method,
+                    url,
+                    headers=headers,
+                    timeout=_cap_timeout(timeout, end_time),
+                    **kwargs
+                )
+            except Exception as exception:
+                if has_hooks:
+                    event["duration"] = time.time() - start
+                    event["error"] = type(exception).__name__
+                    event["exception"] = exception
+                    _call_hooks("on_error", event, client)
+                raise
+            if has_hooks:
+                event["duration"] = time.time() - start
+                event["status"] = response.status_code
+                event["bytes"] = _get_response_size(response, kwargs)
+                _call_hooks("on_response", event, client)
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ):
+            delay = policy.get_backoff(attempt)
+            if not (
+                idempotent
+                and policy.can_retry(attempt)
+                and _fits_deadline(delay, end_time)
+            ):
+                if attempt > 0:
+                    stats["gave_up"] += 1
+                raise
+        else:
+            if (
+                response.status_code in [401, 422]
+                and not refreshed
+                and _can_refresh_token(path, client)
+            ):
+                # The token is refreshed once the governor is released, as
+                # the refresh request goes through it too.
+                refreshed = True
+                delay = None
+            else:
+                retry_after = response.headers.get("Retry-After")
+                if response.status_code == 429 or (
+                    response.status_code == 503 and retry_after
+                ):
+                    governor.pause(policy.get_backoff(attempt, retry_after))
+
+                if not (
+                    idempotent
+                    and policy.is_retryable_status(response.status_code)
+                ):
+                    if attempt > 0:
+                        stats["recovered"] += 1
+                    hold = kwargs.get("stream", False)
+                    return response
+                delay = policy.get_backoff(attempt, retry_after)
+                if not (
+                    policy.can_retry(attempt)
+                    and _fits_deadline(delay, end_time)
+                ):
+                    stats["gave_up"] += 1
+                    hold = kwargs.get("stream", False)
+                    return response
+                response.close()
+        finally:
+            if hold:
+                governor.release_on_close(response)
+            else:
+                governor.release()
+
+        if delay is None:
+            if not _refresh_expired_token(headers, client):
+                return response
+            response.close()
+            _rewind_body(kwargs)
+            continue
+
+        stats["retries"] += 1
+        by_method = stats["retries_by_method"]
+        by_method[method] = by_method.get(method, 0) + 1
+        time.sleep(delay)
+        _rewind_body(kwargs)
+        attempt += 1
+
+
+def _get_response_size(response, kwargs):
+    if not kwargs.get("stream"):
+        return len(response.content)
+    try:
+        return int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+def _can_refresh_token(path, client):
+    return (
+        client.automatic_refresh_token
+        and bool(client.tokens.get("refresh_token"))
+        and not path.lstrip("/").startswith("auth/")
+    )
+
+
+def _refresh_expired_token(headers, client):
+    """
+    Refresh the access token after an authentication error. When several
+    threads get the error at the same time, the token is refreshed only once.
+
+    Returns:
+        bool: True if the request can be sent again with a new token.
+    """
+    sent_header = headers.get("Authorization")
+    with client.refresh_lock:
+        current_header = make_auth_header(client=client).get("Authorization")
+        if current_header == sent_header:
+            try:
+                refresh_token(client=client)
+            except Exception:
+                return False
+    headers.update(make_auth_header(client=client))
+    return True
+
+
+def _rewind_body(kwargs):
+    """
+    Make files and streamed body ready to be sent again.
+    """
+    for file_object in (kwargs.get("files") or {}).values():
+        if hasattr(file_object, "seek"):
+            file_object.seek(0)
+    if hasattr(kwargs.get("data"), "rewind"):
+        kwargs["data"].rewind()
+
+
+def _fits_deadline(delay, end_time):
+    return end_time is None or time.time() + delay < end_time
+
+
+def _cap_timeout(timeout, end_time):
+    """
+    Make sure a single attempt does not wait beyond the operation deadline.
+    """
+    if end_time is None:
+        return timeout
+    remaining = max(end_time - time.time(), 0.001)
+    if isinstance(timeout, tuple):
+        return tuple(
+            remaining if value is None else min(value, remaining)
+            for value in timeout
+        )
+    elif timeout is None:
+        return remaining
+    else:
+        return min(timeout, remaining)
+
+
 def check_status(request, path):
     """
     Raise an exception related to status code, if the status code does not match
@@ -264,7 +1112,7 @@ def check_status(request, path):
         NotAllowedException: when 403 response occurs
         MethodNotAllowedException: when 405 response occurs
         TooBigFileException: when 413 response occurs
-        ServerErrorException: when 500 response occurs
+        ServerErrorException: when 500, 502, 503 or 504 response occurs
     """
     status_code = request.status_code
     if status_code == 404:
@@ -283,7 +1131,7 @@ def check_status(request, path):
         )
     elif status_code in [401, 422]:
         raise NotAuthenticatedException(path)
-    elif status_code in [500, 502]:
+    elif status_code in [500, 502, 503, 504]:
         try:
             stacktrace = request.json().get(
                 "stacktrace", "No stacktrace sent by the server"
@@ -312,6 +1160,123 @@ def fetch_all(path, params=None, client=default_client):
     return get(url_path_join("data", path), params=params, client=client)
 
 
+def iter_all(path, params=None, client=default_client):
+    """
+    Args:
+        path (str): The path for which we want to retrieve all entries.
+
+    Returns:
+        generator: All entries stored in database for a given model, yielded
+        one at a time while the response is downloaded.
+    """
+    return iter_get(url_path_join("data", path), params=params, client=client)
+
+
+def iter_pages(
+    path,
+    params=None,
+    pagination="page",
+    page_size=None,
+    page_param="page",
+    first_page=1,
+    cursor_param="before",
+    cursor_field="created_at",
+    prefetch=False,
+    client=default_client,
+):
+    """
+    Walk through a paged route and yield its pages one after the other.
+    Two kinds of pagination are supported:
+
+    * page: the page number is sent through *page_param*, starting from
+      *first_page*.
+    * cursor: the value of *cursor_field* of the last record of a page is
+      sent through *cursor_param* to get the next page (for instance
+      `before` with the `created_at` date of the last event).
+
+    Iteration stops on an empty page, on a page shorter than *page_size* or
+    when the server sends the same page again.
+
+    Args:
+        path (str): The paged path.
+        params (dict): Extra parameters sent with every page request.
+        pagination (str): "page" or "cursor".
+        page_size (int): Expected number of records of a full page.
+        prefetch (bool): Request the next page in a background thread while
+            the caller processes the current one.
+
+    Returns:
+        generator: Pages (lists of records).
+    """
+    if pagination not in ["page", "cursor"]:
+        raise ValueError("Unknown pagination type: %s" % pagination)
+
+    def fetch(page_params):
+        return get(path, params=page_params, client=client)
+
+    def get_next_params(page, page_params):
+        next_params = dict(page_params)
+        if pagination == "page":
+            next_params[page_param] = page_params[page_param] + 1
+        else:
+            cursor = page[-1].get(cursor_field)
+            if cursor is None or cursor == page_params.get(cursor_param):
+                return None
+            next_params[cursor_param] = cursor
+        return next_params
+
+    page_params = dict(params or {})
+    if pagination == "page":
+        page_params[page_param] = first_page
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        pending = _submit_page(executor, fetch, page_params)
+        previous_page = None
+        while pending is not None:
+            page = pending()
+            if len(page) == 0 or page == previous_page:
+                return
+
+            next_params = get_next_params(page, page_params)
+            if next_params is None or (
+                page_size is not None and len(page) < page_size
+            ):
+                pending = None
+            else:
+                pending = _submit_page(executor, fetch, next_params)
+                page_params = next_params
+            previous_page = page
+            yield page
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def _submit_page(executor, fetch, page_params):
+    """
+    Returns:
+        func: Callable returning the page, fetched in background when an
+        executor is given.
+    """
+    if executor is None:
+        return functools.partial(fetch, page_params)
+    return executor.submit(fetch, page_params).result
+
+
+def paginate(path, params=None, client=default_client, **kwargs):
+    """
+    Same as iter_pages but records are yielded one by one, so a full scan of
+    a paged route is a single loop.
+
+    Returns:
+        generator: Records of every page.
+    """
+    for page in iter_pages(path, params=params, client=client, **kwargs):
+        for record in page:
+            yield record
+
+
 def fetch_first(path, params=None, client=default_client):
     """
     Args:
@@ -341,6 +1306,90 @@ def fetch_one(model_name, id, client=default_client):
     return get(url_path_join("data", model_name, id), client=client)
 
 
+def fetch_many(
+    model_name, ids, client=default_client, max_workers=8, batch_size=50
+):
+    """
+    Function dedicated at retrieving many model instances at once. IDs are
+    requested by batches through the list route, filtered on a JSON list of
+    IDs (`data/<model>?id=[...]`). Batches run in parallel through a bounded
+    pool of workers, each ID being requested only once. If the server can't
+    filter the route that way, instances are requested one by one.
+
+    Args:
+        model_name (str): Model type name.
+        ids (list): Model instance IDs.
+        max_workers (int): Maximum number of requests run at the same time.
+        batch_size (int): Maximum number of IDs per request, it keeps the
+            URL short enough for the server.
+
+    Returns:
+        tuple: Two lists, the model instances found, in the same order as the
+        given IDs, and the IDs for which no instance exists.
+    """
+    unique_ids = list(OrderedDict.fromkeys(ids))
+    if len(unique_ids) == 0:
+        return [], []
+    batches = [
+        unique_ids[index : index + batch_size]
+        for index in range(0, len(unique_ids), batch_size)
+    ]
+    instances = {}
+
+    def fetch_batch(batch):
+        try:
+            rows = get(
+                url_path_join("data", model_name),
+                params={"id": json.dumps(batch)},
+                client=client,
+            )
+        except (
+            NotAllowedException,
+            ParameterException,
+            RouteNotFoundException,
+        ):
+            return False
+        requested = set(batch)
+        if not isinstance(rows, list) or any(
+            row["id"] not in requested for row in rows
+        ):
+            # The filter was ignored
+            return False
+        for row in rows:
+            instances[row["id"]] = row
+        return True
+
+    def fetch(id):
+        try:
+            return fetch_one(model_name, id, client=client)
+        except RouteNotFoundException:
+            return None
+
+    # The first batch tells if the route supports the filter
+    pending = unique_ids
+    if fetch_batch(batches[0]):
+        workers = max(1, min(max_workers, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = [
+                id
+                for batch, fetched in zip(
+                    batches[1:], executor.map(fetch_batch, batches[1:])
+                )
+                if not fetched
+                for id in batch
+            ]
+    if pending:
+        workers = max(1, min(max_workers, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for id, instance in zip(pending, executor.map(fetch, pending)):
+                if instance is not None:
+                    instances[id] = instance
+
+    found = [instances[id] for id in ids if id in instances]
+    missing = [id for id in unique_ids if id not in instances]
+    return found, missing
+
+
 def create(model_name, data, client=default_client):
     """
     Create an entry for given model and data.
@@ -351,62 +1400,662 @@ def create(model_name, data, client=default_client):
     return post(url_path_join("data", model_name), data, client=client)
 
 
-def upload(path, file_path, data={}, extra_files=[], client=default_client):
+def upload(
+    path,
+    file_path,
+    data={},
+    extra_files=[],
+    client=default_client,
+    progress_callback=None,
+    max_bandwidth=None,
+):
     """
-    Upload file located at *file_path* to given url *path*.
+    Upload file located at *file_path* to given url *path*. Files are
+    streamed from the disk instead of being loaded in memory.
 
     Args:
         path (str): The url path to upload file.
         file_path (str): The file location on the hard drive.
+        data (dict): Form fields sent along with the files.
+        extra_files (list): Locations of other files to send.
+        progress_callback (function): Called with the number of bytes sent
+            and the total number of bytes while uploading.
+        max_bandwidth (int): Maximum upload speed in bytes per second.
+            Defaults to the client upload bandwidth limit.
 
     Returns:
         Response: Request response object.
     """
-    url = get_full_url(path, client)
-    files = _build_file_dict(file_path, extra_files)
-    response = client.session.post(
-        url,
-        data=data,
-        headers=make_auth_header(client=client),
-        files=files
+    if max_bandwidth is None:
+        max_bandwidth = client.max_upload_bandwidth
+    encoder = MultipartEncoder(
+        data,
+        _build_file_dict(file_path, extra_files),
+        progress_callback=progress_callback,
+        max_bandwidth=max_bandwidth,
     )
+    with encoder:
+        response = send_request(
+            "POST",
+            path,
+            client=client,
+            data=encoder,
+            headers={"Content-Type": encoder.content_type},
+        )
     check_status(response, path)
-    result = response.json()
+    result = decode_json(response, client)
     if "message" in result:
         raise UploadFailedException(result["message"])
     return result
 
 
 def _build_file_dict(file_path, extra_files):
-    files = {"file": open(file_path, "rb")}
+    files = {"file": file_path}
     i = 2
     for file_path in extra_files:
-        files["file-%s" % i] = open(file_path, "rb")
+        files["file-%s" % i] = file_path
         i += 1
     return files
 
 
-def download(path, file_path, client=default_client):
+def upload_resumable(
+    path,
+    file_path,
+    data={},
+    client=default_client,
+    chunk_size=8 * 1024 * 1024,
+    progress_callback=None,
+    max_bandwidth=None,
+    max_resumes=5,
+    journal=None,
+):
+    """
+    Upload file located at *file_path* to given url *path* chunk by chunk.
+    The progress is recorded in an upload journal: when the connection
+    drops, the upload restarts from the last chunk received by the server,
+    within this call or in a later one for the same file. If the server
+    doesn't support resumable uploads, the file is sent in a single request.
+    The support is checked once per client with an OPTIONS request, before
+    the file is hashed.
+
+    The server protocol is the following:
+        POST <path>/resumable with size, hash and file name as JSON, returns
+            the upload id.
+        GET <path>/resumable/<upload id> returns the received offset.
+        PUT <path>/resumable/<upload id> with a Content-Range header sends a
+            chunk and returns the new offset.
+        POST <path>/resumable/<upload id>/complete finishes the upload and
+            returns the same result as a regular upload.
+
+    Args:
+        path (str): The url path to upload file.
+        file_path (str): The file location on the hard drive.
+        data (dict): Form fields sent along with the file.
+        chunk_size (int): Size of each chunk in bytes.
+        progress_callback (function): Called with the number of bytes
+            received by the server and the file size after each chunk.
+        max_bandwidth (int): Maximum upload speed in bytes per second.
+            Defaults to the client upload bandwidth limit.
+        max_resumes (int): Number of times the upload is resumed after a
+            failure before giving up.
+        journal (UploadJournal): Journal of uploads in progress.
+
+    Returns:
+        dict: The upload result.
+    """
+    if max_bandwidth is None:
+        max_bandwidth = client.max_upload_bandwidth
+    resumable_path = url_path_join(path, "resumable")
+    if client.resumable_uploads is None:
+        _check_resumable_uploads(resumable_path, client)
+    if client.resumable_uploads is False:
+        return upload(
+            path,
+            file_path,
+            data=data,
+            client=client,
+            progress_callback=progress_callback,
+            max_bandwidth=max_bandwidth,
+        )
+    journal = journal or UploadJournal()
+    file_size = os.path.getsize(file_path)
+    file_hash = get_file_hash(file_path)
+    url = get_full_url(path, client=client)
+
+    upload_id = None
+    offset = 0
+    entry = journal.get(file_hash)
+    if entry is not None and entry["url"] == url:
+        upload_id = entry["upload_id"]
+        offset = _get_upload_offset(resumable_path, upload_id, client)
+        if offset is None:
+            upload_id = None
+
+    if upload_id is None:
+        upload_data = dict(data)
+        upload_data.update(
+            {
+                "size": file_size,
+                "hash": file_hash,
+                "file_name": os.path.basename(file_path),
+            }
+        )
+        response = send_request(
+            "POST",
+            resumable_path,
+            client=client,
+            data=client.codec.dumps(upload_data),
+            headers=JSON_HEADERS,
+        )
+        if response.status_code in [404, 405]:
+            response.close()
+            client.resumable_uploads = False
+            return upload(
+                path,
+                file_path,
+                data=data,
+                client=client,
+                progress_callback=progress_callback,
+                max_bandwidth=max_bandwidth,
+            )
+        check_status(response, resumable_path)
+        client.resumable_uploads = True
+        upload_id = decode_json(response, client)["upload_id"]
+        offset = 0
+        journal.save(file_hash, {"url": url, "upload_id": upload_id})
+
+    upload_path = url_path_join(resumable_path, upload_id)
+    bucket = TokenBucket(max_bandwidth) if max_bandwidth else None
+    resumes = 0
+    with open(file_path, "rb") as file_object:
+        while offset < file_size:
+            file_object.seek(offset)
+            chunk = file_object.read(chunk_size)
+            if bucket is not None:
+                bucket.acquire(len(chunk))
+            try:
+                response = send_request(
+                    "PUT",
+                    upload_path,
+                    client=client,
+                    data=chunk,
+                    headers={
+                        "Content-Type": "application/octet-stream",
+                        "Content-Range": "bytes %s-%s/%s"
+                        % (offset, offset + len(chunk) - 1, file_size),
+                    },
+                )
+                check_status(response, upload_path)
+                offset = decode_json(response, client)["offset"]
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                ServerErrorException,
+            ):
+                if resumes >= max_resumes:
+                    raise
+                resumes += 1
+                offset = _get_upload_offset(resumable_path, upload_id, client)
+                if offset is None:
+                    journal.remove(file_hash)
+                    raise
+                continue
+            if progress_callback is not None:
+                progress_callback(offset, file_size)
+
+    complete_path = url_path_join(upload_path, "complete")
+    response = send_request(
+        "POST", complete_path, client=client, idempotent=True
+    )
+    check_status(response, complete_path)
+    journal.remove(file_hash)
+    result = decode_json(response, client)
+    if "message" in result:
+        raise UploadFailedException(result["message"])
+    return result
+
+
+def _check_resumable_uploads(resumable_path, client):
+    """
+    Ask the server if it has the resumable upload route, so files are not
+    hashed for nothing. The answer is kept on the client. It stays unknown
+    if the server answers something else than a route not found.
+    """
+    response = send_request("OPTIONS", resumable_path, client=client)
+    response.close()
+    if response.status_code in [404, 405]:
+        client.resumable_uploads = False
+    elif response.status_code < 300:
+        client.resumable_uploads = True
+    return client.resumable_uploads
+
+
+def _get_upload_offset(resumable_path, upload_id, client):
+    """
+    Returns:
+        int: Number of bytes of given upload received by the server, None if
+        the server doesn't know that upload anymore.
+    """
+    path = url_path_join(resumable_path, upload_id)
+    response = send_request("GET", path, client=client)
+    if response.status_code == 404:
+        response.close()
+        return None
+    check_status(response, path)
+    return decode_json(response, client)["offset"]
+
+
+def set_upload_bandwidth(max_bandwidth, client=default_client):
+    """
+    Limit the upload speed of given client, to avoid saturating slow links.
+
+    Args:
+        max_bandwidth (int): Maximum number of bytes sent per second, None
+            to remove the limit.
+    """
+    client.max_upload_bandwidth = max_bandwidth
+    return client.max_upload_bandwidth
+
+
+def download(
+    path,
+    file_path,
+    client=default_client,
+    max_connections=4,
+    segment_size=8 * 1024 * 1024,
+    checksum=None,
+    checksum_algorithm="md5",
+    progress_callback=None,
+):
     """
     Download file located at *file_path* to given url *path*.
 
+    When the server advertises byte ranges, big files are split in segments
+    downloaded in parallel into a preallocated `.part` file. Completed
+    segments are listed in a `.part.json` file next to it, so an interrupted
+    download resumes where it stopped. Otherwise the file is streamed through
+    a single connection, resuming a previous `.part` file when possible.
+    Both modes resume only with the state written by the same mode, and only
+    if the file didn't change on the server. The file is moved to its final
+    location once its size (and checksum, if given) are verified.
+
     Args:
         path (str): The url path to download file from.
         file_path (str): The location to store the file on the hard drive.
+        max_connections (int): Number of parallel connections. 1 disables
+            ranged downloads and saves the initial HEAD request.
+        segment_size (int): Size of the segments downloaded in parallel.
+        checksum (str): Expected hex digest of the file.
+        checksum_algorithm (str): Hash algorithm of the checksum.
+        progress_callback (function): Called with the number of bytes
+            downloaded and the file size (None if unknown).
 
     Returns:
-        Response: Request response object.
+        Response: Response of the GET request (of the first segment
+        downloaded in segmented mode). Its body is already consumed.
+
+    Raises:
+        DownloadFailedException: when the file size or checksum is wrong, or
+            when the file changed on the server during a segmented download.
+    """
+    part_path = file_path + ".part"
+    state_path = part_path + ".json"
+    response = None
+    size = None
+    if max_connections > 1:
+        response = send_request("HEAD", path, client=client)
+        response.close()
+        size = _get_content_length(response)
+
+    if (
+        response is not None
+        and response.status_code == 200
+        and response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        and size is not None
+        and size > segment_size
+    ):
+        response = _download_segments(
+            path,
+            part_path,
+            state_path,
+            size,
+            _get_validator(response),
+            max_connections,
+            segment_size,
+            progress_callback,
+            client,
+        ) or response
+    else:
+        response, size = _download_stream(
+            path, part_path, state_path, progress_callback, client
+        )
+
+    _verify_download(part_path, size, checksum, checksum_algorithm, path)
+    os.replace(part_path, file_path)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return response
+
+
+def _download_segments(
+    path,
+    part_path,
+    state_path,
+    size,
+    validator,
+    max_connections,
+    segment_size,
+    progress_callback,
+    client,
+):
+    """
+    Download given file by byte ranges in parallel, skipping the segments
+    already downloaded by a previous call for the same file version.
+
+    Returns:
+        Response: Response of the first segment downloaded, None if every
+        segment was downloaded by a previous call.
+    """
+    state = _read_download_state(state_path) or {}
+    if (
+        state.get("mode") != "segments"
+        or state.get("size") != size
+        or state.get("validator") != validator
+        or state.get("segment_size") != segment_size
+        or not isinstance(state.get("done"), list)
+        or not os.path.exists(part_path)
+        or os.path.getsize(part_path) != size
+    ):
+        state = {
+            "mode": "segments",
+            "size": size,
+            "validator": validator,
+            "segment_size": segment_size,
+            "done": [],
+        }
+        with open(part_path, "wb") as part_file:
+            part_file.truncate(size)
+        _write_download_state(state_path, state)
+
+    segments = [
+        (start, min(start + segment_size, size) - 1)
+        for start in range(0, size, segment_size)
+    ]
+    done = set(state["done"])
+    pending = [index for index in range(len(segments)) if index not in done]
+    lock = threading.Lock()
+    progress = {"bytes": sum(
+        segments[index][1] - segments[index][0] + 1 for index in done
+    )}
+    responses = {}
+    changed = []
+
+    def download_segment(index):
+        start, end = segments[index]
+        policy = client.retry_policy
+        attempt = 0
+        while True:
+            try:
+                response, complete = _download_range(
+                    path, part_path, start, end, validator, client
+                )
+                if response.status_code != 206:
+                    # With If-Range, a full response means the file changed
+                    changed.append(index)
+                    raise DownloadFailedException(
+                        "%s: the file changed on the server" % path
+                    )
+                responses[index] = response
+                if complete:
+                    break
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout,
+            ):
+                if not policy.can_retry(attempt):
+                    raise
+            if not policy.can_retry(attempt):
+                raise DownloadFailedException(
+                    "%s: incomplete range %s-%s" % (path, start, end)
+                )
+            time.sleep(policy.get_backoff(attempt))
+            attempt += 1
+
+        with lock:
+            state["done"].append(index)
+            _write_download_state(state_path, state)
+            progress["bytes"] += end - start + 1
+            if progress_callback is not None:
+                progress_callback(progress["bytes"], size)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_connections) as executor:
+            for _ in executor.map(download_segment, pending):
+                pass
+    except DownloadFailedException:
+        if changed:
+            # Segments of another version can't be mixed, start over on
+            # next call
+            for outdated_path in [part_path, state_path]:
+                if os.path.exists(outdated_path):
+                    os.remove(outdated_path)
+        raise
+    if responses:
+        return responses[min(responses)]
+    return None
+
+
+def _download_range(path, part_path, start, end, validator, client):
+    """
+    Write bytes *start* to *end* of given file at the same position in the
+    part file. The server sends the range only if the file still matches
+    given validator (ETag or Last-Modified).
+
+    Returns:
+        tuple: The response, and True if the whole range was received.
+        Nothing is written if the file changed (the status is then 200).
+    """
+    headers = {
+        "Range": "bytes=%s-%s" % (start, end),
+        "Accept-Encoding": "identity",
+    }
+    if validator is not None:
+        headers["If-Range"] = validator
+    with send_request(
+        "GET", path, client=client, stream=True, headers=headers
+    ) as response:
+        check_status(response, path)
+        if response.status_code != 206:
+            if validator is not None:
+                return response, False
+            raise DownloadFailedException(
+                "%s: the server ignored the Range header" % path
+            )
+        written = 0
+        with open(part_path, "r+b") as part_file:
+            part_file.seek(start)
+            for chunk in response.iter_content(chunk_size=65536):
+                part_file.write(chunk)
+                written += len(chunk)
+    return response, written == end - start + 1
+
+
+def _download_stream(path, part_path, state_path, progress_callback, client):
+    """
+    Download given file through a single connection. A part file left by a
+    previous call is completed if the file didn't change meanwhile.
 
+    Returns:
+        tuple: The response and the file size (None if unknown).
     """
-    url = get_full_url(path, client)
-    with client.session.get(
-        url,
-        headers=make_auth_header(client=client),
-        stream=True
+    headers = {"Accept-Encoding": "identity"}
+    state = _read_download_state(state_path) or {}
+    offset = 0
+    if (
+        os.path.exists(part_path)
+        and state.get("mode") == "stream"
+        and state.get("validator")
+    ):
+        offset = os.path.getsize(part_path)
+        headers["Range"] = "bytes=%s-" % offset
+        headers["If-Range"] = state["validator"]
+
+    with send_request(
+        "GET", path, client=client, stream=True, headers=headers
     ) as response:
-        with open(file_path, "wb") as target_file:
-            shutil.copyfileobj(response.raw, target_file)
-        return response
+        if response.status_code == 416:
+            os.remove(part_path)
+            return _download_stream(
+                path, part_path, state_path, progress_callback, client
+            )
+        check_status(response, path)
+        if response.status_code == 206:
+            mode = "ab"
+            size = _get_range_total(response)
+        else:
+            mode = "wb"
+            offset = 0
+            size = _get_content_length(response)
+            _write_download_state(
+                state_path,
+                {"mode": "stream", "validator": _get_validator(response)},
+            )
+
+        received = offset
+        with open(part_path, mode) as part_file:
+            for chunk in response.iter_content(chunk_size=65536):
+                part_file.write(chunk)
+                received += len(chunk)
+                if progress_callback is not None:
+                    progress_callback(received, size)
+    return response, size
+
+
+def _verify_download(part_path, size, checksum, checksum_algorithm, path):
+    if size is not None and os.path.getsize(part_path) != size:
+        raise DownloadFailedException(
+            "%s: expected %s bytes, got %s"
+            % (path, size, os.path.getsize(part_path))
+        )
+    if checksum is not None:
+        file_hash = hashlib.new(checksum_algorithm)
+        with open(part_path, "rb") as part_file:
+            for chunk in iter(lambda: part_file.read(1024 * 1024), b""):
+                file_hash.update(chunk)
+        if file_hash.hexdigest().lower() != checksum.lower():
+            for corrupted_path in [part_path, part_path + ".json"]:
+                if os.path.exists(corrupted_path):
+                    os.remove(corrupted_path)
+            raise DownloadFailedException("%s: checksum mismatch" % path)
+
+
+def _get_content_length(response):
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _get_range_total(response):
+    content_range = response.headers.get("Content-Range", "")
+    try:
+        return int(content_range.rsplit("/", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _get_validator(response):
+    return response.headers.get("ETag") or response.headers.get(
+        "Last-Modified"
+    )
+
+
+def _read_download_state(state_path):
+    try:
+        with open(state_path, "r") as state_file:
+            return json.load(state_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_download_state(state_path, state):
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w") as state_file:
+        json.dump(state, state_file)
+    os.replace(tmp_path, state_path)
+
+
+def set_media_cache(media_cache, client=default_client):
+    """
+    Set the local cache used for media files (thumbnails, previews...).
+
+    Args:
+        media_cache (MediaCache): The cache to use, None to disable it.
+    """
+    client.media_cache = media_cache
+    return client.media_cache
+
+
+def get_media_cache(client=default_client):
+    """
+    Returns:
+        MediaCache: The media cache of given client, None if disabled.
+    """
+    return client.media_cache
+
+
+def download_cached(path, file_path, key=None, client=default_client):
+    """
+    Download file located at given url *path* through the media cache: the
+    file is requested only if it is not already cached on this workstation.
+    Only immutable files should be cached, or *key* must change when the
+    file changes.
+
+    Args:
+        path (str): The url path to download file from.
+        file_path (str): The location to store the file on the hard drive.
+        key (str): Key identifying the file content. Defaults to the path.
+
+    Returns:
+        str: The file location.
+    """
+    if client.media_cache is None:
+        download(path, file_path, client=client, max_connections=1)
+        return file_path
+    cached_path = _fetch_media(path, key, client)
+    shutil.copyfile(cached_path, file_path)
+    return file_path
+
+
+def get_media_data(path, key=None, cache=True, client=default_client):
+    """
+    Like download_cached, but return the file content.
+
+    Args:
+        path (str): The url path to download file from.
+        key (str): Key identifying the file content. Defaults to the path.
+        cache (bool): Set to False for files that can change, like avatars,
+            when no key changing with them is available.
+
+    Returns:
+        bytes: The file content.
+    """
+    if client.media_cache is None or not cache:
+        response = send_request("GET", path, client=client)
+        check_status(response, path)
+        return response.content
+    with open(_fetch_media(path, key, client), "rb") as cached_file:
+        return cached_file.read()
+
+
+def _fetch_media(path, key, client):
+    return client.media_cache.fetch(
+        key or path,
+        lambda tmp_path: download(
+            path, tmp_path, client=client, max_connections=1
+        ),
+    )
 
 
 def get_file_data_from_url(url, full=False, client=default_client):
@@ -414,12 +2063,9 @@ def get_file_data_from_url(url, full=False, client=default_client):
     Return data found at given url.
     """
     if not full:
-        url = get_full_url(url)
-    response = requests.get(
-        url,
-        stream=True,
-        headers=make_auth_header(client=client),
-        client=client
+        url = get_full_url(url, client=client)
+    response = client.transport.request(
+        "GET", url, stream=True, headers=make_auth_header(client=client)
     )
     check_status(response, url)
     return response
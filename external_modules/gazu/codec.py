@@ -0,0 +1,75 @@
+import datetime
+import json
+
+from .encoder import CustomJSONEncoder
+from .records import Record
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibCodec(object):
+    """
+    JSON codec based on the json module of the standard library. Dates and
+    records are serialized through CustomJSONEncoder.
+    """
+
+    name = "json"
+
+    def dumps(self, data):
+        """
+        Returns:
+            bytes: Given data encoded as JSON.
+        """
+        return json.dumps(data, cls=CustomJSONEncoder).encode("utf-8")
+
+    def loads(self, data):
+        """
+        Args:
+            data (bytes / str): A JSON document.
+
+        Returns:
+            The decoded document.
+        """
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return json.loads(data)
+
+
+class OrjsonCodec(object):
+    """
+    JSON codec based on orjson, several times faster than the standard
+    library for big payloads. Dates are serialized natively, in the same ISO
+    format as CustomJSONEncoder.
+    """
+
+    name = "orjson"
+
+    def dumps(self, data):
+        return orjson.dumps(
+            data, default=_default, option=orjson.OPT_NON_STR_KEYS
+        )
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def _default(obj):
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    raise TypeError("Object of type %s is not JSON serializable" % type(obj))
+
+
+def get_default_codec():
+    """
+    Returns:
+        The fastest JSON codec available: orjson if it is installed,
+        the standard library otherwise.
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    return StdlibCodec()
@@ -0,0 +1,108 @@
+import threading
+
+from collections import OrderedDict
+
+
+class ValidatorStore(object):
+    """
+    Bounded store of response bodies and their validators (ETag and
+    Last-Modified headers), used to revalidate GET requests. When the server
+    answers 304 Not Modified, the stored body is used instead of downloading
+    it again. Least recently used entries are dropped first.
+
+    Args:
+        maxsize (int): Maximum number of stored responses.
+        max_bytes (int): Maximum cumulated size of stored bodies.
+    """
+
+    def __init__(self, maxsize=128, max_bytes=64 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.statistics = {
+            "requests": 0,
+            "not_modified": 0,
+            "bytes_saved": 0,
+        }
+
+    def get_request_headers(self, key):
+        """
+        Returns:
+            dict: Conditional headers to send for given key.
+        """
+        headers = {}
+        with self.lock:
+            self.statistics["requests"] += 1
+            entry = self.entries.get(key)
+            if entry is None:
+                return headers
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_body(self, key):
+        """
+        Mark the stored body for given key as not modified and return it.
+
+        Returns:
+            bytes: The stored body, None if it was evicted meanwhile.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            self.statistics["not_modified"] += 1
+            self.statistics["bytes_saved"] += len(entry["body"])
+            return entry["body"]
+
+    def store(self, key, response):
+        """
+        Store the body of given response if it comes with validators.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        body = response.content
+        with self.lock:
+            self._remove(key)
+            if not (etag or last_modified) or len(body) > self.max_bytes:
+                return
+            self.entries[key] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "body": body,
+            }
+            self.size += len(body)
+            while (
+                len(self.entries) > self.maxsize or self.size > self.max_bytes
+            ):
+                self._remove(next(iter(self.entries)))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def get_infos(self):
+        """
+        Returns:
+            dict: Store statistics and current size.
+        """
+        with self.lock:
+            infos = {
+                "maxsize": self.maxsize,
+                "max_bytes": self.max_bytes,
+                "current_size": len(self.entries),
+                "current_bytes": self.size,
+            }
+            infos.update(self.statistics)
+        return infos
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry["body"])
@@ -0,0 +1,232 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .codec import get_default_codec
+from .helpers import get_data_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    function TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, function, key)
+)
+"""
+
+INDEX = """
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)
+"""
+
+
+class DiskCache(object):
+    """
+    Second tier of the cache decorator, stored in a SQLite database shared by
+    every process of the workstation, so cached values survive the session
+    that fetched them. Entries are namespaced by host, user and project: a
+    value cached for a user is never read for another one. When the database
+    grows over its size budget, the least recently used entries are removed.
+
+    Disk errors (locked or read-only database, full disk) are treated as
+    cache misses, they never make the cached function fail.
+
+    Args:
+        path (str): Location of the database. Defaults to cache.sqlite in
+            the gazu data folder.
+        max_size (int): Size budget in bytes of the stored values.
+        expire (int): Default time to live in seconds of stored values, 0
+            to keep them until they are evicted.
+    """
+
+    def __init__(self, path=None, max_size=128 * 1024 * 1024, expire=3600):
+        self.path = path or os.path.join(get_data_dir(), "cache.sqlite")
+        self.max_size = max_size
+        self.expire = expire
+        self.namespace = ""
+        self.codec = get_default_codec()
+        self.lock = threading.Lock()
+        self.statistics = {"hits": 0, "misses": 0, "errors": 0}
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(SCHEMA)
+            connection.execute(INDEX)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def set_namespace(self, host, user=None, project=None):
+        """
+        Set the host, user and project values are read and stored for.
+        """
+        self.namespace = json.dumps([host, user, project])
+        return self.namespace
+
+    def get(self, function, key, expire=None):
+        """
+        Args:
+            function (str): Name of the cached function.
+            key (tuple): Cache key of the call.
+            expire (int): Time to live in seconds, the default one if None.
+
+        Returns:
+            tuple: Whether a value was found, and the value.
+        """
+        expire = self.expire if expire is None else expire
+        encoded_key = _encode_key(key)
+        row = None
+        if encoded_key is not None:
+            try:
+                with self._connect() as connection:
+                    row = connection.execute(
+                        "SELECT value, created_at FROM entries "
+                        "WHERE namespace = ? AND function = ? AND key = ?",
+                        (self.namespace, function, encoded_key),
+                    ).fetchone()
+                    if row is not None and not (
+                        expire > 0 and row[1] + expire < time.time()
+                    ):
+                        connection.execute(
+                            "UPDATE entries SET accessed_at = ? "
+                            "WHERE namespace = ? AND function = ? "
+                            "AND key = ?",
+                            (
+                                time.time(),
+                                self.namespace,
+                                function,
+                                encoded_key,
+                            ),
+                        )
+                    else:
+                        row = None
+            except sqlite3.Error:
+                self._count("errors")
+                row = None
+        value = None
+        if row is not None:
+            try:
+                value = self.codec.loads(row[0])
+            except ValueError:
+                row = None
+        if row is None:
+            self._count("misses")
+            return False, None
+        self._count("hits")
+        return True, value
+
+    def set(self, function, key, value):
+        """
+        Store the value returned by a call of given function.
+
+        Returns:
+            bool: False if the value could not be stored.
+        """
+        encoded_key = _encode_key(key)
+        if encoded_key is None:
+            return False
+        try:
+            data = self.codec.dumps(value)
+        except TypeError:
+            return False
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (namespace, function, "
+                    "key, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.namespace,
+                        function,
+                        encoded_key,
+                        sqlite3.Binary(data),
+                        len(data),
+                        now,
+                        now,
+                    ),
+                )
+                self._evict(connection)
+        except sqlite3.Error:
+            self._count("errors")
+            return False
+        return True
+
+    def clear(self, namespace=None, function=None):
+        """
+        Remove the entries of given namespace, the current one by default.
+        If a function name is given, only its entries are removed.
+        """
+        if namespace is None:
+            namespace = self.namespace
+        query = "DELETE FROM entries WHERE namespace = ?"
+        parameters = (namespace,)
+        if function is not None:
+            query += " AND function = ?"
+            parameters += (function,)
+        try:
+            with self._connect() as connection:
+                connection.execute(query, parameters)
+        except sqlite3.Error:
+            self._count("errors")
+
+    def get_infos(self):
+        """
+        Returns:
+            dict: Database location, budget, size and statistics.
+        """
+        with self._connect() as connection:
+            entries, size = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        infos = {
+            "path": self.path,
+            "namespace": self.namespace,
+            "max_size": self.max_size,
+            "current_size": entries,
+            "current_bytes": size,
+        }
+        with self.lock:
+            infos.update(self.statistics)
+        return infos
+
+    def _evict(self, connection):
+        size = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        if size <= self.max_size:
+            return
+        # Drop the least recently used entries, of every namespace, until
+        # the cache is back under 90% of its budget.
+        target = self.max_size * 0.9
+        rowids = []
+        for rowid, entry_size in connection.execute(
+            "SELECT rowid, size FROM entries ORDER BY accessed_at"
+        ):
+            if size <= target:
+                break
+            rowids.append((rowid,))
+            size -= entry_size
+        connection.executemany("DELETE FROM entries WHERE rowid = ?", rowids)
+
+    def _count(self, name):
+        with self.lock:
+            self.statistics[name] += 1
+
+
+def _encode_key(key):
+    try:
+        return json.dumps(key)
+    except TypeError:
+        return None
@@ -1,6 +1,8 @@
 import json
 import datetime
 
+from .records import Record
+
 
 class CustomJSONEncoder(json.JSONEncoder):
     """
@@ -9,7 +11,10 @@ class CustomJSONEncoder(json.JSONEncoder):
     """
 
     def default(self, obj):
-        if isinstance(obj, datetime.datetime):
+        if isinstance(obj, datetime.date):
             return obj.isoformat()
 
+        if isinstance(obj, Record):
+            return obj.to_dict()
+
         return json.JSONEncoder.default(self, obj)
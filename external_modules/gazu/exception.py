@@ -14,6 +14,15 @@ class AuthFailedException(Exception):
     pass
 
 
+class HostUnreachableException(Exception):
+    """
+    Error raised when requests are refused locally because the host kept
+    failing (see CircuitBreaker).
+    """
+
+    pass
+
+
 class NotAuthenticatedException(Exception):
     """
     Error raised when a 401 error (not authenticated) is sent by the API.
@@ -71,6 +80,15 @@ class UploadFailedException(Exception):
     pass
 
 
+class DownloadFailedException(Exception):
+    """
+    Error raised when a downloaded file is incomplete or doesn't match its
+    expected checksum.
+    """
+
+    pass
+
+
 class TooBigFileException(Exception):
     """
     Error raised when a 413 error (payload too big error) is sent by the API.
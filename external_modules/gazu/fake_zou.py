@@ -0,0 +1,1362 @@
+import base64
+import datetime
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+try:
+    from urllib.parse import parse_qsl, urlsplit
+except ImportError:
+    from urlparse import parse_qsl, urlsplit
+
+try:
+    import requests
+    from requests.structures import CaseInsensitiveDict
+except ImportError:
+    requests = None
+
+from . import client as raw
+
+from .codec import get_default_codec
+
+FAKE_HOST = "http://fake-zou/api"
+
+# Entity types that are not asset types.
+ENTITY_ROUTES = {
+    "episodes": "Episode",
+    "sequences": "Sequence",
+    "shots": "Shot",
+    "scenes": "Scene",
+    "edits": "Edit",
+}
+
+TABLE_TYPES = {
+    "projects": "Project",
+    "project-status": "ProjectStatus",
+    "persons": "Person",
+    "entity-types": "EntityType",
+    "entities": "Entity",
+    "task-types": "TaskType",
+    "task-status": "TaskStatus",
+    "tasks": "Task",
+    "comments": "Comment",
+    "preview-files": "PreviewFile",
+}
+
+FILTER_ALIASES = {
+    "shots": {"sequence_id": "parent_id"},
+    "scenes": {"sequence_id": "parent_id"},
+    "sequences": {"episode_id": "parent_id"},
+    "assets": {"episode_id": "source_id"},
+}
+
+# 1x1 PNG served for pictures that were never uploaded.
+PLACEHOLDER_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA"
+    "60e6kgAAAABJRU5ErkJggg=="
+)
+
+# Fields by which rows are indexed, most selective first.
+INDEXED_FIELDS = {
+    "entities": ("parent_id", "source_id", "entity_type_id"),
+    "tasks": ("entity_id",),
+    "comments": ("object_id",),
+    "preview-files": ("task_id",),
+}
+
+UUID_PATTERN = "[a-fA-F0-9-]{36}"
+
+
+def generate_dataset(
+    project_name="Fake Project",
+    production_type="short",
+    episodes=0,
+    sequences=10,
+    shots_per_sequence=20,
+    assets=50,
+    emails=("admin@example.com",),
+    seed=0,
+):
+    """
+    Build a production dataset for FakeZouTransport: a project with its
+    episodes, sequences, shots and assets, one task per entity and task type,
+    and the task types, statuses and persons they reference. The same seed
+    always gives the same IDs.
+
+    Args:
+        project_name (str): Name of the project.
+        production_type (str): "short", "featurefilm" or "tvshow".
+        episodes (int): Number of episodes, sequences are split between
+            them. Only used for tvshows.
+        sequences (int): Number of sequences.
+        shots_per_sequence (int): Number of shots in each sequence.
+        assets (int): Number of assets, spread over the asset types.
+        emails (list): Emails of the persons, the first one is the admin.
+        seed (int): Seed of the generated IDs.
+
+    Returns:
+        dict: Rows by table name.
+    """
+    rng = random.Random(seed)
+    date = "2024-01-01T00:00:00"
+
+    def new_id():
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def new_row(table, **fields):
+        row = {
+            "id": new_id(),
+            "created_at": date,
+            "updated_at": date,
+            "type": TABLE_TYPES[table],
+        }
+        row.update(fields)
+        return row
+
+    project_status = [
+        new_row("project-status", name="Open", color="#000000"),
+        new_row("project-status", name="Closed", color="#000000"),
+    ]
+    persons = [
+        new_row(
+            "persons",
+            email=email,
+            first_name=email.split("@")[0],
+            last_name="",
+            desktop_login=email.split("@")[0],
+            role="admin" if index == 0 else "user",
+            active=True,
+        )
+        for index, email in enumerate(emails)
+    ]
+    task_status = [
+        new_row(
+            "task-status",
+            name=name,
+            short_name=short_name,
+            color="#f5f5f5",
+            is_default=short_name == "todo",
+            is_done=short_name == "done",
+            is_retake=short_name == "retake",
+        )
+        for name, short_name in [
+            ("Todo", "todo"),
+            ("Work In Progress", "wip"),
+            ("Waiting For Approval", "wfa"),
+            ("Retake", "retake"),
+            ("Done", "done"),
+        ]
+    ]
+    task_types = [
+        new_row(
+            "task-types",
+            name=name,
+            short_name=name[:3].lower(),
+            for_entity=for_entity,
+            priority=priority,
+            color="#999999",
+        )
+        for priority, (name, for_entity) in enumerate(
+            [
+                ("Modeling", "Asset"),
+                ("Shading", "Asset"),
+                ("Rigging", "Asset"),
+                ("Layout", "Shot"),
+                ("Animation", "Shot"),
+                ("Lighting", "Shot"),
+                ("Compositing", "Shot"),
+            ]
+        )
+    ]
+    entity_types = [
+        new_row("entity-types", name=name)
+        for name in list(ENTITY_ROUTES.values())
+        + ["Character", "Prop", "Environment"]
+    ]
+    type_ids = dict((row["name"], row["id"]) for row in entity_types)
+    asset_type_ids = [
+        row["id"]
+        for row in entity_types
+        if row["name"] not in ENTITY_ROUTES.values()
+    ]
+    project = new_row(
+        "projects",
+        name=project_name,
+        production_type=production_type,
+        project_status_id=project_status[0]["id"],
+        fps="24",
+        ratio="16:9",
+        resolution="1920x1080",
+        data={},
+    )
+
+    def new_entity(name, entity_type_id, parent_id=None, **fields):
+        return new_row(
+            "entities",
+            name=name,
+            code=None,
+            description="",
+            canceled=False,
+            nb_frames=None,
+            project_id=project["id"],
+            entity_type_id=entity_type_id,
+            parent_id=parent_id,
+            source_id=None,
+            preview_file_id=None,
+            data={},
+            **fields
+        )
+
+    entities = []
+    episode_ids = [None]
+    if production_type == "tvshow" and episodes:
+        episode_ids = []
+        for index in range(episodes):
+            episode = new_entity("E%02d" % (index + 1), type_ids["Episode"])
+            entities.append(episode)
+            episode_ids.append(episode["id"])
+
+    shots = []
+    for index in range(sequences):
+        sequence = new_entity(
+            "SQ%03d" % ((index + 1) * 10),
+            type_ids["Sequence"],
+            episode_ids[index % len(episode_ids)],
+        )
+        entities.append(sequence)
+        for shot_index in range(shots_per_sequence):
+            shot = new_entity(
+                "SH%04d" % ((shot_index + 1) * 10),
+                type_ids["Shot"],
+                sequence["id"],
+            )
+            shot["nb_frames"] = 100
+            shot["data"] = {"frame_in": 1001, "frame_out": 1100}
+            shots.append(shot)
+    entities.extend(shots)
+
+    asset_rows = [
+        new_entity(
+            "asset_%04d" % (index + 1),
+            asset_type_ids[index % len(asset_type_ids)],
+        )
+        for index in range(assets)
+    ]
+    entities.extend(asset_rows)
+
+    tasks = []
+    for entity in shots + asset_rows:
+        for_entity = "Asset"
+        if entity["entity_type_id"] == type_ids["Shot"]:
+            for_entity = "Shot"
+        for task_type in task_types:
+            if task_type["for_entity"] != for_entity:
+                continue
+            tasks.append(
+                new_row(
+                    "tasks",
+                    name="main",
+                    project_id=project["id"],
+                    entity_id=entity["id"],
+                    task_type_id=task_type["id"],
+                    task_status_id=task_status[0]["id"],
+                    assignees=[rng.choice(persons)["id"]],
+                    assigner_id=persons[0]["id"],
+                    priority=0,
+                    duration=0,
+                    estimation=0,
+                    retake_count=0,
+                    last_comment_date=None,
+                    data=None,
+                )
+            )
+
+    return {
+        "project-status": project_status,
+        "persons": persons,
+        "task-status": task_status,
+        "task-types": task_types,
+        "entity-types": entity_types,
+        "projects": [project],
+        "entities": entities,
+        "tasks": tasks,
+        "comments": [],
+        "preview-files": [],
+    }
+
+
+class FakeZouTransport(object):
+    """
+    In-memory stand-in for a Zou server, to run gazu and the code built on
+    it without a live server, e.g. in benchmarks. It implements the routes
+    gazu uses (auth, data, actions and pictures) over a dataset built by
+    generate_dataset. Requests are answered with real `requests.Response`
+    objects, so the whole client stack (retries, hooks, caches) runs as
+    usual.
+
+    It has no permission model: user routes return the same results as
+    data routes. Resumable uploads of previews are supported only when
+    *resumable_uploads* is set: stock Zou has no such routes, so uploads fall
+    back to plain ones by default. List routes are paged when a page
+    parameter is given. Failures can be injected with add_fault to test
+    error handling.
+
+    Args:
+        dataset (dict): Rows by table name. Defaults to generate_dataset().
+        latency (float): Seconds added to every request.
+        jitter (float): Maximum random seconds added to the latency.
+        password (str): Password accepted at log in for every person. Any
+            password is accepted if None.
+        seed (int): Seed of the latency jitter and of the generated IDs.
+        resumable_uploads (bool): Implement the resumable upload protocol of
+            `gazu.client.upload_resumable` for previews.
+    """
+
+    def __init__(
+        self,
+        dataset=None,
+        latency=0.0,
+        jitter=0.0,
+        password=None,
+        seed=0,
+        resumable_uploads=False,
+    ):
+        if dataset is None:
+            dataset = generate_dataset(seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.password = password
+        self.random = random.Random(seed)
+        self.offline = False
+        self.faults = []
+        self.codec = get_default_codec()
+        self.lock = threading.RLock()
+        self.calls = []
+        self.access_tokens = {}
+        self.refresh_tokens = {}
+        self.files = {}
+        self.uploads = {}
+        self.tables = dict((name, {}) for name in TABLE_TYPES)
+        self.indexes = dict(
+            ((table, field), {})
+            for table, fields in INDEXED_FIELDS.items()
+            for field in fields
+        )
+        for name, rows in dataset.items():
+            for row in rows:
+                self._insert(name, dict(row))
+        self.routes = [
+            ("POST", "auth/login", self._log_in),
+            ("GET", "auth/refresh-token", self._refresh_token),
+            ("GET", "auth/authenticated", self._get_authenticated),
+            ("GET", "auth/logout", self._log_out),
+            ("POST", "data/persons/new", self._new_person),
+            ("GET", "data/projects/open", self._get_open_projects),
+            ("GET", "data/tasks/(ID)/full", self._get_full_task),
+            (
+                "POST",
+                "data/projects/(ID)/(episodes|sequences|shots|scenes)",
+                self._new_entity,
+            ),
+            (
+                "POST",
+                "data/projects/(ID)/asset-types/(ID)/assets/new",
+                self._new_asset,
+            ),
+            (
+                "GET",
+                "data/projects/(ID)/asset-types/(ID)/assets",
+                self._get_project_assets_for_type,
+            ),
+            (
+                "GET",
+                "data/entities/(ID)/task-types/(ID)/tasks",
+                self._get_entity_tasks_for_type,
+            ),
+            ("GET", "data/([\\w-]+)/(ID)/([\\w-]+)", self._get_children),
+            ("GET", "data/([\\w-]+)(?:/all)?", self._get_all),
+            ("GET", "data/([\\w-]+)/(ID)", self._get_one),
+            ("POST", "data/([\\w-]+)", self._create),
+            ("PUT", "data/([\\w-]+)/(ID)", self._update),
+            ("DELETE", "data/([\\w-]+)/(ID)", self._remove),
+            ("POST", "actions/tasks/(ID)/comment", self._add_comment),
+            (
+                "POST",
+                "actions/tasks/(ID)/comments/(ID)/add-preview",
+                self._add_preview,
+            ),
+            (
+                "PUT",
+                "actions/preview-files/(ID)/set-main-preview",
+                self._set_main_preview,
+            ),
+            ("PUT", "actions/tasks/(ID)/(start|to-review)", self._set_status),
+            ("PUT", "actions/persons/(ID)/assign", self._assign),
+            ("POST", "pictures/preview-files/(ID)", self._upload_preview),
+            (
+                "GET",
+                "pictures/[\\w-]+(?:/[\\w-]+)?/preview-files/(ID)\\.\\w+",
+                self._get_preview_picture,
+            ),
+            (
+                "GET",
+                "pictures/thumbnails/[\\w-]+/(ID)\\.png",
+                self._get_picture,
+            ),
+            ("GET", "", self._get_api),
+        ]
+        if resumable_uploads:
+            self.routes += [
+                (
+                    "POST",
+                    "pictures/preview-files/(ID)/resumable",
+                    self._start_upload,
+                ),
+                (
+                    "GET",
+                    "pictures/preview-files/(ID)/resumable/(ID)",
+                    self._get_upload_offset,
+                ),
+                (
+                    "PUT",
+                    "pictures/preview-files/(ID)/resumable/(ID)",
+                    self._send_upload_chunk,
+                ),
+                (
+                    "POST",
+                    "pictures/preview-files/(ID)/resumable/(ID)/complete",
+                    self._complete_upload,
+                ),
+            ]
+        self.routes = [
+            (
+                method,
+                re.compile("^%s/?$" % pattern.replace("ID", UUID_PATTERN)),
+                handler,
+            )
+            for method, pattern, handler in self.routes
+        ]
+
+    def request(self, method, url, **kwargs):
+        """
+        Answer a request like `requests.Session.request`.
+
+        Raises:
+            ConnectionError: When the server is set offline.
+        """
+        delay = self.latency
+        if self.jitter:
+            delay += self.random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.offline:
+            raise requests.exceptions.ConnectionError(
+                "Fake Zou server is offline"
+            )
+
+        url_parts = urlsplit(url)
+        path = url_parts.path
+        if "/api/" in path + "/":
+            path = (path + "/").split("/api/", 1)[1]
+        path = path.strip("/")
+        params = dict(parse_qsl(url_parts.query))
+        params.update(kwargs.get("params") or {})
+        headers = CaseInsensitiveDict(kwargs.get("headers") or {})
+        body = _read_body(kwargs.get("data"), kwargs.get("json"), self.codec)
+
+        response_headers = {}
+        with self.lock:
+            self.calls.append((method, path))
+            fault = self._pop_fault(method, path)
+            if fault is None:
+                status, payload = self._dispatch(
+                    method, path, params, headers, body
+                )
+            elif isinstance(fault["fault"], int):
+                status = fault["fault"]
+                payload = {"message": "Injected fault"}
+                response_headers = fault["headers"]
+        if fault is not None and not isinstance(fault["fault"], int):
+            raise fault["fault"]
+
+        content_type = "application/json"
+        if isinstance(payload, bytes):
+            content_type = "image/png"
+        elif payload is None:
+            payload = b""
+        else:
+            payload = self.codec.dumps(payload)
+        response = requests.models.Response()
+        response.status_code = status
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict(
+            {"Content-Type": content_type, "Content-Length": str(len(payload))}
+        )
+        response.headers.update(response_headers)
+        response.raw = io.BytesIO(b"" if method == "HEAD" else payload)
+        return response
+
+    def add_fault(self, fault, method=None, path=None, count=1, headers=None):
+        """
+        Make the next matching requests fail instead of reaching the fake
+        server.
+
+        Args:
+            fault (int / Exception): HTTP status to answer, or exception to
+                raise, like a requests ConnectionError for a dropped
+                connection.
+            method (str): Verb of the failing requests, any if None.
+            path (str): Regular expression searched in the path (without the
+                /api prefix) of the failing requests, any if None.
+            count (int): Number of requests failing.
+            headers (dict): Extra headers of the error response, like
+                Retry-After.
+        """
+        with self.lock:
+            self.faults.append(
+                {
+                    "fault": fault,
+                    "method": method,
+                    "path": re.compile(path) if path is not None else None,
+                    "count": count,
+                    "headers": headers or {},
+                }
+            )
+
+    def _pop_fault(self, method, path):
+        for fault in self.faults:
+            if fault["method"] is not None and fault["method"] != method:
+                continue
+            if fault["path"] is not None and not fault["path"].search(path):
+                continue
+            fault["count"] -= 1
+            if fault["count"] <= 0:
+                self.faults.remove(fault)
+            return fault
+        return None
+
+    def configure_pool(self, pool_connections=10, pool_maxsize=10):
+        return None
+
+    def close(self):
+        pass
+
+    def issue_tokens(self, email):
+        """
+        Log in given person without sending a request.
+
+        Returns:
+            dict: Authentication tokens.
+        """
+        with self.lock:
+            person = self._find("persons", {"email": email})
+            if person is None:
+                raise ValueError("Unknown person: %s" % email)
+            tokens = {
+                "access_token": uuid.uuid4().hex,
+                "refresh_token": uuid.uuid4().hex,
+            }
+            self.access_tokens[tokens["access_token"]] = person["id"]
+            self.refresh_tokens[tokens["refresh_token"]] = person["id"]
+            return tokens
+
+    def expire_tokens(self):
+        """
+        Invalidate the access tokens issued so far, so clients have to
+        refresh them.
+        """
+        with self.lock:
+            self.access_tokens.clear()
+
+    def get_rows(self, model, filters=None):
+        """
+        Returns:
+            list: Stored rows of given model (a table or a route name like
+            "shots" or "assets") matching given filters.
+        """
+        with self.lock:
+            return [dict(row) for row in self._get_rows(model, filters)]
+
+    def _dispatch(self, method, path, params, headers, body):
+        route_method = "GET" if method == "HEAD" else method
+        if path.startswith("data/user/"):
+            path = path[len("data/"):]
+        if path.startswith("user/"):
+            if path == "user/tasks":
+                path = "user/persons/%s/tasks" % self._get_person_id(headers)
+            path = "data/" + path[len("user/"):]
+
+        if method == "OPTIONS":
+            for _, pattern, _ in self.routes:
+                if pattern.match(path):
+                    return 200, None
+            return 404, {"message": "Route not found: %s" % path}
+
+        for method_name, pattern, handler in self.routes:
+            if method_name != route_method:
+                continue
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if not path.startswith("auth/") and path:
+                if self._get_person_id(headers) is None:
+                    return 401, {"msg": "Missing or invalid token"}
+            try:
+                return handler(
+                    *match.groups(),
+                    params=params,
+                    headers=headers,
+                    body=body
+                )
+            except _HTTPError as error:
+                return error.status, {"message": error.message}
+        return 404, {"message": "Route not found: %s" % path}
+
+    def _get_person_id(self, headers):
+        authorization = headers.get("Authorization", "")
+        return self.access_tokens.get(authorization[len("Bearer "):])
+
+    def _log_in(self, params, headers, body):
+        data = _get_json(body)
+        person = self._find("persons", {"email": data.get("email", "")})
+        if person is None or (
+            self.password is not None and data.get("password") != self.password
+        ):
+            return 400, {"login": False, "message": "Wrong credentials"}
+        tokens = self.issue_tokens(person["email"])
+        tokens.update({"login": True, "user": person})
+        return 200, tokens
+
+    def _refresh_token(self, params, headers, body):
+        authorization = headers.get("Authorization", "")
+        person_id = self.refresh_tokens.get(authorization[len("Bearer "):])
+        if person_id is None:
+            return 401, {"msg": "Invalid refresh token"}
+        access_token = uuid.uuid4().hex
+        self.access_tokens[access_token] = person_id
+        return 200, {"access_token": access_token}
+
+    def _get_authenticated(self, params, headers, body):
+        person_id = self._get_person_id(headers)
+        if person_id is None:
+            return 401, {"msg": "Missing or invalid token"}
+        return 200, {
+            "authenticated": True,
+            "user": self.tables["persons"][person_id],
+            "organisation": {"id": "organisation", "name": "Fake Zou"},
+        }
+
+    def _log_out(self, params, headers, body):
+        authorization = headers.get("Authorization", "")
+        self.access_tokens.pop(authorization[len("Bearer "):], None)
+        return 200, {"logout": True}
+
+    def _get_api(self, params, headers, body):
+        return 200, {"api": "Zou", "version": "fake"}
+
+    def _get_all(self, model, params, headers, body):
+        if model == "assets" and params.get("asset_type_id"):
+            params = dict(params, entity_type_id=params["asset_type_id"])
+        rows = self._get_rows(model, params)
+        if params.get("page"):
+            # Pages of *limit* rows, the first one being page 1
+            limit = int(params.get("limit") or 100)
+            start = (int(params["page"]) - 1) * limit
+            rows = rows[start : start + limit]
+        return 200, [self._serialize(model, row) for row in rows]
+
+    def _get_open_projects(self, params, headers, body):
+        status = self._find("project-status", {"name": "Open"})
+        filters = {"project_status_id": status["id"] if status else ""}
+        params = dict(params, **filters)
+        return self._get_all("projects", params, headers, body)
+
+    def _get_one(self, model, row_id, params, headers, body):
+        return 200, self._serialize(model, self._get_row(model, row_id))
+
+    def _get_full_task(self, task_id, params, headers, body):
+        task = dict(self._get_row("tasks", task_id))
+        task["entity"] = self.tables["entities"].get(task["entity_id"])
+        task["task_type"] = self.tables["task-types"].get(task["task_type_id"])
+        task["task_status"] = self.tables["task-status"].get(
+            task["task_status_id"]
+        )
+        task["project"] = self.tables["projects"].get(task["project_id"])
+        task["persons"] = [
+            self.tables["persons"][person_id]
+            for person_id in task.get("assignees") or []
+            if person_id in self.tables["persons"]
+        ]
+        return 200, task
+
+    def _get_children(
+        self, parent_model, parent_id, model, params, headers, body
+    ):
+        parent = self._get_row(parent_model, parent_id)
+        if model in ("tasks", "done-tasks"):
+            if parent_model == "projects":
+                filters = {"project_id": parent_id}
+            elif parent_model == "persons":
+                filters = {"assignees": parent_id}
+            else:
+                filters = {"entity_id": parent_id}
+            rows = self._get_rows("tasks", dict(params, **filters))
+            if model == "done-tasks":
+                done_ids = set(
+                    row["id"]
+                    for row in self._get_rows(
+                        "task-status", {"is_done": "true"}
+                    )
+                )
+                rows = [
+                    row for row in rows if row["task_status_id"] in done_ids
+                ]
+            return 200, rows
+        if model == "shot-tasks":
+            shot_ids = set(
+                row["id"] for row in self._get_child_entities(parent, "shots")
+            )
+            return 200, [
+                row
+                for row in self._get_rows("tasks", params)
+                if row["entity_id"] in shot_ids
+            ]
+        if model == "task-types":
+            task_type_ids = set(
+                row["task_type_id"]
+                for row in self._get_rows("tasks", {"entity_id": parent_id})
+            )
+            return 200, [
+                row
+                for row in self._get_rows("task-types")
+                if row["id"] in task_type_ids
+            ]
+        if model == "comments":
+            rows = self._get_rows("comments", {"object_id": parent_id})
+            return 200, sorted(
+                rows, key=lambda row: row["created_at"], reverse=True
+            )
+        if model == "preview-files":
+            task_ids = set(
+                row["id"]
+                for row in self._get_rows("tasks", {"entity_id": parent_id})
+            )
+            return 200, [
+                row
+                for row in self._get_rows("preview-files")
+                if row["task_id"] in task_ids
+            ]
+        if model == "asset-types" and parent_model == "projects":
+            type_ids = set(
+                row["entity_type_id"]
+                for row in self._get_rows("assets", {"project_id": parent_id})
+            )
+            return 200, [
+                row
+                for row in self._get_rows("asset-types")
+                if row["id"] in type_ids
+            ]
+        if model in ENTITY_ROUTES or model == "assets":
+            return 200, [
+                self._serialize(model, row)
+                for row in self._get_child_entities(parent, model, params)
+            ]
+        if model in ("asset-instances", "asset-types", "scenes"):
+            return 200, []
+        raise _HTTPError(404, "Route not found: %s" % model)
+
+    def _get_child_entities(self, parent, model, params=None):
+        params = dict(params or {})
+        if parent["type"] == "Project":
+            params["project_id"] = parent["id"]
+        elif model == "shots" and self._is_entity_type(parent, "Episode"):
+            sequences = self._get_rows(
+                "sequences", {"parent_id": parent["id"]}
+            )
+            sequence_ids = set(row["id"] for row in sequences)
+            return [
+                row
+                for row in self._get_rows("shots", params)
+                if row["parent_id"] in sequence_ids
+            ]
+        elif model == "assets":
+            params["source_id"] = parent["id"]
+        else:
+            params["parent_id"] = parent["id"]
+        return self._get_rows(model, params)
+
+    def _get_project_assets_for_type(
+        self, project_id, asset_type_id, params, headers, body
+    ):
+        filters = dict(
+            params, project_id=project_id, entity_type_id=asset_type_id
+        )
+        return self._get_all("assets", filters, headers, body)
+
+    def _get_entity_tasks_for_type(
+        self, entity_id, task_type_id, params, headers, body
+    ):
+        filters = {"entity_id": entity_id, "task_type_id": task_type_id}
+        return 200, self._get_rows("tasks", filters)
+
+    def _create(self, model, params, headers, body):
+        data = _get_json(body)
+        table = self._get_table_name(model)
+        if table == "tasks":
+            entity = self._get_row("entities", data.get("entity_id"))
+            self._get_row("task-types", data.get("task_type_id"))
+            data.setdefault("name", "main")
+            if self._find(
+                "tasks",
+                {
+                    "entity_id": entity["id"],
+                    "task_type_id": data["task_type_id"],
+                    "name": data["name"],
+                },
+            ):
+                raise _HTTPError(400, "Task already exists")
+            data.setdefault("project_id", entity["project_id"])
+            data.setdefault("task_status_id", self._get_default_status_id())
+            data.setdefault("assignees", [])
+            data.setdefault("last_comment_date", None)
+            data.setdefault("retake_count", 0)
+            data.setdefault("data", None)
+        elif table == "projects":
+            status = self._find("project-status", {"name": "Open"})
+            data.setdefault("project_status_id", status and status["id"])
+            data.setdefault("production_type", "short")
+            data.setdefault("data", {})
+        elif table == "entities":
+            raise _HTTPError(400, "Entities are created through projects")
+        if "name" in data and table != "tasks" and self._find(
+            table, {"name": data["name"]}
+        ):
+            raise _HTTPError(400, "%s already exists" % data["name"])
+        return 201, self._insert(table, self._new_row(table, data))
+
+    def _new_entity(self, project_id, model, params, headers, body):
+        data = _get_json(body)
+        parent_id = data.get("sequence_id") or data.get("episode_id")
+        return 201, self._serialize(
+            model,
+            self._add_entity(
+                project_id, ENTITY_ROUTES[model], data, parent_id=parent_id
+            ),
+        )
+
+    def _new_asset(self, project_id, asset_type_id, params, headers, body):
+        data = _get_json(body)
+        asset_type = self._get_row("asset-types", asset_type_id)
+        asset = self._add_entity(
+            project_id,
+            asset_type["name"],
+            data,
+            source_id=data.get("episode_id"),
+        )
+        return 201, self._serialize("assets", asset)
+
+    def _add_entity(
+        self, project_id, type_name, data, parent_id=None, source_id=None
+    ):
+        self._get_row("projects", project_id)
+        if not data.get("name"):
+            raise _HTTPError(400, "Name is required")
+        entity_type = self._find("entity-types", {"name": type_name})
+        if entity_type is None:
+            entity_type = self._insert(
+                "entity-types",
+                self._new_row("entity-types", {"name": type_name}),
+            )
+        filters = {
+            "project_id": project_id,
+            "entity_type_id": entity_type["id"],
+            "parent_id": parent_id,
+            "name": data["name"],
+        }
+        if self._get_rows("entities", filters):
+            raise _HTTPError(400, "%s already exists" % data["name"])
+        row = self._new_row(
+            "entities",
+            {
+                "name": data["name"],
+                "code": None,
+                "description": data.get("description", ""),
+                "canceled": False,
+                "nb_frames": data.get("nb_frames"),
+                "project_id": project_id,
+                "entity_type_id": entity_type["id"],
+                "parent_id": parent_id,
+                "source_id": source_id,
+                "preview_file_id": None,
+                "data": data.get("data") or {},
+            },
+        )
+        return self._insert("entities", row)
+
+    def _new_person(self, params, headers, body):
+        data = _get_json(body)
+        if not data.get("email"):
+            raise _HTTPError(400, "Email is required")
+        if self._find("persons", {"email": data["email"]}):
+            raise _HTTPError(400, "Email already exists")
+        data.setdefault("role", "user")
+        data.setdefault("active", True)
+        return 201, self._insert("persons", self._new_row("persons", data))
+
+    def _update(self, model, row_id, params, headers, body):
+        table = self._get_table_name(model)
+        row = self._delete(table, self._get_row(model, row_id)["id"])
+        data = _get_json(body)
+        for key, value in data.items():
+            if key in row and key not in ("id", "type", "created_at"):
+                row[key] = value
+        row["updated_at"] = _now()
+        self._insert(table, row)
+        return 200, self._serialize(model, row)
+
+    def _remove(self, model, row_id, params, headers, body):
+        table = self._get_table_name(model)
+        row = self._get_row(model, row_id)
+        if table == "entities" and params.get("force") != "true":
+            row["canceled"] = True
+            row["updated_at"] = _now()
+            return 200, self._serialize(model, row)
+        self._delete(table, row_id)
+        if table == "entities":
+            for task in self._get_rows("tasks", {"entity_id": row_id}):
+                self._delete("tasks", task["id"])
+        return 204, None
+
+    def _add_comment(self, task_id, params, headers, body):
+        task = self._get_row("tasks", task_id)
+        if headers.get("Content-Type", "").startswith("multipart/form-data"):
+            data, files = _parse_multipart(body, headers["Content-Type"])
+        else:
+            data, files = _get_json(body), {}
+        task_status = self._get_row("task-status", data.get("task_status_id"))
+        comment = self._new_row(
+            "comments",
+            {
+                "object_id": task_id,
+                "object_type": "Task",
+                "task_status_id": task_status["id"],
+                "person_id": data.get("person_id")
+                or self._get_person_id(headers),
+                "text": data.get("comment", ""),
+                "checklist": data.get("checklist", []),
+                "previews": [],
+                "attachment_files": [
+                    file_name for file_name, _ in files.values()
+                ],
+            },
+        )
+        if data.get("created_at"):
+            comment["created_at"] = data["created_at"]
+        task["task_status_id"] = task_status["id"]
+        task["last_comment_date"] = comment["created_at"]
+        if task_status.get("is_retake"):
+            task["retake_count"] = (task.get("retake_count") or 0) + 1
+        return 201, self._insert("comments", comment)
+
+    def _add_preview(self, task_id, comment_id, params, headers, body):
+        task = self._get_row("tasks", task_id)
+        comment = self._get_row("comments", comment_id)
+        revision = 1 + len(
+            [
+                row
+                for row in self.tables["preview-files"].values()
+                if row["task_id"] == task["id"]
+            ]
+        )
+        preview = self._new_row(
+            "preview-files",
+            {
+                "name": "%s_v%03d" % (task["name"], revision),
+                "revision": revision,
+                "task_id": task_id,
+                "comment_id": comment_id,
+                "person_id": comment["person_id"],
+                "extension": None,
+                "original_name": None,
+                "file_size": 0,
+                "status": "processing",
+            },
+        )
+        comment["previews"] = comment["previews"] + [preview["id"]]
+        return 201, self._insert("preview-files", preview)
+
+    def _upload_preview(self, preview_id, params, headers, body):
+        preview = self._get_row("preview-files", preview_id)
+        _, files = _parse_multipart(body, headers.get("Content-Type", ""))
+        if "file" not in files:
+            raise _HTTPError(400, "No file sent")
+        file_name, content = files["file"]
+        preview["original_name"] = file_name.rsplit(".", 1)[0]
+        preview["extension"] = file_name.rsplit(".", 1)[-1].lower()
+        preview["file_size"] = len(content)
+        preview["status"] = "ready"
+        preview["updated_at"] = _now()
+        self.files[preview_id] = content
+        return 201, preview
+
+    def _start_upload(self, preview_id, params, headers, body):
+        self._get_row("preview-files", preview_id)
+        data = _get_json(body)
+        upload_id = str(uuid.uuid4())
+        self.uploads[upload_id] = {
+            "preview_id": preview_id,
+            "size": data["size"],
+            "file_name": data["file_name"],
+            "content": bytearray(),
+        }
+        return 201, {"upload_id": upload_id}
+
+    def _get_upload(self, preview_id, upload_id):
+        upload = self.uploads.get(upload_id)
+        if upload is None or upload["preview_id"] != preview_id:
+            raise _HTTPError(404, "Upload %s not found" % upload_id)
+        return upload
+
+    def _get_upload_offset(self, preview_id, upload_id, params, headers, body):
+        upload = self._get_upload(preview_id, upload_id)
+        return 200, {"offset": len(upload["content"])}
+
+    def _send_upload_chunk(self, preview_id, upload_id, params, headers, body):
+        upload = self._get_upload(preview_id, upload_id)
+        match = re.match(
+            r"bytes (\d+)-(\d+)/(\d+)", headers.get("Content-Range", "")
+        )
+        if match is None:
+            raise _HTTPError(400, "Missing Content-Range header")
+        # A chunk that doesn't start at the received offset is ignored, the
+        # client resends from the offset returned.
+        if int(match.group(1)) == len(upload["content"]):
+            upload["content"] += body
+        return 200, {"offset": len(upload["content"])}
+
+    def _complete_upload(self, preview_id, upload_id, params, headers, body):
+        upload = self._get_upload(preview_id, upload_id)
+        if len(upload["content"]) != upload["size"]:
+            raise _HTTPError(400, "Upload %s is incomplete" % upload_id)
+        del self.uploads[upload_id]
+        preview = self._get_row("preview-files", preview_id)
+        file_name = upload["file_name"]
+        preview["original_name"] = file_name.rsplit(".", 1)[0]
+        preview["extension"] = file_name.rsplit(".", 1)[-1].lower()
+        preview["file_size"] = upload["size"]
+        preview["status"] = "ready"
+        preview["updated_at"] = _now()
+        self.files[preview_id] = bytes(upload["content"])
+        return 201, preview
+
+    def _set_main_preview(self, preview_id, params, headers, body):
+        preview = self._get_row("preview-files", preview_id)
+        task = self._get_row("tasks", preview["task_id"])
+        entity = self._get_row("entities", task["entity_id"])
+        entity["preview_file_id"] = preview_id
+        entity["updated_at"] = _now()
+        return 200, entity
+
+    def _set_status(self, task_id, action, params, headers, body):
+        task = self._get_row("tasks", task_id)
+        short_name = "wip" if action == "start" else "wfa"
+        task_status = self._find("task-status", {"short_name": short_name})
+        if task_status is not None:
+            task["task_status_id"] = task_status["id"]
+        return 200, task
+
+    def _assign(self, person_id, params, headers, body):
+        self._get_row("persons", person_id)
+        task_ids = _get_json(body).get("task_ids") or []
+        if not isinstance(task_ids, list):
+            task_ids = [task_ids]
+        tasks = []
+        for task_id in task_ids:
+            task = self._get_row("tasks", task_id)
+            if person_id not in task["assignees"]:
+                task["assignees"] = task["assignees"] + [person_id]
+            tasks.append(task)
+        return 200, tasks
+
+    def _get_preview_picture(self, preview_id, params, headers, body):
+        self._get_row("preview-files", preview_id)
+        return 200, self.files.get(preview_id, PLACEHOLDER_PNG)
+
+    def _get_picture(self, row_id, params, headers, body):
+        return 200, PLACEHOLDER_PNG
+
+    def _get_table_name(self, model):
+        if model in ENTITY_ROUTES or model == "assets":
+            return "entities"
+        if model == "asset-types":
+            return "entity-types"
+        if model not in self.tables:
+            raise _HTTPError(404, "Route not found: %s" % model)
+        return model
+
+    def _get_rows(self, model, filters=None):
+        filters = dict(
+            (key, value)
+            for key, value in (filters or {}).items()
+            if key not in ("relations", "force", "page", "limit")
+        )
+        for key, alias in FILTER_ALIASES.get(model, {}).items():
+            if key in filters:
+                filters[alias] = filters.pop(key)
+        for key, value in list(filters.items()):
+            if isinstance(value, str) and value.startswith("["):
+                # Like Zou, a JSON list is an "in" filter
+                filters[key] = set(json.loads(value))
+
+        type_ids = None
+        if model in ENTITY_ROUTES:
+            entity_type = self._find(
+                "entity-types", {"name": ENTITY_ROUTES[model]}
+            )
+            if entity_type is None:
+                return []
+            type_ids = set([entity_type["id"]])
+        elif model == "assets":
+            type_ids = self._get_asset_type_ids()
+        elif model == "asset-types":
+            asset_type_ids = self._get_asset_type_ids()
+            if isinstance(filters.get("id"), set):
+                asset_type_ids &= filters["id"]
+            elif filters.get("id") is not None:
+                asset_type_ids &= set([filters["id"]])
+            filters["id"] = asset_type_ids
+
+        table = self._get_table_name(model)
+        rows = None
+        for field in INDEXED_FIELDS.get(table, ()):
+            if filters.get(field) is not None:
+                rows = self.indexes[(table, field)].get(filters[field], {})
+                break
+        if rows is None and isinstance(filters.get("id"), set):
+            rows = [
+                self.tables[table][row_id]
+                for row_id in filters["id"]
+                if row_id in self.tables[table]
+            ]
+        if rows is None and type_ids is not None:
+            index = self.indexes[("entities", "entity_type_id")]
+            rows = [
+                row
+                for type_id in type_ids
+                for row in index.get(type_id, {}).values()
+            ]
+        elif rows is None:
+            rows = self.tables[table]
+        if isinstance(rows, dict):
+            rows = rows.values()
+        return [
+            row
+            for row in rows
+            if (type_ids is None or row["entity_type_id"] in type_ids)
+            and _matches(row, filters)
+        ]
+
+    def _get_row(self, model, row_id):
+        row = self.tables[self._get_table_name(model)].get(row_id)
+        if row is not None and model in ENTITY_ROUTES:
+            if not self._is_entity_type(row, ENTITY_ROUTES[model]):
+                row = None
+        elif row is not None and model == "assets":
+            if row["entity_type_id"] not in self._get_asset_type_ids():
+                row = None
+        elif row is not None and model == "asset-types":
+            if row["id"] not in self._get_asset_type_ids():
+                row = None
+        if row is None:
+            raise _HTTPError(404, "%s %s not found" % (model, row_id))
+        return row
+
+    def _find(self, model, filters):
+        rows = self._get_rows(model, filters)
+        return rows[0] if rows else None
+
+    def _get_asset_type_ids(self):
+        return set(
+            row["id"]
+            for row in self.tables["entity-types"].values()
+            if row["name"] not in ENTITY_ROUTES.values()
+        )
+
+    def _is_entity_type(self, row, type_name):
+        entity_type = self.tables["entity-types"].get(row["entity_type_id"])
+        return entity_type is not None and entity_type["name"] == type_name
+
+    def _get_default_status_id(self):
+        status = self._find("task-status", {"is_default": "true"})
+        return status["id"] if status else None
+
+    def _new_row(self, table, data):
+        row = {
+            "id": str(uuid.uuid4()),
+            "created_at": _now(),
+            "updated_at": _now(),
+            "type": TABLE_TYPES[table],
+        }
+        row.update(data)
+        return row
+
+    def _insert(self, table, row):
+        self.tables[table][row["id"]] = row
+        for field in INDEXED_FIELDS.get(table, ()):
+            index = self.indexes[(table, field)]
+            index.setdefault(row.get(field), {})[row["id"]] = row
+        return row
+
+    def _delete(self, table, row_id):
+        row = self.tables[table].pop(row_id, None)
+        if row is None:
+            return None
+        for field in INDEXED_FIELDS.get(table, ()):
+            index = self.indexes[(table, field)]
+            index.get(row.get(field), {}).pop(row_id, None)
+        return row
+
+    def _serialize(self, model, row):
+        """
+        Add to entities the fields Zou computes from their parents.
+        """
+        if row.get("type") != "Entity":
+            return row
+        entity_type = self.tables["entity-types"][row["entity_type_id"]]
+        type_name = entity_type["name"]
+        row = dict(row)
+        if type_name == "Shot":
+            sequence = self.tables["entities"].get(row["parent_id"]) or {}
+            row["sequence_id"] = sequence.get("id")
+            row["sequence_name"] = sequence.get("name")
+            row["episode_id"] = sequence.get("parent_id")
+            episode = self.tables["entities"].get(sequence.get("parent_id"))
+            if episode is not None:
+                row["episode_name"] = episode["name"]
+        elif type_name == "Sequence":
+            row["episode_id"] = row["parent_id"]
+        elif type_name not in ENTITY_ROUTES.values():
+            row["asset_type_id"] = entity_type["id"]
+            row["asset_type_name"] = type_name
+            row["episode_id"] = row["source_id"]
+        row["type"] = type_name if type_name in ENTITY_ROUTES.values() else (
+            "Asset"
+        )
+        return row
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+        self.message = message
+
+
+def create_fake_client(
+    dataset=None,
+    latency=0.0,
+    jitter=0.0,
+    email="admin@example.com",
+    seed=0,
+    resumable_uploads=False,
+):
+    """
+    Create a client talking to a new FakeZouTransport, logged in as given
+    person.
+
+    Returns:
+        KitsuClient: The client, its transport is available as
+        `client.transport`.
+    """
+    transport = FakeZouTransport(
+        dataset=dataset,
+        latency=latency,
+        jitter=jitter,
+        seed=seed,
+        resumable_uploads=resumable_uploads,
+    )
+    client = raw.create_client(FAKE_HOST, transport=transport)
+    raw.set_tokens(transport.issue_tokens(email), client=client)
+    return client
+
+
+def _matches(row, filters):
+    for key, value in filters.items():
+        row_value = row.get(key)
+        if isinstance(value, set):
+            if row_value not in value:
+                return False
+        elif isinstance(row_value, list):
+            if value not in row_value:
+                return False
+        elif isinstance(row_value, bool):
+            if str(row_value).lower() != str(value).lower():
+                return False
+        elif row_value is None:
+            if value not in (None, "", "None", "null"):
+                return False
+        elif str(row_value) != str(value):
+            return False
+    return True
+
+
+def _read_body(data, json_data, codec):
+    if json_data is not None:
+        return codec.dumps(json_data)
+    if data is None:
+        return b""
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    if hasattr(data, "read"):
+        chunks = []
+        chunk = data.read(65536)
+        while chunk:
+            chunks.append(chunk)
+            chunk = data.read(65536)
+        return b"".join(chunks)
+    return b"".join(data)
+
+
+def _get_json(body):
+    if not body:
+        return {}
+    try:
+        return get_default_codec().loads(body)
+    except ValueError:
+        raise _HTTPError(400, "Invalid JSON body")
+
+
+def _parse_multipart(body, content_type):
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if match is None:
+        raise _HTTPError(400, "Missing multipart boundary")
+    fields = {}
+    files = {}
+    boundary = ("--%s" % match.group(1)).encode("ascii")
+    for part in body.split(boundary)[1:]:
+        if part.startswith(b"--"):
+            break
+        head, _, value = part.partition(b"\r\n\r\n")
+        if value.endswith(b"\r\n"):
+            value = value[:-2]
+        head = head.decode("utf-8")
+        name = re.search(r'name="((?:[^"\\]|\\.)*)"', head)
+        file_name = re.search(r'filename="((?:[^"\\]|\\.)*)"', head)
+        if name is None:
+            continue
+        if file_name is not None:
+            files[name.group(1)] = (file_name.group(1), value)
+        else:
+            fields[name.group(1)] = value.decode("utf-8")
+    return fields, files
+
+
+def _now():
+    return datetime.datetime.now().replace(microsecond=0).isoformat()
@@ -1106,6 +1106,8 @@ def download_attachment_file(attachment_file, file_path, client=default):
 def download_preview_file_thumbnail(preview_file, file_path, client=default):
     """
     Download given preview file thumbnail and save it at given location.
+    Thumbnails are immutable, so they are read from the media cache when
+    they were already downloaded on this workstation.
 
     Args:
         preview_file (str / dict): The preview file dict or ID.
@@ -1113,10 +1115,10 @@ def download_preview_file_thumbnail(preview_file, file_path, client=default):
 
     """
     preview_file = normalize_model_parameter(preview_file)
-    return raw.download(
+    return raw.download_cached(
         "pictures/thumbnails/preview-files/%s.png" % (preview_file["id"]),
         file_path,
-        client=client
+        client=client,
     )
 
 
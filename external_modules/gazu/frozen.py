@@ -0,0 +1,155 @@
+from .records import Record
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(
+        "%s is read-only, use copy.deepcopy to get a mutable copy"
+        % type(self).__name__
+    )
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict. It behaves like a dict for reading, serialization and
+    isinstance checks but raises TypeError when modified. Its nested dicts
+    and lists are frozen too. `copy.deepcopy` returns a mutable dict.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """
+    Read-only list. It behaves like a list for reading, serialization and
+    isinstance checks but raises TypeError when modified. Its nested dicts
+    and lists are frozen too. `copy.deepcopy` returns a mutable list.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = remove = pop = clear = _read_only
+    sort = reverse = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+class CopyOnWriteDict(dict):
+    """
+    Mutable dict sharing its nested values with a frozen dict. A nested dict
+    or list is copied the first time it is read through `[]` or `get`, so it
+    can be modified without altering the frozen original. Nested values read
+    through other methods (`values`, `items`...) stay frozen.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, (FrozenDict, FrozenList)):
+            value = copy_on_write(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+
+class CopyOnWriteList(list):
+    """
+    Mutable list sharing its elements with a frozen list. A dict or list
+    element is copied the first time it is read through `[]` or iteration,
+    so it can be modified without altering the frozen original.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        value = list.__getitem__(self, index)
+        if isinstance(index, slice):
+            return CopyOnWriteList(value)
+        if isinstance(value, (FrozenDict, FrozenList)):
+            value = copy_on_write(value)
+            list.__setitem__(self, index, value)
+        return value
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def freeze(value):
+    """
+    Build a read-only version of given value: dicts and lists, nested ones
+    included, are turned into FrozenDict and FrozenList. Values that are
+    already frozen are returned as is, so freezing them again costs nothing.
+
+    Returns:
+        The frozen value.
+    """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    elif isinstance(value, dict):
+        return FrozenDict(
+            (key, freeze(element)) for key, element in value.items()
+        )
+    elif isinstance(value, list):
+        return FrozenList(freeze(element) for element in value)
+    elif isinstance(value, Record):
+        values = tuple(freeze(element) for element in value._values)
+        if all(
+            element is original
+            for element, original in zip(values, value._values)
+        ):
+            return value
+        return Record(value._schema, values)
+    return value
+
+
+def thaw(value):
+    """
+    Returns:
+        A mutable deep copy of given frozen value.
+    """
+    if isinstance(value, dict):
+        return dict((key, thaw(element)) for key, element in value.items())
+    elif isinstance(value, list):
+        return [thaw(element) for element in value]
+    return value
+
+
+def copy_on_write(value):
+    """
+    Wrap given frozen value so it can be modified without copying it first.
+    Only the top level is copied, nested values are copied when they are
+    read. Records are returned as is, they are read-only.
+
+    Returns:
+        CopyOnWriteDict / CopyOnWriteList: The mutable value.
+    """
+    if isinstance(value, FrozenDict):
+        return CopyOnWriteDict(value)
+    elif isinstance(value, FrozenList):
+        return CopyOnWriteList(value)
+    return value
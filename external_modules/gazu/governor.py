@@ -0,0 +1,181 @@
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket. Tokens are refilled continuously at *rate* per
+    second, up to *capacity*. Taking a token when the bucket is empty blocks
+    until one is available.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of tokens stored, which is the
+            allowed burst. Defaults to one second worth of tokens.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self.tokens = self.capacity
+        self.last_refill = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        Take *amount* tokens, waiting for them if needed. Amounts bigger than
+        the capacity are allowed, the bucket then goes in debt.
+
+        Returns:
+            float: Time waited, in seconds.
+        """
+        with self.lock:
+            now = time.time()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+            self.tokens -= amount
+            delay = 0.0
+            if self.tokens < 0:
+                delay = -self.tokens / self.rate
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class Governor(object):
+    """
+    Regulate the traffic sent to a host: a token bucket limits the request
+    rate, a semaphore limits the number of requests in flight and responses
+    asking to slow down (429 or 503 with a Retry-After header) pause every
+    request going through the governor. A governor is thread-safe and can be
+    shared by several clients targeting the same host.
+
+    Args:
+        rate (float): Maximum number of requests per second (no limit if
+            None).
+        burst (int): Number of requests allowed in a burst above the rate.
+        max_in_flight (int): Maximum number of concurrent requests (no limit
+            if None).
+    """
+
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.semaphore = None
+        if max_in_flight:
+            self.semaphore = threading.BoundedSemaphore(max_in_flight)
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.statistics = self._new_statistics()
+
+    def _new_statistics(self):
+        return {
+            "requests": 0,
+            "throttled": 0,
+            "throttled_time": 0.0,
+            "rate_limited_time": 0.0,
+            "concurrency_wait_time": 0.0,
+            "server_pause_time": 0.0,
+            "server_pauses": 0,
+            "max_in_flight_reached": 0,
+        }
+
+    def acquire(self):
+        """
+        Wait until a request can be sent. Must be followed by a call to
+        release once the response is received, or to release_on_close for a
+        streamed response.
+
+        Returns:
+            float: Time spent throttled, in seconds.
+        """
+        server_wait = self.paused_until - time.time()
+        if server_wait > 0:
+            time.sleep(server_wait)
+        else:
+            server_wait = 0.0
+
+        rate_wait = 0.0
+        if self.bucket is not None:
+            rate_wait = self.bucket.acquire()
+
+        concurrency_wait = 0.0
+        if self.semaphore is not None:
+            if not self.semaphore.acquire(False):
+                start = time.time()
+                self.semaphore.acquire()
+                concurrency_wait = time.time() - start
+
+        waited = server_wait + rate_wait + concurrency_wait
+        with self.lock:
+            self.in_flight += 1
+            statistics = self.statistics
+            statistics["requests"] += 1
+            statistics["server_pause_time"] += server_wait
+            statistics["rate_limited_time"] += rate_wait
+            statistics["concurrency_wait_time"] += concurrency_wait
+            statistics["throttled_time"] += waited
+            if waited > 0:
+                statistics["throttled"] += 1
+            if concurrency_wait > 0:
+                statistics["max_in_flight_reached"] += 1
+        return waited
+
+    def release(self):
+        """
+        Signal that a request acquired through the governor is done.
+        """
+        with self.lock:
+            self.in_flight -= 1
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    def release_on_close(self, response):
+        """
+        Keep the slot of a streamed request until its response is closed, so
+        reading the body counts as in flight too.
+        """
+        close = response.close
+        released = []
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released:
+                    released.append(True)
+                    self.release()
+
+        response.close = close_and_release
+
+    def pause(self, delay):
+        """
+        Hold every request going through the governor for *delay* seconds,
+        typically because the server answered 429 Too Many Requests.
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.time() + delay)
+            self.statistics["server_pauses"] += 1
+
+    def get_infos(self):
+        """
+        Returns:
+            dict: Governor settings and time spent throttled.
+        """
+        with self.lock:
+            infos = {
+                "rate": self.rate,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self.in_flight,
+            }
+            infos.update(self.statistics)
+        return infos
+
+    def reset_statistics(self):
+        with self.lock:
+            self.statistics = self._new_statistics()
@@ -1,5 +1,8 @@
+import os
 import re
 
+from .records import Record
+
 _UUID_RE = re.compile(
     "([a-fA-F0-9]{8}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{12}){1}"
 )
@@ -12,12 +15,12 @@ def normalize_model_parameter(model_parameter):
 
     Returns:
         dict: If `model_parameter` is an ID (a string), it turns it into a model
-        dict. If it's already a dict, the `model_parameter` is returned as it
-        is. It returns None if the paramater is None.
+        dict. If it's already a dict (or a record), the `model_parameter` is
+        returned as it is. It returns None if the paramater is None.
     """
     if model_parameter is None:
         return None
-    elif isinstance(model_parameter, dict):
+    elif isinstance(model_parameter, (dict, Record)):
         return model_parameter
     else:
         try:
@@ -29,3 +32,36 @@ def normalize_model_parameter(model_parameter):
             return {"id": id_str}
         else:
             raise ValueError("Wrong format: expected ID string or Data dict")
+
+
+def get_data_dir(*parts):
+    """
+    Args:
+        parts (str): Sub folders to append to the data folder.
+
+    Returns:
+        str: Folder where gazu stores its local data (tokens, caches,
+        journals). It is the folder set in the GAZU_DATA_DIR environment
+        variable or a .gazu folder in the user home. It is created if
+        needed.
+    """
+    root = os.environ.get("GAZU_DATA_DIR") or os.path.join(
+        os.path.expanduser("~"), ".gazu"
+    )
+    path = os.path.join(root, *parts)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return path
+
+
+def get_route_template(path):
+    """
+    Args:
+        path (str): Path of a request, with its query string if any.
+
+    Returns:
+        str: Path without query string and with IDs replaced by `:id`, to
+        group requests sent to the same route.
+    """
+    path = path.split("?", 1)[0].strip("/")
+    return _UUID_RE.sub(":id", path)
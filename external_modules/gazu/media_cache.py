@@ -0,0 +1,177 @@
+import glob
+import os
+import re
+import threading
+
+from .helpers import get_data_dir
+
+
+class MediaCache(object):
+    """
+    Local cache of media files (thumbnails, previews, avatars) shared by
+    every process of the workstation. Files are addressed by a key that
+    identifies their content, like the url path of an immutable preview file,
+    so a cached file never needs to be revalidated. Files are written
+    atomically, and the least recently used ones are removed when the cache
+    grows over its size budget.
+
+    Args:
+        folder (str): Cache folder. Defaults to the media folder of the gazu
+            data folder.
+        max_size (int): Size budget in bytes.
+    """
+
+    def __init__(self, folder=None, max_size=512 * 1024 * 1024):
+        self._folder = folder
+        self.max_size = max_size
+        self.size = None
+        self.lock = threading.Lock()
+        self.statistics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def folder(self):
+        if self._folder is None:
+            self._folder = get_data_dir("media")
+        return self._folder
+
+    def get_path(self, key):
+        """
+        Returns:
+            str: Location of the cached file for given key, None if it is not
+            cached.
+        """
+        path = self._get_path(key)
+        try:
+            os.utime(path, None)
+        except OSError:
+            with self.lock:
+                self.statistics["misses"] += 1
+            return None
+        with self.lock:
+            self.statistics["hits"] += 1
+        return path
+
+    def fetch(self, key, download):
+        """
+        Return the cached file for given key, downloading it first if needed.
+
+        Args:
+            key (str): Key identifying the file content.
+            download (function): Function saving the file at the location
+                given as argument.
+
+        Returns:
+            str: Location of the cached file.
+        """
+        path = self.get_path(key)
+        if path is not None:
+            return path
+
+        path = self._get_path(key)
+        tmp_path = "%s.%s-%s.tmp" % (
+            path,
+            os.getpid(),
+            threading.current_thread().ident,
+        )
+        try:
+            download(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            # Also remove files left by an interrupted download.
+            for leftover_path in glob.glob(glob.escape(tmp_path) + "*"):
+                _remove(leftover_path)
+        self._add(os.path.getsize(path))
+        return path
+
+    def put(self, key, data):
+        """
+        Store given bytes for given key.
+
+        Returns:
+            str: Location of the cached file.
+        """
+
+        def write(path):
+            with open(path, "wb") as cached_file:
+                cached_file.write(data)
+
+        return self.fetch(key, write)
+
+    def clear(self):
+        for file_path, _, _ in self._list_files():
+            _remove(file_path)
+        with self.lock:
+            self.size = 0
+
+    def get_infos(self):
+        """
+        Returns:
+            dict: Cache budget, size and statistics.
+        """
+        with self.lock:
+            infos = {
+                "folder": self._folder,
+                "max_size": self.max_size,
+                "current_bytes": self.size,
+            }
+            infos.update(self.statistics)
+        return infos
+
+    def _add(self, size):
+        with self.lock:
+            if self.size is not None:
+                self.size += size
+            if self.size is not None and self.size <= self.max_size:
+                return
+        # The size is unknown or over budget: scan the folder, which is
+        # shared with other processes, and drop the least recently used
+        # files until the cache is back under 90% of its budget.
+        files = sorted(self._list_files(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in files)
+        evictions = 0
+        if size > self.max_size:
+            target = self.max_size * 0.9
+            for file_path, _, file_size in files:
+                if size <= target:
+                    break
+                if _remove(file_path):
+                    size -= file_size
+                    evictions += 1
+        with self.lock:
+            self.size = size
+            self.statistics["evictions"] += evictions
+
+    def _list_files(self):
+        files = []
+        for folder, _, file_names in os.walk(self.folder):
+            for file_name in file_names:
+                if ".tmp" in file_name:
+                    continue
+                file_path = os.path.join(folder, file_name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                files.append((file_path, stat.st_mtime, stat.st_size))
+        return files
+
+    def _get_path(self, key):
+        parts = [
+            re.sub(r"[^\w.-]", "_", part).strip(".") or "_"
+            for part in key.strip("/").split("/")
+        ]
+        folder = os.path.join(self.folder, *parts[:-1])
+        if not os.path.isdir(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                pass
+        return os.path.join(folder, parts[-1])
+
+
+def _remove(file_path):
+    try:
+        os.remove(file_path)
+        return True
+    except OSError:
+        return False
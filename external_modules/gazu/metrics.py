@@ -0,0 +1,129 @@
+import json
+import threading
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+class RouteMetrics(object):
+    """
+    Aggregate request events sent by client hooks: call counts, errors,
+    transferred bytes and latency histograms per route. Routes are named
+    after the HTTP verb and the route template, like `GET data/shots/:id`.
+    Latency buckets are upper bounds in seconds, a last bucket counts slower
+    requests.
+
+    Args:
+        buckets (list): Upper bounds of latency buckets, in seconds.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def on_response(self, event):
+        self._add(event, error=event["status"] >= 400)
+
+    def on_error(self, event):
+        self._add(event, error=True)
+
+    def _add(self, event, error=False):
+        name = "%s %s" % (event["method"], event["route"])
+        duration = event["duration"]
+        bucket_index = len(self.buckets)
+        for index, bound in enumerate(self.buckets):
+            if duration <= bound:
+                bucket_index = index
+                break
+
+        with self.lock:
+            route = self.routes.get(name)
+            if route is None:
+                route = self.routes[name] = {
+                    "count": 0,
+                    "errors": 0,
+                    "bytes": 0,
+                    "total_time": 0.0,
+                    "min_time": duration,
+                    "max_time": duration,
+                    "histogram": [0] * (len(self.buckets) + 1),
+                    "statuses": {},
+                }
+            route["count"] += 1
+            route["total_time"] += duration
+            route["min_time"] = min(route["min_time"], duration)
+            route["max_time"] = max(route["max_time"], duration)
+            route["bytes"] += event.get("bytes") or 0
+            route["histogram"][bucket_index] += 1
+            if error:
+                route["errors"] += 1
+            status = str(event.get("status") or event.get("error"))
+            route["statuses"][status] = route["statuses"].get(status, 0) + 1
+
+    def get_percentile(self, name, percentile):
+        """
+        Estimate a latency percentile of a route from its histogram.
+
+        Args:
+            name (str): Route name, like `GET data/projects`.
+            percentile (float): Percentile between 0 and 100.
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, capped
+            by the route max time, in seconds.
+        """
+        with self.lock:
+            route = self.routes[name]
+            return self._get_percentile(route, percentile)
+
+    def _get_percentile(self, route, percentile):
+        threshold = route["count"] * percentile / 100.0
+        seen = 0
+        for index, count in enumerate(route["histogram"]):
+            seen += count
+            if count and seen >= threshold:
+                if index < len(self.buckets):
+                    return min(self.buckets[index], route["max_time"])
+                break
+        return route["max_time"]
+
+    def get_report(self):
+        """
+        Returns:
+            dict: Statistics per route, highest cumulated time first.
+        """
+        routes = []
+        with self.lock:
+            for name, route in self.routes.items():
+                route = dict(
+                    route,
+                    route=name,
+                    histogram=list(route["histogram"]),
+                    statuses=dict(route["statuses"]),
+                    mean_time=route["total_time"] / route["count"],
+                    p50=self._get_percentile(route, 50),
+                    p95=self._get_percentile(route, 95),
+                )
+                routes.append(route)
+        routes.sort(key=lambda route: route["total_time"], reverse=True)
+        return {"buckets": list(self.buckets), "routes": routes}
+
+    def dumps(self, indent=None):
+        """
+        Returns:
+            str: The report as JSON.
+        """
+        return json.dumps(self.get_report(), indent=indent)
+
+    def dump(self, path, indent=2):
+        """
+        Write the report as JSON in given file.
+        """
+        with open(path, "w") as report_file:
+            report_file.write(self.dumps(indent=indent))
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
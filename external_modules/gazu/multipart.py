@@ -0,0 +1,169 @@
+import mimetypes
+import os
+import uuid
+
+from .governor import TokenBucket
+
+
+class MultipartEncoder(object):
+    """
+    Stream a multipart/form-data body made of form fields and files. Files
+    are read chunk by chunk while the body is sent, so their content is never
+    fully loaded in memory, and each file is closed as soon as it is sent.
+    The body size is known in advance, so it is sent with a Content-Length
+    header rather than chunked.
+
+    Args:
+        fields (dict): Form fields. List values are sent as repeated fields.
+        files (dict): File paths by field name.
+        chunk_size (int): Size of the chunks yielded when iterating.
+        progress_callback (function): Called with the number of bytes sent
+            and the total size each time a chunk is read.
+        max_bandwidth (int): Maximum number of bytes sent per second (no
+            limit if None).
+    """
+
+    def __init__(
+        self,
+        fields=None,
+        files=None,
+        chunk_size=65536,
+        progress_callback=None,
+        max_bandwidth=None,
+    ):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = "multipart/form-data; boundary=%s" % self.boundary
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        self.bucket = None
+        if max_bandwidth:
+            self.bucket = TokenBucket(max_bandwidth)
+        self.parts = self._build_parts(fields or {}, files or {})
+        self.length = sum(
+            len(part) if isinstance(part, bytes) else os.path.getsize(part)
+            for part in self.parts
+        )
+        self.current_file = None
+        self.rewind()
+
+    def _build_parts(self, fields, files):
+        parts = []
+        for name, values in fields.items():
+            if not isinstance(values, (list, tuple)):
+                values = [values]
+            for value in values:
+                if not isinstance(value, bytes):
+                    value = str(value).encode("utf-8")
+                parts.append(self._get_part_header(name) + value + b"\r\n")
+
+        for name, file_path in files.items():
+            content_type = (
+                mimetypes.guess_type(file_path)[0]
+                or "application/octet-stream"
+            )
+            parts.append(
+                self._get_part_header(
+                    name, os.path.basename(file_path), content_type
+                )
+            )
+            parts.append(file_path)
+            parts.append(b"\r\n")
+
+        parts.append(("--%s--\r\n" % self.boundary).encode("ascii"))
+        return parts
+
+    def _get_part_header(self, name, file_name=None, content_type=None):
+        disposition = 'form-data; name="%s"' % _quote(name)
+        if file_name is not None:
+            disposition += '; filename="%s"' % _quote(file_name)
+        header = "--%s\r\nContent-Disposition: %s\r\n" % (
+            self.boundary,
+            disposition,
+        )
+        if content_type is not None:
+            header += "Content-Type: %s\r\n" % content_type
+        return (header + "\r\n").encode("utf-8")
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read(self, size=-1):
+        """
+        Args:
+            size (int): Maximum number of bytes to read, everything left if
+                negative.
+
+        Returns:
+            bytes: Next bytes of the body, empty once it is fully read.
+        """
+        if size is None or size < 0:
+            size = self.length - self.bytes_read
+        chunks = []
+        remaining = size
+        while remaining > 0 and self.part_index < len(self.parts):
+            part = self.parts[self.part_index]
+            if isinstance(part, bytes):
+                chunk = part[self.part_offset:self.part_offset + remaining]
+                self.part_offset += len(chunk)
+                done = self.part_offset >= len(part)
+            else:
+                if self.current_file is None:
+                    self.current_file = open(part, "rb")
+                chunk = self.current_file.read(remaining)
+                done = not chunk
+                if done:
+                    self.close()
+
+            if done:
+                self.part_index += 1
+                self.part_offset = 0
+            chunks.append(chunk)
+            remaining -= len(chunk)
+
+        data = b"".join(chunks)
+        if data:
+            self.bytes_read += len(data)
+            if self.bucket is not None:
+                self.bucket.acquire(len(data))
+            if self.progress_callback is not None:
+                self.progress_callback(self.bytes_read, self.length)
+        return data
+
+    def rewind(self):
+        """
+        Go back to the beginning of the body, to send it again.
+        """
+        self.close()
+        self.part_index = 0
+        self.part_offset = 0
+        self.bytes_read = 0
+
+    def close(self):
+        """
+        Close the file being read, if any.
+        """
+        if self.current_file is not None:
+            self.current_file.close()
+            self.current_file = None
+
+
+def _quote(value):
+    return (
+        value.replace("\\", "\\\\")
+        .replace('"', "%22")
+        .replace("\r", "%0D")
+        .replace("\n", "%0A")
+    )
@@ -0,0 +1,531 @@
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from . import asset, shot, task
+from . import client as raw
+
+from .breaker import CircuitBreaker
+from .client import default_client as default
+from .exception import (
+    HostUnreachableException,
+    NotAuthenticatedException,
+    ServerErrorException,
+)
+from .helpers import get_data_dir
+
+try:
+    import requests
+
+    TRANSIENT_ERRORS = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        HostUnreachableException,
+    )
+except ImportError:
+    TRANSIENT_ERRORS = (HostUnreachableException,)
+
+OPERATIONS = {
+    "add_comment": task.add_comment,
+    "add_preview": task.add_preview,
+    "publish_preview": task.publish_preview,
+    "set_main_preview": task.set_main_preview,
+    "update_shot": shot.update_shot,
+    "update_shot_data": shot.update_shot_data,
+    "update_asset": asset.update_asset,
+}
+
+# Operations taking a checkpoint argument, in which they record the steps
+# already done so a replay resumes from the step that failed.
+CHECKPOINTED_OPERATIONS = set(["publish_preview"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT NOT NULL,
+    queue TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    arguments TEXT NOT NULL,
+    files TEXT NOT NULL,
+    dedupe_key TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    failed INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    claimed_at REAL
+)
+"""
+
+
+def register_operation(name, function, checkpoint=False):
+    """
+    Make a function replayable from the offline journal. It is called with
+    the journaled arguments and the client as keyword arguments.
+
+    Args:
+        name (str): Name under which operations are journaled.
+        function (function): Function running the operation.
+        checkpoint (bool): Whether the function takes a checkpoint dict
+            argument, in which it records its completed steps. The
+            checkpoint is saved in the journal when the operation fails.
+    """
+    OPERATIONS[name] = function
+    if checkpoint:
+        CHECKPOINTED_OPERATIONS.add(name)
+    else:
+        CHECKPOINTED_OPERATIONS.discard(name)
+
+
+class OfflineJournal(object):
+    """
+    Durable queue of write operations that could not be sent to the API,
+    stored in a SQLite database shared by every process of the workstation.
+    Operations are replayed in order within a queue (typically one queue per
+    task), and the same operation journaled twice while waiting for replay
+    is stored once.
+
+    Args:
+        path (str): Location of the database. Defaults to offline.sqlite in
+            the gazu data folder.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_data_dir(), "offline.sqlite")
+        self.owner = "%s-%s" % (socket.gethostname(), os.getpid())
+        with self._connect() as connection:
+            connection.execute(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def add(self, host, operation, arguments, queue="", files=None):
+        """
+        Journal an operation. Files given are the ones the operation reads,
+        their size and modification date are part of the de-duplication key.
+
+        Args:
+            host (str): API host the operation targets.
+            operation (str): Registered operation name.
+            arguments (dict): Operation arguments, JSON serializable.
+            queue (str): Operations of the same queue are replayed in order.
+            files (list): Paths of the files used by the operation.
+
+        Returns:
+            bool: False if the operation is already waiting in the journal.
+        """
+        files = files or []
+        # The progress of an operation doesn't make it a different one.
+        fingerprint = [
+            host,
+            operation,
+            json.dumps(
+                dict(
+                    (key, value)
+                    for key, value in arguments.items()
+                    if key != "checkpoint"
+                ),
+                sort_keys=True,
+            ),
+        ]
+        for file_path in files:
+            stat = os.stat(file_path)
+            fingerprint.append([file_path, stat.st_size, stat.st_mtime])
+        dedupe_key = hashlib.sha1(
+            json.dumps(fingerprint).encode("utf-8")
+        ).hexdigest()
+
+        with self._connect() as connection:
+            # An operation given up earlier is journaled again as a new one,
+            # keeping the steps its replays completed.
+            failed = connection.execute(
+                "SELECT id, arguments FROM operations "
+                "WHERE dedupe_key = ? AND failed = 1",
+                (dedupe_key,),
+            ).fetchone()
+            if failed is not None:
+                checkpoint = json.loads(failed[1]).get("checkpoint")
+                if checkpoint:
+                    checkpoint = dict(checkpoint)
+                    checkpoint.update(arguments.get("checkpoint") or {})
+                    arguments = dict(arguments, checkpoint=checkpoint)
+                connection.execute(
+                    "DELETE FROM operations WHERE id = ?", (failed[0],)
+                )
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO operations "
+                "(host, queue, operation, arguments, files, dedupe_key, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    host,
+                    queue,
+                    operation,
+                    json.dumps(arguments, sort_keys=True),
+                    json.dumps(files),
+                    dedupe_key,
+                    time.time(),
+                ),
+            )
+            return cursor.rowcount == 1
+
+    def get_pending(self, host):
+        """
+        Returns:
+            list: Operations waiting to be replayed on given host, oldest
+            first.
+        """
+        with self._connect() as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                "SELECT * FROM operations WHERE host = ? AND failed = 0 "
+                "ORDER BY id",
+                (host,),
+            ).fetchall()
+        operations = []
+        for row in rows:
+            operation = dict(row)
+            operation["arguments"] = json.loads(operation["arguments"])
+            operation["files"] = json.loads(operation["files"])
+            operations.append(operation)
+        return operations
+
+    def get_failed(self, host=None):
+        """
+        Returns:
+            list: Operations given up after too many errors.
+        """
+        query = "SELECT * FROM operations WHERE failed = 1"
+        parameters = ()
+        if host is not None:
+            query += " AND host = ?"
+            parameters = (host,)
+        query += " ORDER BY id"
+        with self._connect() as connection:
+            connection.row_factory = sqlite3.Row
+            return [
+                dict(row) for row in connection.execute(query, parameters)
+            ]
+
+    def count(self, host=None, queue=None):
+        """
+        Returns:
+            int: Number of operations waiting to be replayed, for given host
+            and queue if set.
+        """
+        query = "SELECT COUNT(*) FROM operations WHERE failed = 0"
+        parameters = []
+        if host is not None:
+            query += " AND host = ?"
+            parameters.append(host)
+        if queue is not None:
+            query += " AND queue = ?"
+            parameters.append(queue)
+        with self._connect() as connection:
+            return connection.execute(query, parameters).fetchone()[0]
+
+    def claim(self, operation_id, expiration=600):
+        """
+        Reserve an operation for replay, so another process doesn't replay
+        it at the same time. Claims older than *expiration* seconds are
+        considered abandoned.
+
+        Returns:
+            bool: True if the operation is reserved by this journal.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE operations SET claimed_by = ?, claimed_at = ? "
+                "WHERE id = ? AND (claimed_by IS NULL OR claimed_by = ? "
+                "OR claimed_at < ?)",
+                (self.owner, now, operation_id, self.owner, now - expiration),
+            )
+            return cursor.rowcount == 1
+
+    def release(
+        self, operation_id, error=None, max_attempts=None, arguments=None
+    ):
+        """
+        Give back a claimed operation. When an error is given, it is stored
+        and the operation is marked as failed once it reached
+        *max_attempts*. When arguments are given, they replace the journaled
+        ones (to save the checkpoint of a partly done operation).
+        """
+        with self._connect() as connection:
+            if arguments is not None:
+                connection.execute(
+                    "UPDATE operations SET arguments = ? WHERE id = ?",
+                    (json.dumps(arguments, sort_keys=True), operation_id),
+                )
+            if error is None:
+                connection.execute(
+                    "UPDATE operations SET claimed_by = NULL WHERE id = ?",
+                    (operation_id,),
+                )
+            else:
+                connection.execute(
+                    "UPDATE operations SET claimed_by = NULL, "
+                    "attempts = attempts + 1, last_error = ?, "
+                    "failed = (attempts + 1 >= ?) WHERE id = ?",
+                    (error, max_attempts or 0, operation_id),
+                )
+
+    def remove(self, operation_id):
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM operations WHERE id = ?", (operation_id,)
+            )
+
+    def retry_failed(self, host=None, error=None):
+        """
+        Put failed operations back in the queue.
+
+        Args:
+            host (str): Only retry the operations of given host.
+            error (str): Only retry the operations whose last error starts
+                with given text, like an exception name.
+        """
+        query = (
+            "UPDATE operations SET failed = 0, attempts = 0 WHERE failed = 1"
+        )
+        parameters = []
+        if host is not None:
+            query += " AND host = ?"
+            parameters.append(host)
+        if error is not None:
+            query += " AND substr(last_error, 1, ?) = ?"
+            parameters.extend([len(error), error])
+        with self._connect() as connection:
+            connection.execute(query, parameters)
+
+
+def run_or_journal(
+    operation,
+    arguments,
+    queue="",
+    files=None,
+    journal=None,
+    client=default,
+):
+    """
+    Run given operation now, or journal it to be replayed later if the host
+    can't be reached.
+
+    Args:
+        operation (str): Registered operation name.
+        arguments (dict): Operation arguments, JSON serializable.
+        queue (str): Operations of the same queue are replayed in order,
+            typically the ID of the task they modify.
+        files (list): Paths of the files used by the operation.
+        journal (OfflineJournal): Journal to use. Defaults to the journal of
+            the default replayer.
+
+    Returns:
+        tuple: The operation result (None if journaled) and a boolean telling
+        if the operation was journaled, or was already waiting in the journal.
+    """
+    journal = journal or get_replayer(client=client).journal
+    if operation in CHECKPOINTED_OPERATIONS:
+        arguments = dict(arguments)
+        arguments["checkpoint"] = dict(arguments.get("checkpoint") or {})
+    # When earlier operations of the same queue are still pending, the
+    # operation is journaled directly to keep them in order. If it fails
+    # halfway, its checkpoint is journaled with it.
+    if journal.count(client.host, queue) == 0:
+        try:
+            return OPERATIONS[operation](client=client, **arguments), False
+        except TRANSIENT_ERRORS + (ServerErrorException,):
+            pass
+    journal.add(client.host, operation, arguments, queue=queue, files=files)
+    return None, True
+
+
+def journal_operation(
+    operation,
+    arguments,
+    queue="",
+    files=None,
+    journal=None,
+    client=default,
+):
+    """
+    Journal given operation without trying to run it, when the host is known
+    to be unreachable.
+
+    Returns:
+        bool: False if the operation was already journaled.
+    """
+    journal = journal or get_replayer(client=client).journal
+    return journal.add(
+        client.host, operation, arguments, queue=queue, files=files
+    )
+
+
+class Replayer(object):
+    """
+    Background thread replaying journaled operations once the host is up.
+    A circuit breaker spaces out the checks while the host stays down.
+
+    Args:
+        journal (OfflineJournal): Journal to drain.
+        client (KitsuClient): Client used to replay operations.
+        interval (float): Seconds between two checks of the journal.
+        breaker (CircuitBreaker): Breaker used for host checks.
+        max_attempts (int): Number of failed replays before an operation is
+            set aside as failed.
+    """
+
+    def __init__(
+        self,
+        journal=None,
+        client=default,
+        interval=30.0,
+        breaker=None,
+        max_attempts=5,
+    ):
+        self.journal = journal or OfflineJournal()
+        self.client = client
+        self.interval = interval
+        self.breaker = breaker or CircuitBreaker(failure_threshold=1)
+        self.max_attempts = max_attempts
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.drain_lock = threading.Lock()
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="gazu-replayer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.drain()
+            except Exception:
+                pass
+            self.stop_event.wait(self.interval)
+
+    def drain(self):
+        """
+        Replay pending operations if the host is up and the client is
+        logged in. Within a queue, operations are replayed in order and a
+        failing operation holds back the next ones. The drain stops as soon
+        as the host is unreachable or the session is refused, without
+        counting it as a failed attempt.
+
+        Returns:
+            int: Number of operations replayed.
+        """
+        host = self.client.host
+        with self.drain_lock:
+            # Without tokens every replay would be refused, the journal is
+            # held until the user logs in
+            if not self.client.tokens.get("access_token"):
+                return 0
+            if self.journal.count(host) == 0 or not self.breaker.allow():
+                return 0
+            if not raw.host_is_up(client=self.client):
+                self.breaker.record_failure()
+                return 0
+            self.breaker.record_success()
+
+            replayed = 0
+            blocked_queues = set()
+            for operation in self.journal.get_pending(host):
+                queue = operation["queue"]
+                if queue in blocked_queues:
+                    continue
+                if not self.journal.claim(operation["id"]):
+                    blocked_queues.add(queue)
+                    continue
+
+                missing_files = [
+                    file_path
+                    for file_path in operation["files"]
+                    if not os.path.exists(file_path)
+                ]
+                arguments = operation["arguments"]
+                checkpointed = None
+                if operation["operation"] in CHECKPOINTED_OPERATIONS:
+                    arguments.setdefault("checkpoint", {})
+                    checkpointed = arguments
+                try:
+                    if missing_files:
+                        raise IOError("Missing files: %s" % missing_files)
+                    OPERATIONS[operation["operation"]](
+                        client=self.client, **arguments
+                    )
+                except TRANSIENT_ERRORS:
+                    self.journal.release(
+                        operation["id"], arguments=checkpointed
+                    )
+                    self.breaker.record_failure()
+                    break
+                except NotAuthenticatedException:
+                    # Not an error of the operation: hold the journal until
+                    # the session is valid again
+                    self.journal.release(
+                        operation["id"], arguments=checkpointed
+                    )
+                    break
+                except Exception as exception:
+                    self.journal.release(
+                        operation["id"],
+                        error="%s: %s" % (type(exception).__name__, exception),
+                        max_attempts=self.max_attempts,
+                        arguments=checkpointed,
+                    )
+                    blocked_queues.add(queue)
+                else:
+                    self.journal.remove(operation["id"])
+                    replayed += 1
+            return replayed
+
+
+default_replayer = None
+replayer_lock = threading.Lock()
+
+
+def get_replayer(client=default):
+    """
+    Returns:
+        Replayer: The replayer of the default journal for given client,
+        created on first call. The replayer of another client is stopped.
+    """
+    global default_replayer
+    with replayer_lock:
+        if default_replayer is None or default_replayer.client is not client:
+            if default_replayer is not None:
+                default_replayer.stop()
+            default_replayer = Replayer(client=client)
+        return default_replayer
+
+
+def start_replayer(client=default, interval=30.0):
+    """
+    Start replaying journaled operations in the background.
+
+    Returns:
+        Replayer: The started replayer.
+    """
+    replayer = get_replayer(client=client)
+    replayer.interval = interval
+    replayer.start()
+    return replayer
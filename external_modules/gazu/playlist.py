@@ -50,6 +50,24 @@ def all_playlists_for_project(project, client=default, page=1):
     )
 
 
+def iter_playlists_for_project(project, prefetch=False, client=default):
+    """
+    Args:
+        project (str / dict): The project dict or the project ID.
+        prefetch (bool): Request next page while current one is processed.
+
+    Returns:
+        generator: Playlists of every page for the given project.
+    """
+    project = normalize_model_parameter(project)
+    return raw.paginate(
+        "data/projects/%s/playlists" % project["id"],
+        pagination="page",
+        prefetch=prefetch,
+        client=client
+    )
+
+
 @cache
 def all_playlists_for_episode(episode, client=default):
     """
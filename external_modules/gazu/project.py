@@ -1,7 +1,7 @@
 from . import client as raw
 
 from .sorting import sort_by_name
-from .cache import cache
+from .cache import cache, REFERENCE_DISK_EXPIRE
 from .helpers import normalize_model_parameter
 
 default = raw.default_client
@@ -16,6 +16,9 @@ def all_project_status(client=default):
     return sort_by_name(raw.fetch_all("project-status", client=client))
 
 
+all_project_status.set_cache_disk_expire(REFERENCE_DISK_EXPIRE)
+
+
 @cache
 def get_project_status_by_name(project_status_name, client=default):
     """
@@ -0,0 +1,127 @@
+import re
+import sys
+import threading
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+_UUID_RE = re.compile(
+    "^[a-fA-F0-9]{8}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-[a-fA-F0-9]{4}-"
+    "[a-fA-F0-9]{12}$"
+)
+
+_schemas = {}
+_schemas_lock = threading.Lock()
+
+
+class Schema(object):
+    """
+    Keys shared by all records built from dicts with the same keys, in the
+    same order. Keys are interned and stored once for all those records.
+    """
+
+    __slots__ = ("keys", "indexes")
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.indexes = dict((key, index) for index, key in enumerate(keys))
+
+
+def get_schema(keys):
+    """
+    Returns:
+        Schema: The schema shared by records with given keys.
+    """
+    schema = _schemas.get(keys)
+    if schema is None:
+        with _schemas_lock:
+            schema = _schemas.setdefault(
+                keys, Schema(tuple(_intern(key) for key in keys))
+            )
+    return schema
+
+
+class Record(Mapping):
+    """
+    Read-only and compact replacement for an entity dict: the values are
+    stored in a tuple and the keys in a schema shared with similar records.
+    Records are accessed like dicts (`record["name"]`, `record.get("id")`,
+    `record.items()`...). Use `to_dict` to get a mutable dict.
+    """
+
+    __slots__ = ("_schema", "_values")
+
+    def __init__(self, schema, values):
+        self._schema = schema
+        self._values = values
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._schema.indexes[key]]
+        except KeyError:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._schema.keys)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return "Record(%r)" % self.to_dict()
+
+    def __reduce__(self):
+        return (_make_record, (self._schema.keys, self._values))
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: A mutable copy of the record.
+        """
+        return dict(zip(self._schema.keys, self._values))
+
+
+def _make_record(keys, values):
+    return Record(get_schema(keys), values)
+
+
+def compact(value):
+    """
+    Turn a dict into a record. IDs found in its values are interned, so each
+    ID is stored once whatever the number of records referencing it. Nested
+    dicts (like the `data` field) are kept as dicts.
+
+    Returns:
+        Record: The record, or given value unchanged if it is not a dict.
+    """
+    if not isinstance(value, dict):
+        return value
+    return Record(
+        get_schema(tuple(value)),
+        tuple(_compact_value(field) for field in value.values()),
+    )
+
+
+def compact_list(values):
+    """
+    Returns:
+        list: Given list with its dicts turned into records.
+    """
+    return [compact(value) for value in values]
+
+
+def _compact_value(value):
+    if isinstance(value, str):
+        if len(value) == 36 and _UUID_RE.match(value):
+            return _intern(value)
+    elif isinstance(value, list):
+        return [_compact_value(element) for element in value]
+    return value
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+import threading
+
+from .helpers import get_data_dir
+
+
+class UploadJournal(object):
+    """
+    Remember uploads in progress, so an interrupted upload restarts where it
+    stopped instead of from the beginning. There is one JSON entry per file,
+    keyed by the file hash, so renaming or moving the file doesn't lose the
+    progress.
+
+    Args:
+        folder (str): Folder where entries are stored. Defaults to the
+            uploads folder of the gazu data folder.
+    """
+
+    def __init__(self, folder=None):
+        self.folder = folder or get_data_dir("uploads")
+        self.lock = threading.Lock()
+
+    def get(self, file_hash):
+        """
+        Returns:
+            dict: Entry of the upload of given file, None if there is none.
+        """
+        try:
+            with open(self._get_path(file_hash), "r") as entry_file:
+                return json.load(entry_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def save(self, file_hash, entry):
+        entry_path = self._get_path(file_hash)
+        tmp_path = "%s.%s.tmp" % (entry_path, threading.current_thread().ident)
+        with self.lock:
+            with open(tmp_path, "w") as entry_file:
+                json.dump(entry, entry_file)
+            os.replace(tmp_path, entry_path)
+
+    def remove(self, file_hash):
+        try:
+            os.remove(self._get_path(file_hash))
+        except OSError:
+            pass
+
+    def _get_path(self, file_hash):
+        return os.path.join(self.folder, "%s.json" % file_hash)
+
+
+def get_file_hash(file_path, chunk_size=1024 * 1024):
+    """
+    Returns:
+        str: SHA-1 hex digest of given file, read chunk by chunk.
+    """
+    file_hash = hashlib.sha1()
+    with open(file_path, "rb") as file_object:
+        for chunk in iter(lambda: file_object.read(chunk_size), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
@@ -0,0 +1,115 @@
+import email.utils
+import random
+import time
+
+
+class RetryPolicy(object):
+    """
+    Describe how a client retries requests that failed for a transient
+    reason (connection drop, timeout, gateway error...).
+
+    Idempotent verbs (GET, HEAD, PUT, DELETE) are retried automatically. POST
+    requests are retried only when the caller explicitly flags them as
+    idempotent.
+
+    Args:
+        max_retries (int): Number of retries allowed after the first attempt.
+        backoff_factor (float): Base delay in seconds. The delay before the
+            nth retry is `backoff_factor * 2 ** n`.
+        max_backoff (float): Upper bound in seconds for a single delay.
+        jitter (float): Ratio of the delay that is randomized (0 disables
+            jitter, 1 means a delay picked between 0 and the full delay).
+        status_codes (list): HTTP status codes considered as transient.
+        methods (list): HTTP verbs retried without being flagged idempotent.
+    """
+
+    def __init__(
+        self,
+        max_retries=3,
+        backoff_factor=0.5,
+        max_backoff=30.0,
+        jitter=0.5,
+        status_codes=(429, 502, 503, 504),
+        methods=("GET", "HEAD", "PUT", "DELETE"),
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_codes = set(status_codes)
+        self.methods = set(method.upper() for method in methods)
+
+    def is_idempotent(self, method):
+        """
+        Returns:
+            bool: True if given HTTP verb is retried automatically.
+        """
+        return method.upper() in self.methods
+
+    def can_retry(self, attempt):
+        """
+        Args:
+            attempt (int): Number of retries already done.
+
+        Returns:
+            bool: True if another retry is allowed.
+        """
+        return attempt < self.max_retries
+
+    def is_retryable_status(self, status_code):
+        """
+        Returns:
+            bool: True if given status code is worth a retry.
+        """
+        return status_code in self.status_codes
+
+    def get_backoff(self, attempt, retry_after=None):
+        """
+        Compute the time to wait before next retry. A `Retry-After` value sent
+        by the server takes precedence over the exponential backoff.
+
+        Args:
+            attempt (int): Number of retries already done.
+            retry_after (str): Value of the Retry-After header, if any.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_backoff)
+
+        delay = min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+        if self.jitter > 0:
+            delay -= delay * self.jitter * random.random()
+        return delay
+
+
+def parse_retry_after(value):
+    """
+    Args:
+        value (str): Retry-After header value, either a number of seconds or
+            an HTTP date.
+
+    Returns:
+        float: Delay in seconds, None if the value can't be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parsed_date = email.utils.parsedate_tz(value)
+    if parsed_date is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed_date) - time.time())
+
+
+def no_retry():
+    """
+    Returns:
+        RetryPolicy: A policy that never retries.
+    """
+    return RetryPolicy(max_retries=0)
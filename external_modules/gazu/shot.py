@@ -1,7 +1,7 @@
 from . import client as raw
 
 from .sorting import sort_by_name
-from .cache import cache
+from .cache import cache, ENTITY_LIST_DISK_EXPIRE
 from .helpers import normalize_model_parameter
 
 default = raw.default_client
@@ -35,6 +35,22 @@ def all_shots_for_project(project, client=default):
     return sort_by_name(shots)
 
 
+all_shots_for_project.set_cache_disk_expire(ENTITY_LIST_DISK_EXPIRE)
+
+
+def iter_shots_for_project(project, client=default):
+    """
+    Args:
+        project (str / dict): The project dict or the project ID.
+
+    Returns:
+        generator: Shots from database for given project, yielded one at a
+        time while they are downloaded (not sorted).
+    """
+    project = normalize_model_parameter(project)
+    return raw.iter_all("projects/%s/shots" % project["id"], client=client)
+
+
 @cache
 def all_shots_for_episode(episode, client=default):
     """
@@ -80,6 +96,9 @@ def all_sequences_for_project(project, client=default):
     return sort_by_name(sequences)
 
 
+all_sequences_for_project.set_cache_disk_expire(ENTITY_LIST_DISK_EXPIRE)
+
+
 @cache
 def all_sequences_for_episode(episode, client=default):
     """
@@ -110,6 +129,9 @@ def all_episodes_for_project(project, client=default):
     return sort_by_name(episodes)
 
 
+all_episodes_for_project.set_cache_disk_expire(ENTITY_LIST_DISK_EXPIRE)
+
+
 @cache
 def get_episode(episode_id, client=default):
     """
@@ -211,6 +233,45 @@ def get_shot(shot_id, client=default):
     return raw.fetch_one("shots", shot_id, client=client)
 
 
+def get_shots(shots, client=default):
+    """
+    Args:
+        shots (list): The shot dicts or the shot IDs.
+
+    Returns:
+        tuple: Shots corresponding to given IDs, in the same order, and IDs
+        for which no shot exists.
+    """
+    ids = [normalize_model_parameter(shot)["id"] for shot in shots]
+    return raw.fetch_many("shots", ids, client=client)
+
+
+def get_sequences(sequences, client=default):
+    """
+    Args:
+        sequences (list): The sequence dicts or the sequence IDs.
+
+    Returns:
+        tuple: Sequences corresponding to given IDs, in the same order, and
+        IDs for which no sequence exists.
+    """
+    ids = [normalize_model_parameter(sequence)["id"] for sequence in sequences]
+    return raw.fetch_many("sequences", ids, client=client)
+
+
+def get_episodes(episodes, client=default):
+    """
+    Args:
+        episodes (list): The episode dicts or the episode IDs.
+
+    Returns:
+        tuple: Episodes corresponding to given IDs, in the same order, and IDs
+        for which no episode exists.
+    """
+    ids = [normalize_model_parameter(episode)["id"] for episode in episodes]
+    return raw.fetch_many("episodes", ids, client=client)
+
+
 @cache
 def get_shot_by_name(sequence, shot_name, client=default):
     """
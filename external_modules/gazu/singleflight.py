@@ -0,0 +1,75 @@
+import sys
+import threading
+
+
+class Call(object):
+    """
+    A computation in progress, on which concurrent callers wait.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Make concurrent calls sharing the same key run only once: the first
+    caller runs the function while the others wait for its result. Once the
+    call is over, the next caller for that key runs the function again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.statistics = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, function, *args, **kwargs):
+        """
+        Run *function* unless a call for *key* is already in progress, in
+        which case its result is awaited. Exceptions are propagated to every
+        waiting caller.
+
+        Returns:
+            tuple: The function result and a boolean telling if the result is
+            shared with the caller that ran the function.
+        """
+        with self.lock:
+            self.statistics["calls"] += 1
+            call = self.calls.get(key)
+            if call is not None:
+                self.statistics["coalesced"] += 1
+                is_leader = False
+            else:
+                call = Call()
+                self.calls[key] = call
+                is_leader = True
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = function(*args, **kwargs)
+        except BaseException:
+            call.error = sys.exc_info()[1]
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+        return call.value, False
+
+    def get_infos(self):
+        """
+        Returns:
+            dict: Number of calls and of calls that waited for another one
+            instead of running the function.
+        """
+        with self.lock:
+            infos = {"in_progress": len(self.calls)}
+            infos.update(self.statistics)
+        return infos
@@ -0,0 +1,88 @@
+import codecs
+import json
+
+WHITESPACES = " \t\n\r"
+DELIMITERS = WHITESPACES + ",]"
+
+
+def iter_json_array(chunks, encoding="utf-8"):
+    """
+    Parse incrementally a JSON array received as a sequence of byte chunks
+    and yield its elements one by one. Only the element being parsed is kept
+    in memory.
+
+    Args:
+        chunks (iterable): Bytes chunks of the JSON document.
+        encoding (str): Encoding of the document.
+
+    Returns:
+        generator: Elements of the JSON array.
+
+    Raises:
+        ValueError: when the document is not a valid JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    chunks = iter(chunks)
+    state = {"buffer": "", "exhausted": False}
+
+    def read_more(index):
+        """
+        Drop parsed characters and append next chunk to the buffer.
+
+        Returns:
+            bool: False if there is nothing left to read.
+        """
+        if state["exhausted"]:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            state["exhausted"] = True
+            text = text_decoder.decode(b"", final=True)
+        else:
+            text = text_decoder.decode(chunk)
+        state["buffer"] = state["buffer"][index:] + text
+        return True
+
+    index = 0
+    started = False
+    while True:
+        buffer = state["buffer"]
+        while index < len(buffer) and buffer[index] in WHITESPACES:
+            index += 1
+
+        if index >= len(buffer):
+            if not read_more(index):
+                raise ValueError("Unexpected end of JSON array")
+            index = 0
+            continue
+
+        char = buffer[index]
+        if not started:
+            if char != "[":
+                raise ValueError("JSON document is not an array")
+            started = True
+            index += 1
+        elif char == "]":
+            return
+        elif char == ",":
+            index += 1
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, index)
+                # A number could continue in the next chunk, the value is
+                # complete only once a delimiter follows it.
+                complete = state["exhausted"] or (
+                    end < len(buffer) and buffer[end] in DELIMITERS
+                )
+            except ValueError:
+                if state["exhausted"]:
+                    raise
+                complete = False
+
+            if complete:
+                index = end
+                yield value
+            else:
+                read_more(index)
+                index = 0
@@ -33,6 +33,73 @@ def get_last_events(
     return raw.get(path, params=params, client=client)
 
 
+def iter_last_events(
+    page_size=20000, project=None, after=None, before=None, client=default
+):
+    """
+    Same as get_last_events but events are yielded one at a time while the
+    response is downloaded, to process big pages in constant memory.
+
+    Args:
+        page_size (int): Number of events to retrieve.
+        project (dict/id): Get only events related to this project.
+        after (dict/id): Get only events occuring after given date.
+        before (dict/id): Get only events occuring before given date.
+
+    Returns:
+        generator: Last events matching criterions.
+    """
+    path = "/data/events/last"
+    params = {"page_size": page_size}
+    if project is not None:
+        project = normalize_model_parameter(project)
+        params["project_id"] = project["id"]
+    if after is not None:
+        params["after"] = after
+    if before is not None:
+        params["before"] = before
+    return raw.iter_get(path, params=params, client=client)
+
+
+def iter_events(
+    page_size=1000, project=None, after=None, before=None, prefetch=True,
+    client=default
+):
+    """
+    Walk through all events, from the most recent to the oldest, page after
+    page. The date of the last event of a page is used as cursor to get the
+    next one.
+
+    Args:
+        page_size (int): Number of events retrieved per request.
+        project (dict/id): Get only events related to this project.
+        after (dict/id): Get only events occuring after given date.
+        before (dict/id): Get only events occuring before given date.
+        prefetch (bool): Request next page while current one is processed.
+
+    Returns:
+        generator: Events matching criterions.
+    """
+    params = {"page_size": page_size}
+    if project is not None:
+        project = normalize_model_parameter(project)
+        params["project_id"] = project["id"]
+    if after is not None:
+        params["after"] = after
+    if before is not None:
+        params["before"] = before
+    return raw.paginate(
+        "/data/events/last",
+        params=params,
+        pagination="cursor",
+        page_size=page_size,
+        cursor_param="before",
+        cursor_field="created_at",
+        prefetch=prefetch,
+        client=client
+    )
+
+
 def import_entities(entities, client=default):
     """
     Import entities from another instance to target instance (keep id and audit
@@ -5,7 +5,7 @@ from . import client as raw
 from .sorting import sort_by_name
 from .helpers import normalize_model_parameter
 
-from .cache import cache
+from .cache import cache, REFERENCE_DISK_EXPIRE
 
 default = raw.default_client
 
@@ -20,6 +20,9 @@ def all_task_statuses(client=default):
     return sort_by_name(task_statuses)
 
 
+all_task_statuses.set_cache_disk_expire(REFERENCE_DISK_EXPIRE)
+
+
 @cache
 def all_task_types(client=default):
     """
@@ -30,6 +33,9 @@ def all_task_types(client=default):
     return sort_by_name(task_types)
 
 
+all_task_types.set_cache_disk_expire(REFERENCE_DISK_EXPIRE)
+
+
 @cache
 def all_task_types_for_project(project, client=default):
     """
@@ -723,19 +729,43 @@ def create_preview(task, comment, client=default):
     return raw.post(path, {}, client=client)
 
 
-def upload_preview_file(preview, file_path, client=default):
+def upload_preview_file(
+    preview,
+    file_path,
+    client=default,
+    progress_callback=None,
+    resumable=False,
+):
     """
     Create a preview into given comment.
 
     Args:
         task (str / dict): The task dict or the task ID.
         file_path (str): Path of the file to upload as preview.
+        progress_callback (function): Called with the number of bytes sent
+            and the file size while uploading.
+        resumable (bool): Upload the file by chunks, resuming after
+            connection drops (see raw.upload_resumable).
     """
     path = "pictures/preview-files/%s" % preview["id"]
-    raw.upload(path, file_path, client=client)
+    if resumable:
+        raw.upload_resumable(
+            path, file_path, client=client, progress_callback=progress_callback
+        )
+    else:
+        raw.upload(
+            path, file_path, client=client, progress_callback=progress_callback
+        )
 
 
-def add_preview(task, comment, preview_file_path, client=default):
+def add_preview(
+    task,
+    comment,
+    preview_file_path,
+    client=default,
+    progress_callback=None,
+    resumable=False,
+):
     """
     Add a preview to given comment.
 
@@ -743,15 +773,91 @@ def add_preview(task, comment, preview_file_path, client=default):
         task (str / dict): The task dict or the task ID.
         comment (str / dict): The comment or the comment ID.
         preview_file_path (str): Path of the file to upload as preview.
+        progress_callback (function): Called with the number of bytes sent
+            and the file size while uploading.
+        resumable (bool): Upload the file by chunks, resuming after
+            connection drops.
 
     Returns:
         dict: Created preview file model.
     """
     preview_file = create_preview(task, comment, client=client)
-    upload_preview_file(preview_file, preview_file_path, client=client)
+    upload_preview_file(
+        preview_file,
+        preview_file_path,
+        client=client,
+        progress_callback=progress_callback,
+        resumable=resumable,
+    )
     return preview_file
 
 
+def publish_preview(
+    task,
+    task_status,
+    comment="",
+    person=None,
+    preview_file_path=None,
+    set_thumbnail=False,
+    client=default,
+    progress_callback=None,
+    resumable=False,
+    checkpoint=None,
+):
+    """
+    Add a comment with a preview to given task, and optionally use the
+    preview as entity thumbnail.
+
+    Each completed step (comment, preview creation, upload, thumbnail) is
+    recorded in the checkpoint dict. Calling the function again with the
+    same checkpoint, after a failure, skips the steps already done instead
+    of posting a second comment.
+
+    Args:
+        task (str / dict): The task dict or the task ID.
+        task_status (str / dict): The task status dict or ID.
+        comment (str): Comment text
+        person (str / dict): Comment author
+        preview_file_path (str): Path of the file to upload as preview.
+        set_thumbnail (bool): Set the preview as entity thumbnail.
+        progress_callback (function): Called with the number of bytes sent
+            and the file size while uploading.
+        resumable (bool): Upload the file by chunks, resuming after
+            connection drops.
+        checkpoint (dict): Progress of a previous call, updated in place.
+
+    Returns:
+        tuple: Created comment and preview file model.
+    """
+    if checkpoint is None:
+        checkpoint = {}
+    if "comment" not in checkpoint:
+        checkpoint["comment"] = add_comment(
+            task, task_status, comment=comment, person=person, client=client
+        )
+    new_comment = checkpoint["comment"]
+    preview_file = None
+    if preview_file_path is not None:
+        if "preview_file" not in checkpoint:
+            checkpoint["preview_file"] = create_preview(
+                task, new_comment, client=client
+            )
+        preview_file = checkpoint["preview_file"]
+        if not checkpoint.get("uploaded"):
+            upload_preview_file(
+                preview_file,
+                preview_file_path,
+                client=client,
+                progress_callback=progress_callback,
+                resumable=resumable,
+            )
+            checkpoint["uploaded"] = True
+        if set_thumbnail and not checkpoint.get("main_preview_set"):
+            set_main_preview(preview_file, client=client)
+            checkpoint["main_preview_set"] = True
+    return new_comment, preview_file
+
+
 def set_main_preview(preview_file, client=default):
     """
     Set given preview as thumbnail of given entity.
@@ -909,3 +1015,17 @@ def all_tasks_for_project(project, client=default):
     project = normalize_model_parameter(project)
     path = "/data/projects/%s/tasks" % project["id"]
     return raw.get(path, client=client)
+
+
+def iter_tasks_for_project(project, client=default):
+    """
+    Args:
+        project (str / dict): The project
+
+    Returns:
+        generator: Tasks related to given project, yielded one at a time
+        while they are downloaded.
+    """
+    project = normalize_model_parameter(project)
+    path = "/data/projects/%s/tasks" % project["id"]
+    return raw.iter_get(path, client=client)
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+from .helpers import get_data_dir
+
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+KEYRING_SERVICE = "gazu"
+
+
+class TokenStore(object):
+    """
+    Persist authentication tokens between sessions, per host and user.
+    Tokens are stored in the system keyring when the keyring module is
+    installed. Otherwise they are stored in a JSON file readable only by the
+    current user.
+
+    Args:
+        path (str): Location of the JSON file used when no keyring is
+            available. Defaults to tokens.json in the gazu data folder.
+        use_keyring (bool): Use the system keyring if available.
+    """
+
+    def __init__(self, path=None, use_keyring=True):
+        self.path = path or os.path.join(get_data_dir(), "tokens.json")
+        self.use_keyring = use_keyring and keyring is not None
+        self.lock = threading.Lock()
+
+    def load(self, host, email):
+        """
+        Returns:
+            dict: Tokens stored for given host and user, None if there is
+            none.
+        """
+        key = get_token_key(host, email)
+        with self.lock:
+            if self.use_keyring:
+                value = keyring.get_password(KEYRING_SERVICE, key)
+                return json.loads(value) if value else None
+            return self._read_file().get(key)
+
+    def save(self, host, email, tokens):
+        """
+        Store tokens for given host and user. Only the access and refresh
+        tokens are kept.
+        """
+        key = get_token_key(host, email)
+        tokens = {
+            "access_token": tokens.get("access_token", ""),
+            "refresh_token": tokens.get("refresh_token", ""),
+        }
+        with self.lock:
+            if self.use_keyring:
+                keyring.set_password(KEYRING_SERVICE, key, json.dumps(tokens))
+                return
+            data = self._read_file()
+            data[key] = tokens
+            self._write_file(data)
+
+    def delete(self, host, email):
+        """
+        Forget tokens stored for given host and user.
+        """
+        key = get_token_key(host, email)
+        with self.lock:
+            if self.use_keyring:
+                try:
+                    keyring.delete_password(KEYRING_SERVICE, key)
+                except keyring.errors.PasswordDeleteError:
+                    pass
+                return
+            data = self._read_file()
+            if data.pop(key, None) is not None:
+                self._write_file(data)
+
+    def _read_file(self):
+        try:
+            with open(self.path, "r") as token_file:
+                return json.load(token_file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _write_file(self, data):
+        tmp_path = "%s.%s.tmp" % (self.path, os.getpid())
+        file_descriptor = os.open(
+            tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+        with os.fdopen(file_descriptor, "w") as token_file:
+            json.dump(data, token_file)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+
+def get_token_key(host, email):
+    return "%s|%s" % (host.rstrip("/"), email.lower())
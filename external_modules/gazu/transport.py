@@ -0,0 +1,45 @@
+try:
+    import requests
+except ImportError:
+    requests = None
+
+
+class RequestsTransport(object):
+    """
+    Transport sending requests over HTTP through a requests session. The
+    session keeps connections alive and reuses them between requests.
+
+    A transport is any object with a `request(method, url, **kwargs)` method
+    taking the arguments of `requests.Session.request` and returning a
+    `requests.Response`. See FakeZouTransport for an in-memory one.
+
+    Args:
+        pool_connections (int): Number of hosts for which connections are
+            kept alive.
+        pool_maxsize (int): Maximum number of connections kept alive per
+            host.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10):
+        self.session = requests.Session()
+        self.configure_pool(pool_connections, pool_maxsize)
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def configure_pool(self, pool_connections=10, pool_maxsize=10):
+        """
+        Mount a connection adapter with given pool sizes on the session.
+
+        Returns:
+            HTTPAdapter: The mounted adapter.
+        """
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        return adapter
+
+    def close(self):
+        self.session.close()
@@ -123,39 +123,35 @@ class PersonModel(QtCore.QAbstractListModel):
     def _download_icons(self, ids):
         """Return thumbnail for person file from *url*.
 
+        Avatars are read through the gazu media cache. The cache key holds
+        the person update date, so a changed avatar is downloaded again.
+
         Args:
             url (str): The relative url in the form of
                 'pictures/thumbnails/{type}/{id}.png'
 
         """
-
-        # Create our session
-        import requests
-        session = requests.Session()
-        header = gazu.client.make_auth_header()
-
         data = {}
         for person_id in ids:
 
             url = "pictures/thumbnails/persons/{0}.png".format(person_id)
-            full_url = gazu.client.get_full_url(url)
-
-            with session.get(
-                full_url,
-                headers=header,
-                stream=True
-            ) as response:
-
-                if response.status_code != 200:
-                    # Request failed
-                    log.error("Failed request: %s" % full_url)
-                    continue
-
-                bytes = QtCore.QByteArray()
-                for chunk in response.iter_content(8192):
-                    bytes.append(chunk)
-
-                if not bytes.isNull():
-                    data[person_id] = bytes
+            updated_at = self._persons[person_id].get("updated_at") or ""
+            key = "pictures/thumbnails/persons/{0}-{1}.png".format(
+                person_id, updated_at)
+
+            try:
+                content = gazu.client.get_media_data(
+                    url,
+                    key=key,
+                    cache=bool(updated_at)
+                )
+            except Exception:
+                # Request failed
+                log.error("Failed request: %s" % url)
+                continue
+
+            bytes = QtCore.QByteArray(content)
+            if not bytes.isNull():
+                data[person_id] = bytes
 
         return data
@@ -84,21 +84,16 @@ class ThumbnailBase(QtWidgets.QLabel):
     def _download(self, url):
         """Return thumbnail file from *url*.
 
+        Preview file thumbnails are immutable and read through the gazu
+        media cache, shared by every session on the workstation.
+
         Args:
             url (str): The relative url in the form of
                 'pictures/thumbnails/{type}/{id}.png'
 
         """
-        full_url = gazu.client.get_full_url(url)
-        requests_session = gazu.client.requests_session
-
-        with requests_session.get(
-            full_url,
-            headers=gazu.client.make_auth_header(),
-            stream=True
-        ) as response:
-            bytes = QtCore.QByteArray()
-            for chunk in response.iter_content(8192):
-                bytes.append(chunk)
-
-            return bytes
+        data = gazu.client.get_media_data(
+            url,
+            cache="/preview-files/" in url
+        )
+        return QtCore.QByteArray(data)
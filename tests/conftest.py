@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "external_modules"))
+
+from gazu import client as raw  # noqa: E402
+from gazu.fake_zou import create_fake_client  # noqa: E402
+from gazu.retry import RetryPolicy  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    """
+    Client logged in on a new fake Zou server, retrying without waiting.
+    """
+    client = create_fake_client()
+    raw.set_retry_policy(
+        RetryPolicy(max_retries=3, backoff_factor=0, jitter=0), client=client
+    )
+    return client
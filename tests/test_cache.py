@@ -0,0 +1,105 @@
+import threading
+import time
+
+from gazu import cache
+from gazu.frozen import FrozenDict
+from gazu.records import compact
+
+
+def test_cache_key_reduces_models_to_their_id():
+    entity = {"id": "entity-id", "name": "SH010", "data": {"a": [1, 2]}}
+    edited = dict(entity, name="SH020")
+    assert cache.get_cache_key((entity, "main"), {}) == cache.get_cache_key(
+        ("entity-id", "main"), {}
+    )
+    assert cache.get_cache_key((edited,), {}) == cache.get_cache_key(
+        (entity,), {}
+    )
+
+
+def test_cache_key_tells_booleans_integers_and_floats_apart():
+    keys = set(
+        cache.get_cache_key((value,), {}) for value in (True, 1, 1.0)
+    )
+    assert len(keys) == 3
+    keys = set(
+        cache.get_cache_key((), {"relations": value})
+        for value in (False, 0, 0.0)
+    )
+    assert len(keys) == 3
+
+
+def test_cached_function_keeps_booleans_and_integers_apart():
+    cache.enable()
+    try:
+
+        @cache.cache
+        def get_type(value):
+            return type(value).__name__
+
+        assert [get_type(value) for value in (True, 1, 1.0, True)] == [
+            "bool",
+            "int",
+            "float",
+            "bool",
+        ]
+        infos = get_type.get_cache_infos()
+        assert infos["misses"] == 3
+        assert infos["hits"] == 1
+    finally:
+        cache.disable()
+
+
+def test_coalesced_callers_are_not_counted_as_misses():
+    cache.enable()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    try:
+
+        @cache.cache
+        def get_value(key):
+            calls.append(key)
+            started.set()
+            release.wait(5)
+            return key
+
+        threads = [
+            threading.Thread(target=get_value, args=("key",))
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        # Let the other callers reach the pending fetch
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        infos = get_value.get_cache_infos()
+        assert calls == ["key"]
+        assert infos["misses"] == 1
+        assert infos["coalesced"] == 4
+        assert infos["hits"] == 0
+    finally:
+        cache.disable()
+
+
+def test_cache_hit_returns_frozen_record_itself():
+    cache.enable()
+    try:
+
+        @cache.cache
+        def get_shot():
+            return compact({"id": "shot-id", "data": {"frame_in": 1}})
+
+        get_shot.set_cache_return_mode("frozen")
+        cached = get_shot()
+        result = get_shot()
+        assert result is cached
+        assert isinstance(result["data"], FrozenDict)
+        assert get_shot.get_cache_infos()["hits"] == 1
+    finally:
+        cache.disable()
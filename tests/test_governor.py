@@ -0,0 +1,33 @@
+from gazu import client as raw
+
+
+def test_streamed_response_holds_its_slot_until_closed(client):
+    governor = raw.set_rate_limit(max_in_flight=1, client=client)
+
+    raw.get("data/projects", client=client)
+    assert governor.in_flight == 0
+
+    response = raw.send_request(
+        "GET", "data/projects", client=client, stream=True
+    )
+    assert governor.in_flight == 1
+    assert not governor.semaphore.acquire(False)
+    with response:
+        response.content
+    assert governor.in_flight == 0
+    response.close()
+    assert governor.in_flight == 0
+    assert governor.semaphore.acquire(False)
+
+
+def test_reset_statistics_keeps_value_types(client):
+    governor = raw.set_rate_limit(rate=1000, client=client)
+    raw.get("data/projects", client=client)
+    initial = raw.set_rate_limit(client=client).statistics
+
+    governor.reset_statistics()
+
+    assert governor.statistics == initial
+    assert [type(value) for value in governor.statistics.values()] == [
+        type(value) for value in initial.values()
+    ]
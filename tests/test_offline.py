@@ -0,0 +1,38 @@
+from gazu.offline import OfflineJournal
+
+HOST = "http://kitsu.test/api"
+
+
+def test_add_ignores_operation_waiting_for_replay(tmp_path):
+    journal = OfflineJournal(str(tmp_path / "offline.sqlite"))
+    arguments = {"shot": {"id": "shot-1"}}
+
+    assert journal.add(HOST, "update_shot", arguments, queue="shot-1")
+    assert not journal.add(HOST, "update_shot", arguments, queue="shot-1")
+    assert journal.count(HOST) == 1
+
+
+def test_failed_operation_is_journaled_again(tmp_path):
+    journal = OfflineJournal(str(tmp_path / "offline.sqlite"))
+    arguments = {"task": {"id": "task-1"}, "comment": "wip", "checkpoint": {}}
+    journal.add(HOST, "publish_preview", arguments, queue="task-1")
+    operation = journal.get_pending(HOST)[0]
+    journal.claim(operation["id"])
+    done = dict(arguments, checkpoint={"comment": {"id": "comment-1"}})
+    journal.release(
+        operation["id"], error="ValueError: boom", max_attempts=1,
+        arguments=done,
+    )
+    assert journal.count(HOST) == 0
+
+    assert journal.add(HOST, "publish_preview", arguments, queue="task-1")
+
+    pending = journal.get_pending(HOST)
+    assert len(pending) == 1
+    assert pending[0]["id"] != operation["id"]
+    assert pending[0]["attempts"] == 0
+    # The replay resumes after the steps the failed one completed
+    assert pending[0]["arguments"]["checkpoint"] == {
+        "comment": {"id": "comment-1"}
+    }
+    assert journal.get_failed(HOST) == []
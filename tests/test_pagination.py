@@ -0,0 +1,49 @@
+from gazu import client as raw
+
+
+def get_task_ids(client):
+    return [task["id"] for task in client.transport.get_rows("tasks")]
+
+
+def test_iter_pages_walks_every_page(client):
+    task_ids = get_task_ids(client)
+    pages = list(
+        raw.iter_pages("data/tasks", params={"limit": 7}, client=client)
+    )
+    assert all(len(page) == 7 for page in pages[:-1])
+    assert [task["id"] for page in pages for task in page] == task_ids
+    # The last page is empty or short
+    calls = client.transport.calls.count(("GET", "data/tasks"))
+    assert calls in (len(pages), len(pages) + 1)
+
+
+def test_iter_pages_stops_on_short_page(client):
+    task_ids = get_task_ids(client)
+    pages = list(
+        raw.iter_pages(
+            "data/tasks", params={"limit": 7}, page_size=7, client=client
+        )
+    )
+    assert sum(len(page) for page in pages) == len(task_ids)
+    if len(task_ids) % 7:
+        assert client.transport.calls.count(("GET", "data/tasks")) == len(
+            pages
+        )
+
+
+def test_paginate_with_prefetch(client):
+    tasks = list(
+        raw.paginate(
+            "data/tasks", params={"limit": 5}, prefetch=True, client=client
+        )
+    )
+    assert [task["id"] for task in tasks] == get_task_ids(client)
+
+
+def test_pages_are_retried(client):
+    client.transport.add_fault(502, path="^data/tasks$")
+    tasks = list(
+        raw.paginate("data/tasks", params={"limit": 50}, client=client)
+    )
+    assert len(tasks) == len(get_task_ids(client))
+    assert raw.get_retry_stats(client=client)["retries"] == 1
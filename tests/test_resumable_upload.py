@@ -0,0 +1,221 @@
+import os
+
+import pytest
+import requests
+
+from gazu import client as raw
+from gazu import task as gazu_task
+from gazu.fake_zou import create_fake_client
+from gazu.resumable import UploadJournal
+from gazu.retry import no_retry
+
+CONTENT = os.urandom(4500)
+CHUNK_SIZE = 1000
+
+
+@pytest.fixture
+def resumable_client():
+    """
+    Client of a fake server supporting resumable uploads. Requests are not
+    retried, so failures reach the upload resume logic.
+    """
+    client = create_fake_client(resumable_uploads=True)
+    raw.set_retry_policy(no_retry(), client=client)
+    return client
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    file_path = str(tmp_path / "playblast.mp4")
+    with open(file_path, "wb") as file_object:
+        file_object.write(CONTENT)
+    return file_path
+
+
+@pytest.fixture
+def journal(tmp_path):
+    folder = tmp_path / "uploads"
+    folder.mkdir()
+    return UploadJournal(folder=str(folder))
+
+
+def new_preview(client):
+    task = client.transport.get_rows("tasks")[0]
+    status = client.transport.get_rows("task-status")[0]
+    comment = gazu_task.add_comment(task, status, client=client)
+    return gazu_task.create_preview(task, comment, client=client)
+
+
+def upload(client, preview, file_path, journal, **kwargs):
+    return raw.upload_resumable(
+        "pictures/preview-files/%s" % preview["id"],
+        file_path,
+        client=client,
+        chunk_size=CHUNK_SIZE,
+        journal=journal,
+        **kwargs
+    )
+
+
+def count_calls(client, method, suffix):
+    return len(
+        [
+            call
+            for call in client.transport.calls
+            if call[0] == method and call[1].endswith(suffix)
+        ]
+    )
+
+
+def count_chunks(client):
+    return count_upload_calls(client, "PUT")
+
+
+def count_upload_calls(client, method):
+    return len(
+        [
+            call
+            for call in client.transport.calls
+            if call[0] == method and "/resumable/" in call[1]
+        ]
+    )
+
+
+def test_file_is_sent_by_chunks(resumable_client, file_path, journal):
+    preview = new_preview(resumable_client)
+    progress = []
+    result = upload(
+        resumable_client,
+        preview,
+        file_path,
+        journal,
+        progress_callback=lambda sent, size: progress.append(sent),
+    )
+    assert result["file_size"] == len(CONTENT)
+    assert resumable_client.transport.files[preview["id"]] == CONTENT
+    assert resumable_client.resumable_uploads is True
+    assert count_chunks(resumable_client) == 5
+    assert progress == [1000, 2000, 3000, 4000, 4500]
+    assert os.listdir(journal.folder) == []
+
+
+def test_dropped_chunk_is_resumed(resumable_client, file_path, journal):
+    preview = new_preview(resumable_client)
+    resumable_client.transport.add_fault(
+        requests.exceptions.ConnectionError("dropped"),
+        method="PUT",
+        path="/resumable/",
+    )
+    upload(resumable_client, preview, file_path, journal)
+    assert resumable_client.transport.files[preview["id"]] == CONTENT
+    # The failed chunk is sent again after asking the server its offset
+    assert count_chunks(resumable_client) == 6
+    assert count_upload_calls(resumable_client, "GET") == 1
+    assert count_calls(resumable_client, "POST", "/resumable") == 1
+
+
+def test_upload_is_resumed_by_a_later_call(
+    resumable_client, file_path, journal
+):
+    preview = new_preview(resumable_client)
+
+    def drop_connection(sent, size):
+        # The connection drops after the second chunk
+        if sent == 2000:
+            resumable_client.transport.add_fault(
+                requests.exceptions.ConnectionError("dropped"),
+                method="PUT",
+                path="/resumable/",
+            )
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        upload(
+            resumable_client,
+            preview,
+            file_path,
+            journal,
+            progress_callback=drop_connection,
+            max_resumes=0,
+        )
+    assert len(os.listdir(journal.folder)) == 1
+
+    upload(resumable_client, preview, file_path, journal)
+    assert resumable_client.transport.files[preview["id"]] == CONTENT
+    # The second call resumed the same upload from the server offset
+    assert count_calls(resumable_client, "POST", "/resumable") == 1
+    assert count_chunks(resumable_client) == 6
+    assert os.listdir(journal.folder) == []
+
+
+def test_upload_restarts_when_the_server_forgot_it(
+    resumable_client, file_path, journal
+):
+    preview = new_preview(resumable_client)
+    resumable_client.transport.add_fault(
+        requests.exceptions.ConnectionError("dropped"),
+        method="PUT",
+        path="/resumable/",
+    )
+    with pytest.raises(requests.exceptions.ConnectionError):
+        upload(resumable_client, preview, file_path, journal, max_resumes=0)
+    resumable_client.transport.uploads.clear()
+
+    upload(resumable_client, preview, file_path, journal)
+    assert resumable_client.transport.files[preview["id"]] == CONTENT
+    assert count_calls(resumable_client, "POST", "/resumable") == 2
+
+
+def test_chunks_follow_the_server_offset(
+    resumable_client, file_path, journal
+):
+    preview = new_preview(resumable_client)
+    uploads = resumable_client.transport.uploads
+
+    def lose_bytes(sent, size):
+        # The server loses the end of the second chunk once
+        if sent == 2000:
+            upload_state = list(uploads.values())[0]
+            del upload_state["content"][1500:]
+
+    upload(
+        resumable_client,
+        preview,
+        file_path,
+        journal,
+        progress_callback=lose_bytes,
+    )
+    assert resumable_client.transport.files[preview["id"]] == CONTENT
+    # The chunk sent at 2000 is refused, then the upload goes on from 1500
+    assert count_chunks(resumable_client) == 6
+
+
+def test_falls_back_to_plain_upload_without_resumable_routes(
+    file_path, journal, monkeypatch
+):
+    client = create_fake_client()
+
+    def get_file_hash(file_path):
+        raise AssertionError("The file must not be hashed")
+
+    monkeypatch.setattr(raw, "get_file_hash", get_file_hash)
+    for _ in range(2):
+        preview = new_preview(client)
+        upload(client, preview, file_path, journal)
+        assert client.transport.files[preview["id"]] == CONTENT
+    assert client.resumable_uploads is False
+    # Support is checked once per client
+    assert count_calls(client, "OPTIONS", "/resumable") == 1
+
+
+@pytest.mark.parametrize("status", [404, 405])
+def test_falls_back_to_plain_upload_when_handshake_fails(
+    resumable_client, file_path, journal, status
+):
+    preview = new_preview(resumable_client)
+    resumable_client.transport.add_fault(
+        status, method="POST", path="/resumable$"
+    )
+    upload(resumable_client, preview, file_path, journal)
+    assert resumable_client.transport.files[preview["id"]] == CONTENT
+    assert resumable_client.resumable_uploads is False
+    assert count_chunks(resumable_client) == 0
@@ -0,0 +1,89 @@
+import pytest
+import requests
+
+from gazu import client as raw
+from gazu.exception import NotAuthenticatedException, ServerErrorException
+
+
+def test_get_is_retried_on_gateway_error(client):
+    client.transport.add_fault(502, method="GET", path="^data/projects$")
+    projects = raw.fetch_all("projects", client=client)
+    assert len(projects) == len(client.transport.get_rows("projects"))
+    stats = raw.get_retry_stats(client=client)
+    assert stats["retries"] == 1
+    assert stats["recovered"] == 1
+    assert stats["retries_by_method"] == {"GET": 1}
+
+
+def test_get_is_retried_on_connection_error(client):
+    client.transport.add_fault(
+        requests.exceptions.ConnectionError("dropped"), path="^data/projects$"
+    )
+    raw.fetch_all("projects", client=client)
+    assert raw.get_retry_stats(client=client)["retries"] == 1
+
+
+def test_retries_give_up_after_max_retries(client):
+    client.transport.add_fault(503, path="^data/projects$", count=10)
+    with pytest.raises(ServerErrorException):
+        raw.fetch_all("projects", client=client)
+    stats = raw.get_retry_stats(client=client)
+    assert stats["retries"] == 3
+    assert stats["gave_up"] == 1
+    assert client.transport.calls.count(("GET", "data/projects")) == 4
+
+
+def test_post_is_not_retried_unless_idempotent(client):
+    task = client.transport.get_rows("tasks")[0]
+    status = client.transport.get_rows("task-status")[0]
+    path = "actions/tasks/%s/comment" % task["id"]
+    data = {"task_status_id": status["id"], "comment": "retried"}
+
+    client.transport.add_fault(502, method="POST", path=path)
+    with pytest.raises(ServerErrorException):
+        raw.post(path, data, client=client)
+    assert raw.get_retry_stats(client=client)["retries"] == 0
+
+    client.transport.add_fault(502, method="POST", path=path)
+    comment = raw.post(path, data, client=client, idempotent=True)
+    assert comment["text"] == "retried"
+    assert raw.get_retry_stats(client=client)["retries_by_method"] == {
+        "POST": 1
+    }
+
+
+def test_retry_after_header_is_honored(client):
+    client.transport.add_fault(
+        429, path="^data/projects$", headers={"Retry-After": "0"}
+    )
+    raw.fetch_all("projects", client=client)
+    assert raw.get_retry_stats(client=client)["recovered"] == 1
+
+
+def test_expired_access_token_is_refreshed(client):
+    access_token = client.tokens["access_token"]
+    client.transport.expire_tokens()
+    projects = raw.fetch_all("projects", client=client)
+    assert len(projects) > 0
+    assert client.tokens["access_token"] != access_token
+    assert client.transport.calls[-3:] == [
+        ("GET", "data/projects"),
+        ("GET", "auth/refresh-token"),
+        ("GET", "data/projects"),
+    ]
+    # A refresh is not a retry
+    assert raw.get_retry_stats(client=client)["retries"] == 0
+
+
+def test_expired_token_is_not_refreshed_when_disabled(client):
+    raw.set_automatic_refresh_token(False, client=client)
+    client.transport.expire_tokens()
+    with pytest.raises(NotAuthenticatedException):
+        raw.fetch_all("projects", client=client)
+
+
+def test_invalid_refresh_token_raises(client):
+    client.transport.expire_tokens()
+    client.transport.refresh_tokens.clear()
+    with pytest.raises(NotAuthenticatedException):
+        raw.fetch_all("projects", client=client)
@@ -0,0 +1,34 @@
+import threading
+
+from gazu import client as raw
+from gazu.fake_zou import create_fake_client
+
+
+def test_coalesced_gets_return_independent_results():
+    client = create_fake_client(latency=0.05)
+    barrier = threading.Barrier(8)
+    results = {}
+
+    def get_tasks(index):
+        barrier.wait()
+        tasks = raw.fetch_all("tasks", client=client)
+        results[index] = (len(tasks), sum("mutated" in task for task in tasks))
+        # Each caller modifies its own result right away
+        for task in tasks:
+            task["mutated"] = index
+        tasks.append({"id": "added"})
+
+    threads = [
+        threading.Thread(target=get_tasks, args=(index,)) for index in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    task_count = len(client.transport.get_rows("tasks"))
+    assert results == dict(
+        (index, (task_count, 0)) for index in range(8)
+    )
+    # The callers shared a single request
+    assert client.transport.calls.count(("GET", "data/tasks")) < 8